@@ -1,10 +1,28 @@
 """Package initialization for bingbong."""
 
-from importlib.metadata import PackageNotFoundError, version
+from __future__ import annotations
 
-try:  # pragma: no cover - tiny helper
-    __version__ = version("bingbong")
-except PackageNotFoundError:  # pragma: no cover - during development
-    __version__ = "0.0.0"
+import time
+
+# Start of bingbong's own imports, for the "import" span of `--profile`.
+_IMPORT_STARTED_NS = time.perf_counter_ns()
 
 __all__ = ["__version__"]
+
+__version__: str  # resolved lazily by __getattr__
+
+
+def __getattr__(name: str) -> str:
+    # Resolved on first access: the metadata lookup scans dist-info and would
+    # otherwise be paid by every `bingbong tick` launch.
+    if name != "__version__":
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    from importlib.metadata import PackageNotFoundError, version  # noqa: PLC0415
+
+    try:  # pragma: no cover - tiny helper
+        value = version("bingbong")
+    except PackageNotFoundError:  # pragma: no cover - during development
+        value = "0.0.0"
+    globals()["__version__"] = value
+    return value
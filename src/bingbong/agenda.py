@@ -0,0 +1,361 @@
+"""`bingbong calendar`: schedule silences ahead of time, or import them from ``.ics``.
+
+Imports read a local iCalendar file (RFC 5545) and store each busy event as a
+silence (see :mod:`bingbong.silences`). Supported:
+
+- ``DTSTART``/``DTEND``/``DURATION`` in UTC, floating local time, with a
+  ``TZID`` known to the system, or as all-day dates;
+- ``RRULE`` with ``FREQ=DAILY`` or ``FREQ=WEEKLY`` and ``INTERVAL``,
+  ``COUNT``, ``UNTIL`` and plain ``BYDAY`` lists.
+
+Cancelled and free (``TRANSP:TRANSPARENT``) events are skipped. Other
+recurrences (monthly, yearly, ``BYSETPOS``...) import their first occurrence
+only; ``EXDATE`` exceptions are ignored, so an excluded occurrence stays
+silent.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import click
+
+from bingbong import clock, silences
+from bingbong.config import load_state
+from bingbong.core import require_darwin
+from bingbong.log import debug, warning
+from bingbong.silences import DAILY, ONCE, WEEKLY, Entry
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ["IcsError", "Parsed", "calendar", "parse_ics"]
+
+_DAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_RRULE_KEYS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "WKST"}
+_DURATION = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+_FORMATS = ["%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d"]
+_REPEATS = {"daily": (DAILY, 0), "weekdays": (WEEKLY, 0b11111), "weekly": (WEEKLY, 0)}
+
+
+class IcsError(ValueError):
+    """Raised for a file that is not an iCalendar file, or an unreadable event."""
+
+
+@dataclass(slots=True)
+class Parsed:
+    """Silences read from a calendar, and what was left out."""
+
+    entries: list[Entry] = field(default_factory=list)
+    skipped: int = 0  # cancelled or free events
+    first_only: int = 0  # recurrences we cannot follow; first occurrence kept
+
+
+def _unfold(text: str) -> Iterator[str]:
+    """Yield content lines, joining folded continuation lines."""
+    line = ""
+    for raw in text.splitlines():
+        if raw[:1] in {" ", "\t"}:
+            line += raw[1:]
+            continue
+        if line:
+            yield line
+        line = raw
+    if line:
+        yield line
+
+
+def _split(line: str) -> tuple[str, dict[str, str], str]:
+    """Split ``NAME;PARAM=v:value`` at the first colon outside quotes."""
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            head, value = line[:i], line[i + 1 :]
+            break
+    else:
+        msg = f"bad content line {line!r}"
+        raise IcsError(msg)
+    name, *params = head.split(";")
+    return name.upper(), {k.upper(): v.strip('"') for k, _, v in (p.partition("=") for p in params)}, value
+
+
+def _events(text: str) -> Iterator[dict[str, tuple[dict[str, str], str]]]:
+    """Yield each VEVENT's properties (the first of each name)."""
+    event: dict[str, tuple[dict[str, str], str]] | None = None
+    depth = 0  # nested components (VALARM) inside the event
+    for line in _unfold(text):
+        name, params, value = _split(line)
+        if name == "BEGIN" and event is None and value.upper() == "VEVENT":
+            event = {}
+        elif name == "BEGIN" and event is not None:
+            depth += 1
+        elif name == "END" and event is not None:
+            if depth:
+                depth -= 1
+            else:
+                yield event
+                event = None
+        elif event is not None and not depth:
+            event.setdefault(name, (params, value))
+
+
+def _when(params: dict[str, str], value: str) -> tuple[datetime, bool]:
+    """Parse a DATE or DATE-TIME into an aware datetime; the flag marks all-day dates."""
+    if params.get("VALUE") == "DATE" or len(value) == 8:  # noqa: PLR2004 - YYYYMMDD
+        return datetime.strptime(value, "%Y%m%d").astimezone(), True
+    naive = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")  # noqa: DTZ007 - zone applied below
+    if value.endswith("Z"):
+        return naive.replace(tzinfo=UTC), False
+    if "TZID" in params:
+        try:
+            return naive.replace(tzinfo=ZoneInfo(params["TZID"])), False
+        except (ZoneInfoNotFoundError, ValueError):
+            warning("ics: unknown time zone %r; using local time", params["TZID"])
+    return naive.astimezone(), False
+
+
+def _duration(value: str) -> timedelta:
+    m = _DURATION.fullmatch(value)
+    if not m:
+        msg = f"bad duration {value!r}"
+        raise IcsError(msg)
+    sign, weeks, days, hours, minutes, seconds = m.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -delta if sign == "-" else delta
+
+
+def _repeat(rule: str, entry: Entry) -> Entry | None:
+    """Return ``entry`` repeating as an RRULE says; None when it cannot be followed."""
+    parts = dict(p.partition("=")[::2] for p in rule.upper().split(";") if p)
+    if parts.get("FREQ") not in {"DAILY", "WEEKLY"} or not parts.keys() <= _RRULE_KEYS:
+        return None
+    try:
+        interval = int(parts.get("INTERVAL", 1))
+        count = int(parts.get("COUNT", 0))
+        days = [_DAYS[d] for d in parts["BYDAY"].split(",")] if "BYDAY" in parts else []
+        until = _until(parts["UNTIL"]) if "UNTIL" in parts else 0.0
+    except (KeyError, ValueError):  # numbered BYDAY (1MO), bad numbers
+        return None
+    freq = DAILY if parts["FREQ"] == "DAILY" else WEEKLY
+    if freq == DAILY and days:
+        if interval != 1:
+            return None
+        freq = WEEKLY  # every day, only on these weekdays
+    if until and until < entry.start:
+        return None
+    weekdays = sum(1 << d for d in set(days))
+    return replace(entry, freq=freq, interval=interval, weekdays=weekdays, until=until, count=count)
+
+
+def _until(value: str) -> float:
+    """``UNTIL`` is inclusive: a date means up to the end of that day."""
+    when, all_day = _when({}, value)
+    return (when + timedelta(days=1)).timestamp() - 1 if all_day else when.timestamp()
+
+
+def _span(event: dict[str, tuple[dict[str, str], str]]) -> tuple[datetime, datetime]:
+    start, all_day = _when(*event["DTSTART"])
+    if "DTEND" in event:
+        return start, _when(*event["DTEND"])[0]
+    if "DURATION" in event:
+        return start, start + _duration(event["DURATION"][1])
+    return start, start + timedelta(days=1 if all_day else 0)
+
+
+def parse_ics(text: str, *, source: str = "") -> Parsed:
+    """Read the busy events of an iCalendar document as silences."""
+    if "BEGIN:VCALENDAR" not in text.upper():
+        msg = "not an iCalendar file (no BEGIN:VCALENDAR)"
+        raise IcsError(msg)
+    parsed = Parsed()
+    for event in _events(text):
+        status = event.get("STATUS", ({}, ""))[1].upper()
+        transp = event.get("TRANSP", ({}, ""))[1].upper()
+        if status == "CANCELLED" or transp == "TRANSPARENT" or "DTSTART" not in event:
+            parsed.skipped += 1
+            continue
+        label = event.get("SUMMARY", ({}, ""))[1].replace("\\,", ",").replace("\\;", ";")
+        try:
+            start, end = _span(event)
+        except ValueError as e:
+            warning("ics: skipping event %r (%s)", label, e)
+            parsed.skipped += 1
+            continue
+        if end <= start:
+            parsed.skipped += 1
+            continue
+        entry = Entry(start.timestamp(), end.timestamp(), label=label, source=source)
+        if "RRULE" in event:
+            repeat = _repeat(event["RRULE"][1], entry)
+            if repeat is None:
+                debug("ics: first occurrence only", label=label, rrule=event["RRULE"][1])
+                parsed.first_only += 1
+            else:
+                entry = repeat
+        parsed.entries.append(entry)
+    return parsed
+
+
+def _current(entry: Entry, now: float) -> bool:
+    """Whether ``entry`` may still silence something after ``now``."""
+    if entry.freq == ONCE:
+        return entry.end > now
+    return not entry.until or entry.until + (entry.end - entry.start) > now
+
+
+def _describe(entry: Entry) -> str:
+    start = datetime.fromtimestamp(entry.start).astimezone()
+    end = datetime.fromtimestamp(entry.end).astimezone()
+    span = (
+        f"{start:%a %Y-%m-%d %H:%M}-{end:%H:%M}"
+        if end - start < timedelta(days=1)
+        else (f"{start:%Y-%m-%d %H:%M} -> {end:%Y-%m-%d %H:%M}")
+    )
+    if entry.freq != ONCE:
+        every = "day" if entry.freq == DAILY else "week"
+        span += f", every {entry.interval} {every}s" if entry.interval > 1 else f", every {every}"
+        if entry.weekdays:
+            span += " on " + ",".join(d.title() for d, n in _DAYS.items() if entry.weekdays >> n & 1)
+        if entry.until:
+            span += f" until {datetime.fromtimestamp(entry.until).astimezone():%Y-%m-%d}"
+        if entry.count:
+            span += f" ({entry.count} times)"
+    return f"{span}  {entry.label}".rstrip()
+
+
+def _stored() -> list[Entry]:
+    return list(silences.load().entries)
+
+
+@click.group()
+def calendar() -> None:
+    """Schedule silences ahead of time, or import them from a calendar file."""
+
+
+@calendar.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def import_ics(path: Path) -> None:
+    """Silence chimes during the events of an .ics file.
+
+    Re-importing a file replaces what was imported from it before.
+    """
+    require_darwin()
+    source = str(path.resolve())
+    try:
+        parsed = parse_ics(path.read_text(encoding="utf-8", errors="replace"), source=source)
+    except (OSError, IcsError) as e:
+        click.secho(f"[bingbong] Cannot import {path}: {e}", fg="red", err=True)
+        sys.exit(1)
+    now = clock.current().time()
+    fresh = [e for e in parsed.entries if _current(e, now)]
+    kept = [e for e in _stored() if e.source != source]
+    silences.save(kept + fresh)
+    recurring = sum(e.freq != ONCE for e in fresh)
+    click.secho(
+        f"[bingbong] Imported {len(fresh)} silence(s) from {path.name} ({recurring} recurring)", fg="blue"
+    )
+    if len(parsed.entries) > len(fresh):
+        click.echo(f"  {len(parsed.entries) - len(fresh)} past event(s) left out")
+    if parsed.skipped:
+        click.echo(f"  {parsed.skipped} cancelled or free event(s) skipped")
+    if parsed.first_only:
+        click.echo(
+            f"  {parsed.first_only} event(s) repeat in a way bingbong cannot follow; first occurrence only"
+        )
+
+
+@calendar.command()
+@click.option("--from", "start", type=click.DateTime(_FORMATS), required=True, help="Start (local time)")
+@click.option("--to", "end", type=click.DateTime(_FORMATS), default=None, help="End (local time)")
+@click.option("--minutes", type=click.IntRange(min=1), default=None, help="Length, instead of --to")
+@click.option("--repeat", type=click.Choice(sorted(_REPEATS)), default=None, help="Repeat the silence")
+@click.option("--until", type=click.DateTime(_FORMATS), default=None, help="Last day to repeat on")
+@click.option("--label", default="", help="Shown by `bingbong calendar list`")
+def add(
+    start: datetime,
+    end: datetime | None,
+    minutes: int | None,
+    repeat: str | None,
+    until: datetime | None,
+    label: str,
+) -> None:
+    """Schedule a silence, once or repeating."""
+    require_darwin()
+    start = start.astimezone()
+    if end is not None and minutes is None:
+        end = end.astimezone()
+    elif end is None and minutes is not None:
+        end = start + timedelta(minutes=minutes)
+    else:
+        click.echo("Provide either --to or --minutes")
+        sys.exit(2)
+    if end <= start:
+        msg = "must be after --from"
+        raise click.BadParameter(msg, param_hint="--to")
+    entry = Entry(start.timestamp(), end.timestamp(), label=label)
+    if repeat is not None:
+        freq, weekdays = _REPEATS[repeat]
+        last = _until(f"{until:%Y%m%d}") if until else 0.0
+        entry = replace(entry, freq=freq, weekdays=weekdays, until=last)
+    silences.save([*_stored(), entry])
+    click.secho(f"[bingbong] Scheduled silence: {_describe(entry)}", fg="blue")
+
+
+@calendar.command("list")
+@click.option(
+    "--next",
+    "next_count",
+    type=click.IntRange(min=0),
+    default=5,
+    show_default=True,
+    help="Upcoming silences to list",
+)
+def list_entries(next_count: int) -> None:
+    """Show scheduled silences and when the next ones are."""
+    state = load_state()
+    entries = _stored()
+    if not entries:
+        click.echo("No scheduled silences")
+        return
+    click.echo(f"{len(entries)} scheduled silence(s):")
+    for entry in sorted(entries, key=lambda e: e.start):
+        click.echo(f"  {_describe(entry)}")
+    if not next_count:
+        return
+    now = clock.current().time()
+    index = silences.index_for(state.calendar, now)
+    upcoming = list(index.overlapping(now, index.hi))[:next_count]
+    click.echo("Next silences:" if upcoming else "No silences in the next week")
+    for lo, hi in upcoming:
+        start = datetime.fromtimestamp(lo).astimezone()
+        click.echo(f"  {start:%a %Y-%m-%d %H:%M} - {datetime.fromtimestamp(hi).astimezone():%a %H:%M}")
+
+
+@calendar.command()
+@click.option(
+    "--source",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Only remove what was imported from this .ics file",
+)
+def clear(source: Path | None) -> None:
+    """Remove scheduled silences."""
+    require_darwin()
+    entries = _stored()
+    kept = [e for e in entries if source is not None and e.source != str(source.resolve())]
+    silences.save(kept)
+    click.secho(f"[bingbong] Removed {len(entries) - len(kept)} scheduled silence(s)", fg="green")
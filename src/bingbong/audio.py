@@ -2,36 +2,167 @@ from __future__ import annotations
 
 import os
 import subprocess  # noqa: S404
-import sys
-import time
+from contextlib import contextmanager
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
 
-import click
+from bingbong import clock
+from bingbong.config import app_support
+from bingbong.constants import PLAYER_GRACE, PLAYER_RETRIES, TICK_BUDGET
+from bingbong.log import debug, warning
+from bingbong.mixer import wav_duration, write_wav
 
-from bingbong.log import debug
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Sequence
+
+    from bingbong.mixer import Pcm
 
 # macOS default player (we only ever execute a fixed binary with a file path)
 AFPLAY = Path(os.environ.get("BINGBONG_PLAYER", "/usr/bin/afplay"))
 
-__all__ = ["AFPLAY", "play_once", "play_repeated"]
+__all__ = [
+    "AFPLAY",
+    "NullPlayer",
+    "PlaybackError",
+    "null_player",
+    "play_once",
+    "play_pcm",
+    "play_repeated",
+    "play_sequence",
+    "sound_timeout",
+]
+
+
+class PlaybackError(RuntimeError):
+    """Raised when the player keeps failing on a file, or the time for it ran out."""
+
+
+class NullPlayer:
+    """Audio backend that plays nothing and records what would have played.
+
+    ``played`` holds ``(clock time, sound)`` pairs in order.
+    """
+
+    def __init__(self) -> None:
+        self.played: list[tuple[float, str]] = []
+
+    def play(self, sound: str | Path) -> None:
+        self.played.append((clock.current().time(), str(sound)))
+
+
+_backend = SimpleNamespace(null=None)
+
 
+@contextmanager
+def null_player(player: NullPlayer | None = None) -> Generator[NullPlayer]:
+    """Route all playback in this module to ``player`` (a new one by default)."""
+    previous, _backend.null = _backend.null, player or NullPlayer()
+    try:
+        yield _backend.null
+    finally:
+        _backend.null = previous
 
-def play_once(path: str | Path) -> None:
+
+def sound_timeout(path: str | Path) -> float:
+    """Seconds the player may spend on ``path`` before it is killed."""
+    length = wav_duration(path)
+    return TICK_BUDGET if length is None else length + PLAYER_GRACE
+
+
+def _run_player(path: Path, timeout: float) -> int | None:
+    """Run the player on ``path``; its exit code, or None when it was killed for taking too long."""
+    try:
+        return subprocess.run([AFPLAY, str(path)], check=False, timeout=timeout).returncode  # noqa: S603
+    except subprocess.TimeoutExpired:
+        return None
+
+
+def play_once(path: str | Path, *, deadline: float | None = None) -> None:
+    """Play ``path``, retrying a failed player up to ``PLAYER_RETRIES`` times.
+
+    The player is killed once it runs :func:`sound_timeout` seconds, or at
+    ``deadline`` (a ``clock.monotonic()`` time) if that comes first. Raises
+    :class:`PlaybackError` when the file is missing or every attempt failed.
+    """
+    if _backend.null is not None:
+        _backend.null.play(path)
+        return
     file_path = Path(path)
     if not file_path.is_file():
-        click.secho(f"[bingbong] audio file not found: {file_path}", fg="red", err=True)
-        sys.exit(1)
-    debug(f"playing once: player={AFPLAY} file={file_path}")
-    result = subprocess.run([AFPLAY, str(file_path)], check=False)  # noqa: S603
-    if result.returncode != 0:
-        click.secho(f"[bingbong] player exited with code {result.returncode}", fg="red", err=True)
-        sys.exit(result.returncode)
-    debug("play once: done (exit=0)")
+        msg = f"audio file not found: {file_path}"
+        raise PlaybackError(msg)
+    timeout = sound_timeout(file_path)
+    attempts = 1 + PLAYER_RETRIES
+    for attempt in range(1, attempts + 1):
+        limit = timeout if deadline is None else min(timeout, deadline - clock.current().monotonic())
+        if limit <= 0:
+            msg = f"no time left to play {file_path.name}"
+            raise PlaybackError(msg)
+        debug("playing once", player=AFPLAY, file=file_path, timeout=round(limit, 1))
+        rc = _run_player(file_path, limit)
+        if rc == 0:
+            debug("play once: done (exit=0)")
+            return
+        outcome = f"killed after {limit:.1f}s" if rc is None else f"exited with code {rc}"
+        warning("player %s on %s (attempt %d/%d)", outcome, file_path.name, attempt, attempts)
+    msg = f"player {outcome} on {file_path.name}, {attempts} attempt(s)"
+    raise PlaybackError(msg)
 
 
 def play_repeated(path: str | Path, times: int, delay: float = 0.2) -> None:
-    debug(f"play repeated: times={times} delay={delay}")
+    debug("play repeated", times=times, delay=delay)
     for _ in range(times):
         play_once(path)
-        time.sleep(delay)
+        clock.current().sleep(delay)
     debug("play repeated: done")
+
+
+def play_sequence(
+    sounds: Sequence[tuple[Path, float]],
+    *,
+    keep_going: Callable[[], bool] | None = None,
+    deadline: float | None = None,
+    latency: float = 0.0,
+) -> int:
+    """Play each ``(path, gap)`` in turn, ``gap`` seconds apart; return how many were dropped.
+
+    ``keep_going`` is consulted before every sound after the first; returning
+    False drops the rest (e.g. when the minute rolled over). Sounds that would
+    start at or after ``deadline`` (a ``clock.monotonic()`` time) are dropped
+    too. Each gap starts when the player exits, so ``latency``, the player's
+    overhead per sound, is taken off it. Raises :class:`PlaybackError` like
+    :func:`play_once`.
+    """
+    clk = clock.current()
+    for i, (path, gap) in enumerate(sounds):
+        if i and keep_going is not None and not keep_going():
+            debug("play sequence: stopped before sound %d/%d", i + 1, len(sounds))
+            return len(sounds) - i
+        if deadline is not None and clk.monotonic() >= deadline:
+            warning(
+                "play sequence: out of time, dropping the last %d of %d sound(s)",
+                len(sounds) - i,
+                len(sounds),
+            )
+            return len(sounds) - i
+        play_once(path, deadline=deadline)
+        if i + 1 < len(sounds):
+            clk.sleep(max(0.0, gap - latency))
+    return 0
+
+
+def play_pcm(pcm: Pcm, *, deadline: float | None = None) -> None:
+    """Play an in-memory buffer with a single player invocation (see :func:`play_once`)."""
+    if _backend.null is not None:
+        _backend.null.play(f"<buffer {pcm.duration:.2f}s>")
+        return
+    app_dir = app_support()
+    app_dir.mkdir(parents=True, exist_ok=True)
+    # Per-process name so overlapping ticks never clobber each other's buffer.
+    path = write_wav(pcm, app_dir / f"render-{os.getpid()}.wav")
+    debug("play pcm: %.2fs via %s", pcm.duration, path)
+    try:
+        play_once(path, deadline=deadline)
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,166 @@
+"""`bingbong bench`: measure the audio players' latency.
+
+Two figures are measured with the bundled ``silence.wav``, one per way a tick
+can play:
+
+- the command player (``afplay`` or ``BINGBONG_PLAYER``): each run's
+  spawn-to-exit time minus the sound's length is its overhead per sound,
+  startup and exit together. Its median is stored as ``player_latency`` and
+  taken off the gaps that follow a player's exit (see
+  :func:`bingbong.audio.play_sequence`).
+- the warm player helper of `bingbong run` (see :mod:`bingbong.player`): a
+  request's round trip plus the output latency its audio stream reports is its
+  time to first audio. Its median is stored as ``helper_latency``, and the
+  resident loop starts each tick that much before its boundary (see
+  :func:`bingbong.daemon.run_loop`). A helper that runs the command player
+  itself reports no latency and is not measured.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess  # noqa: S404
+import sys
+import time
+from contextlib import contextmanager
+from importlib import resources
+from typing import TYPE_CHECKING
+
+import click
+
+from bingbong import audio
+from bingbong.config import update_state
+from bingbong.core import require_darwin
+from bingbong.log import debug
+from bingbong.mixer import wav_duration
+from bingbong.player import PlayerError, PlayerHelper
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+__all__ = ["PROBE", "bench", "measure", "measure_helper", "probe_path", "summarize"]
+
+PROBE = "silence.wav"  # bundled in bingbong.data
+
+
+@contextmanager
+def probe_path() -> Generator[Path]:
+    """Yield the probe as a file on disk, extracted for the duration if need be."""
+    with resources.as_file(resources.files("bingbong.data") / PROBE) as path:
+        yield path
+
+
+def measure(runs: int, player: Path | None = None) -> list[float]:
+    """Play the probe ``runs`` times (after one warm-up); return each run's overhead in seconds.
+
+    Raises :class:`~bingbong.audio.PlaybackError` when the player fails or hangs.
+    """
+    player = player or audio.AFPLAY
+    with probe_path() as probe:
+        return _measure(runs, player, probe)
+
+
+def _measure(runs: int, player: Path, probe: Path) -> list[float]:
+    length = wav_duration(probe) or 0.0
+    timeout = audio.sound_timeout(probe)
+    overheads = []
+    for i in range(runs + 1):
+        t0 = time.perf_counter()
+        try:
+            result = subprocess.run(  # noqa: S603
+                [player, str(probe)], capture_output=True, timeout=timeout, check=False
+            )
+        except subprocess.TimeoutExpired as e:
+            msg = f"{player} did not finish playing {probe.name} within {timeout:.1f}s"
+            raise audio.PlaybackError(msg) from e
+        elapsed = time.perf_counter() - t0
+        if result.returncode:
+            err = result.stderr.decode(errors="replace").strip()
+            msg = f"{player} failed on {probe.name} (exit {result.returncode}){': ' + err if err else ''}"
+            raise audio.PlaybackError(msg)
+        if i:  # the first run pays for cold caches
+            overheads.append(max(0.0, elapsed - length))
+    return overheads
+
+
+def measure_helper(runs: int, helper: PlayerHelper) -> list[float]:
+    """Ask ``helper`` for the probe's latency ``runs`` times (after one warm-up).
+
+    Returns each run's time to first audio: the round trip plus the reported latency.
+
+    Raises :class:`~bingbong.player.PlayerError` when the helper cannot tell.
+    """
+    latencies = []
+    with probe_path() as probe:
+        for i in range(runs + 1):
+            t0 = time.perf_counter()
+            output = helper.latency(probe)
+            if i:  # the first request starts the helper and opens the stream
+                latencies.append(time.perf_counter() - t0 + output)
+    return latencies
+
+
+def summarize(overheads: list[float]) -> dict[str, float]:
+    """Median, p95, p99, mean, standard deviation and range of ``overheads`` (two or more)."""
+    cuts = statistics.quantiles(overheads, n=100, method="inclusive")
+    return {
+        "p50": statistics.median(overheads),
+        "p95": cuts[94],
+        "p99": cuts[98],
+        "mean": statistics.fmean(overheads),
+        "stdev": statistics.stdev(overheads),
+        "min": min(overheads),
+        "max": max(overheads),
+    }
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} ms"
+
+
+def _report(label: str, stats: dict[str, float]) -> None:
+    click.echo(f"{label:<8} p50 {_ms(stats['p50'])}  p95 {_ms(stats['p95'])}  p99 {_ms(stats['p99'])}")
+    click.echo(
+        f"         mean {_ms(stats['mean'])}  stdev {_ms(stats['stdev'])}  "
+        f"range {_ms(stats['min'])} - {_ms(stats['max'])}"
+    )
+
+
+@click.command()
+@click.option("-n", "--runs", type=click.IntRange(min=2), default=20, show_default=True, help="Timed plays")
+@click.option(
+    "--save/--no-save", default=True, help="Store the medians for `tick` and `run` to compensate with"
+)
+def bench(runs: int, *, save: bool) -> None:
+    """Measure the audio players' latency and calibrate tick timing."""
+    require_darwin()
+    player = audio.AFPLAY
+    click.echo(f"Playing {PROBE} {runs} times through {player}...")
+    try:
+        overheads = measure(runs, player)
+    except audio.PlaybackError as e:
+        click.secho(f"[bingbong] {e}", fg="red", err=True)
+        sys.exit(1)
+    stats = summarize(overheads)
+    _report("command", stats)
+    debug("bench: measured", player=player, runs=runs, **{k: round(v, 6) for k, v in stats.items()})
+    helper_p50 = None
+    with PlayerHelper() as helper:
+        try:
+            latencies = measure_helper(runs, helper)
+        except PlayerError as e:
+            click.echo(f"helper   not measured: {e}")
+        else:
+            helper_stats = summarize(latencies)
+            helper_p50 = helper_stats["p50"]
+            _report("helper", helper_stats)
+            debug("bench: measured helper", runs=runs, **{k: round(v, 6) for k, v in helper_stats.items()})
+    if save:
+        update_state(player_latency=stats["p50"], helper_latency=helper_p50)
+        early = "on their boundary" if helper_p50 is None else f"{_ms(helper_p50)} early"
+        click.secho(
+            f"Saved: `run` starts ticks {early}; `tick` takes {_ms(stats['p50'])} off gaps "
+            "that wait for the player to exit.",
+            fg="green",
+        )
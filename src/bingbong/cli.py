@@ -1,37 +1,47 @@
 from __future__ import annotations
 
 import contextlib
+import importlib
 import os
-import subprocess  # noqa: S404
 import sys
 import time
 from datetime import UTC, datetime, timedelta
-from importlib import resources
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import click
 
-from bingbong.audio import AFPLAY, play_once, play_repeated
-from bingbong.config import APP_NAME, LABEL, Config, ConfigNotFoundError, config_path, silence_path
-from bingbong.constants import CHIME_DELAY, POP_DELAY
+from bingbong import clock, profiling
+from bingbong.config import APP_NAME, LABEL, Config, app_support, launch_agent_path, load_state
 from bingbong.core import (
-    compute_pop_count,
+    clear_silence,
+    effective_quiet_hours,
+    format_quiet_hours,
     get_silence_until,
+    parse_quiet_hours_option,
+    parse_rules_option,
+    require_darwin,
+    scheduled_silence,
     set_silence_for,
-    silence_active,
 )
-from bingbong.log import debug, set_verbose
-from bingbong.service import service
+from bingbong.log import debug, info, log_path, set_verbose, start_file_log, tail
+from bingbong.pattern import DEFAULT_RULES, Strike
+from bingbong.profiling import span
 
 if TYPE_CHECKING:
     from onginred.service import LaunchdService
 
+    from bingbong.pattern import Pattern
+    from bingbong.state import State
+
 
 __all__ = [
+    "LazyGroup",
     "cli",
-    "doctor",
     "install",
+    "install_stamp_path",
+    "logs",
+    "next_chimes",
     "resume",
     "silence",
     "status",
@@ -40,54 +50,195 @@ __all__ = [
 ]
 
 
-def _require_darwin() -> None:
-    if sys.platform != "darwin":
-        click.secho("[bingbong] macOS (Darwin) only", fg="red", err=True)
-        sys.exit(1)
+class LazyGroup(click.Group):
+    """Click group that imports some subcommands only when they are used.
 
+    ``lazy_subcommands`` maps a command name to ``"module:attribute"``; the module
+    is imported the first time the command is resolved, so `tick` never pays
+    for dependencies that only other commands need.
+    """
 
-@click.group(context_settings={"help_option_names": ["-h", "--help"]})
+    def __init__(self, *args: Any, lazy_subcommands: dict[str, str] | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_subcommands:
+            return self._load_lazy(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_lazy(self, cmd_name: str) -> click.Command:
+        module_name, attr = self.lazy_subcommands[cmd_name].split(":")
+        cmd = getattr(importlib.import_module(module_name), attr)
+        if not isinstance(cmd, click.Command):
+            msg = f"lazy subcommand {cmd_name!r} resolved to {cmd!r}, not a click command"
+            raise TypeError(msg)
+        debug("lazy-loaded command %s from %s", cmd_name, module_name)
+        return cmd
+
+
+@click.group(
+    cls=LazyGroup,
+    context_settings={"help_option_names": ["-h", "--help"]},
+    lazy_subcommands={
+        "bench": "bingbong.calibrate:bench",
+        "calendar": "bingbong.agenda:calendar",
+        "doctor": "bingbong.doctor:doctor",
+        "history": "bingbong.history:history",
+        "run": "bingbong.daemon:run",
+        "simulate": "bingbong.simulate:simulate",
+    },
+)
 @click.option("-v", "--verbose", is_flag=True, help="Enable verbose debug output")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Write cProfile stats and a trace timeline to the app support dir (or set BINGBONG_PROFILE=1)",
+)
 @click.pass_context
-def cli(ctx: click.Context, *, verbose: bool) -> None:  # noqa: ARG001
+def cli(ctx: click.Context, *, verbose: bool, profile: bool) -> None:
     """Bingbong - gentle time chimes for macOS."""
     # Initialize verbosity for this process.
     set_verbose(value=verbose)
+    start_file_log()
     if verbose:
         debug("verbose logging enabled")
-        debug(f"python={sys.executable}")
-        debug(f"platform={sys.platform}")
+        debug("environment", python=sys.executable, platform=sys.platform)
+    if profile or profiling.env_enabled():
+        profiling.start(ctx.invoked_subcommand or APP_NAME)
+        ctx.call_on_close(_write_profile)
+
+
+def _write_profile() -> None:
+    paths = profiling.finish()
+    if paths:
+        click.echo(f"[bingbong] profile: {paths[0]}", err=True)
+        click.echo(f"[bingbong] trace  : {paths[1]}", err=True)
 
 
 def _default_wavs() -> tuple[Path, Path]:
     """Locate packaged default wav files."""
+    from importlib import resources  # noqa: PLC0415
+
     pkg = "bingbong.data"
     chime = resources.files(pkg) / "chime.wav"
     pop = resources.files(pkg) / "pop.wav"
-    debug(f"default wavs resolved: chime={chime} pop={pop}")
+    debug("default wavs resolved", chime=chime, pop=pop)
     return (Path(chime), Path(pop))
 
 
-def _get_service(plist_path: Path | None) -> LaunchdService:
+def _get_service(
+    plist_path: Path | None,
+    *,
+    resident: bool = False,
+    quiet_hours: tuple[int, int] | None = None,
+    pattern: Pattern | None = None,
+) -> LaunchdService:
+    # onginred (and pydantic under it) dominates import time; only install/uninstall need it.
+    from bingbong.service import service  # noqa: PLC0415
+
     python = sys.executable
-    args = [python, "-m", APP_NAME, "tick"]
-    return service(str(plist_path) if plist_path else None, args)
+    args = [python, "-m", APP_NAME, "run" if resident else "tick"]
+    return service(
+        str(plist_path) if plist_path else None,
+        args,
+        resident=resident,
+        quiet_hours=quiet_hours,
+        pattern=pattern,
+    )
 
 
-def _quiet_hours_active(now: datetime) -> bool:
-    span = os.environ.get("BINGBONG_QUIET_HOURS")
-    if not span:
-        return False
+def _preprocess_sounds(chime_wav: Path, pop_wav: Path) -> tuple[Path, Path]:
+    """Validate, trim and normalise both sounds; exit when one is unusable."""
+    from bingbong.mixer import MixError  # noqa: PLC0415 - install-only
+    from bingbong.preprocess import preprocess  # noqa: PLC0415 - install-only
+
+    try:
+        with span("preprocess"):
+            return preprocess(chime_wav, "chime"), preprocess(pop_wav, "pop")
+    except MixError as e:
+        click.secho(f"[bingbong] Unusable sound file: {e}", fg="red", err=True)
+        sys.exit(1)
+
+
+def install_stamp_path() -> Path:
+    return app_support() / "install.stamp"
+
+
+def _digest(*parts: bytes) -> str:
+    import hashlib  # noqa: PLC0415 - install-only; keep it off the tick path
+
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _install_inputs(
+    sources: tuple[Path, Path],
+    plist_path: Path | None,
+    quiet_hours: tuple[int, int] | None,
+    rules: tuple[str, ...] | None,
+    *,
+    resident: bool,
+    no_preprocess: bool,
+) -> str:
+    """Digest everything `install` renders the plist and config from."""
+    import bingbong  # noqa: PLC0415 - the version resolves lazily
+    from bingbong.audio import AFPLAY  # noqa: PLC0415 - audio brings in subprocess
+
+    settings = (
+        bingbong.__version__,
+        sys.executable,
+        str(AFPLAY),
+        str(plist_path or launch_agent_path()),
+        quiet_hours,
+        effective_quiet_hours(quiet_hours),
+        rules,
+        resident,
+        no_preprocess,
+    )
+    return _digest(repr(settings).encode(), *(src.read_bytes() for src in sources))
+
+
+def _config_digest(cfg: Config) -> str:
+    """Digest the stored config together with the sound files it points at."""
+    fields = (str(cfg.chime_wav), str(cfg.pop_wav), cfg.version, cfg.quiet_hours, cfg.rules)
+    return _digest(repr(fields).encode(), cfg.chime_wav.read_bytes(), cfg.pop_wav.read_bytes())
+
+
+def _install_stamp(inputs: str, plist: Path) -> list[str]:
+    """Return the stamp of what is installed now: inputs, plist and config digests."""
+    return [inputs, _digest(plist.read_bytes()), _config_digest(Config.load())]
+
+
+def _install_unchanged(inputs: str, plist: Path) -> bool:
+    """Whether the last install used ``inputs`` and its plist and config are still as it left them."""
     try:
-        start_s, end_s = span.split("-")
-        start = datetime.strptime(start_s, "%H:%M").time()  # noqa: DTZ007
-        end = datetime.strptime(end_s, "%H:%M").time()  # noqa: DTZ007
-    except ValueError:
+        return install_stamp_path().read_text().split() == _install_stamp(inputs, plist)
+    except OSError:  # no stamp, plist or config (ConfigNotFoundError) yet
         return False
-    t = now.time()
-    if start <= end:
-        return start <= t < end
-    return t >= start or t < end
+
+
+def _up_to_date(inputs: str, plist: Path) -> bool:
+    """Report and return whether the install would change nothing."""
+    with span("install check"):
+        unchanged = _install_unchanged(inputs, plist)
+    if unchanged:
+        click.secho(f"[bingbong] {LABEL} is up to date; nothing to do (--force reinstalls)", fg="green")
+        info("install: unchanged, skipped", plist=plist)
+    return unchanged
+
+
+def _record_install(inputs: str, plist: Path) -> None:
+    path = install_stamp_path()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text("\n".join(_install_stamp(inputs, plist)) + "\n")
+    tmp.replace(path)
 
 
 @cli.command()
@@ -111,32 +262,105 @@ def _quiet_hours_active(now: datetime) -> bool:
     default=None,
     help="Optional explicit plist path",
 )
-def install(chime_wav: Path | None, pop_wav: Path | None, plist_path: Path | None) -> None:
-    """Install and load the background chime service."""
-    _require_darwin()
+@click.option(
+    "--resident",
+    is_flag=True,
+    help="Install a long-lived `bingbong run` job instead of one launch per tick",
+)
+@click.option(
+    "--quiet-hours",
+    callback=parse_quiet_hours_option,
+    default=None,
+    help="Skip chimes in this local window, e.g. 22:00-07:00",
+)
+@click.option(
+    "--rule",
+    "pattern",
+    multiple=True,
+    callback=parse_rules_option,
+    help="Chime rule '<minute> <hour> <weekday> <sounds>', e.g. '0 9-17 mon-fri chime pop*hour' (repeatable)",
+)
+@click.option(
+    "--no-preprocess",
+    is_flag=True,
+    help="Use the sound files as given instead of trimmed, normalised copies",
+)
+@click.option("--force", is_flag=True, help="Rewrite the plist and reload the job even if nothing changed")
+def install(
+    chime_wav: Path | None,
+    pop_wav: Path | None,
+    plist_path: Path | None,
+    quiet_hours: tuple[int, int] | None,
+    pattern: Pattern,
+    *,
+    resident: bool,
+    no_preprocess: bool,
+    force: bool,
+) -> None:
+    """Install and load the background chime service.
+
+    When the plist and config it would write are what the last install left
+    on disk, nothing is rewritten and launchd is not reloaded (unless --force).
+    """
+    import subprocess  # noqa: PLC0415, S404 - install-only
+
+    from bingbong import prerender  # noqa: PLC0415 - install-only
+    from bingbong.audio import AFPLAY  # noqa: PLC0415 - audio brings in subprocess
+    from bingbong.mixer import MixError  # noqa: PLC0415 - install-only
+
+    require_darwin()
     if not AFPLAY.exists() or not os.access(AFPLAY, os.X_OK):
         click.secho(f"[bingbong] player not found/executable at {AFPLAY}", fg="red", err=True)
         sys.exit(1)
-    if not chime_wav or not pop_wav:
-        def_chime, def_pop = _default_wavs()
-        chime_wav = chime_wav or def_chime
-        pop_wav = pop_wav or def_pop
-    debug(f"install: chime={chime_wav} pop={pop_wav} plist={plist_path} player={AFPLAY}")
+    def_chime, def_pop = _default_wavs()
+    chime_wav = chime_wav or def_chime
+    pop_wav = pop_wav or def_pop
+    debug("install", chime=chime_wav, pop=pop_wav, plist=plist_path, player=AFPLAY, resident=resident)
+    rules = None if pattern.rules == DEFAULT_RULES else pattern.rules
+    sources = (chime_wav, pop_wav)
+    inputs = _install_inputs(
+        sources, plist_path, quiet_hours, rules, resident=resident, no_preprocess=no_preprocess
+    )
+    if not force and _up_to_date(inputs, plist_path or launch_agent_path()):
+        return
+    if not no_preprocess:
+        chime_wav, pop_wav = _preprocess_sounds(chime_wav, pop_wav)
 
-    Config(chime_wav=chime_wav, pop_wav=pop_wav).save()
-    svc = _get_service(plist_path)
+    with span("config save"):
+        Config(chime_wav=chime_wav, pop_wav=pop_wav, quiet_hours=quiet_hours, rules=rules).save()
+    try:
+        with span("prerender"):
+            sequences = prerender.build(chime_wav, pop_wav, pattern.strikes)
+    except MixError as e:
+        # Not fatal: tick falls back to live playback.
+        click.secho(f"[bingbong] Skipped pre-rendering sequences: {e}", fg="yellow", err=True)
+        sequences = None
+    # Quiet hours are left out of the launchd schedule, so nothing starts during them.
+    skip = effective_quiet_hours(quiet_hours)
+    svc = _get_service(plist_path, resident=resident, quiet_hours=skip, pattern=pattern)
 
     try:
-        svc.install()
-        click.secho(f"[bingbong] Installed {LABEL}", fg="green")
-        click.echo(f"  plist: {svc.plist_path}")
-        click.echo(f"  chime: {chime_wav}")
-        click.echo(f"   pop : {pop_wav}")
-        click.echo(f"  player: {AFPLAY}")
-        click.echo(f"  troubleshoot: launchctl print gui/$UID/{LABEL}")
+        with span("launchd install"):
+            svc.install()
+        _record_install(inputs, svc.plist_path)
     except (OSError, subprocess.CalledProcessError) as e:
         click.secho(f"[bingbong] Install failed: {e}", fg="red")
         sys.exit(1)
+    click.secho(f"[bingbong] Installed {LABEL}", fg="green")
+    click.echo(f"  plist: {svc.plist_path}")
+    click.echo(f"  chime: {chime_wav}")
+    click.echo(f"   pop : {pop_wav}")
+    if (chime_wav, pop_wav) != sources:
+        click.echo(f"  from : {sources[0]}, {sources[1]}")
+    click.echo(f"  player: {AFPLAY}")
+    if sequences:
+        click.echo(f"  cache: {sequences}")
+    click.echo(f"  mode : {'resident (bingbong run)' if resident else 'per-tick launch'}")
+    if skip:
+        click.echo(f"  quiet: {format_quiet_hours(skip)}")
+    for rule in rules or ():
+        click.echo(f"  rule : {rule}")
+    click.echo(f"  troubleshoot: launchctl print gui/$UID/{LABEL}")
 
 
 @cli.command()
@@ -148,11 +372,14 @@ def install(chime_wav: Path | None, pop_wav: Path | None, plist_path: Path | Non
 )
 def uninstall(plist_path: Path | None) -> None:
     """Unload and remove the background chime service."""
-    _require_darwin()
+    import subprocess  # noqa: PLC0415, S404 - uninstall-only
+
+    require_darwin()
     svc = _get_service(plist_path)
 
     try:
         svc.uninstall()
+        install_stamp_path().unlink(missing_ok=True)
         click.secho(f"[bingbong] Uninstalled {LABEL}", fg="yellow")
 
     except (OSError, subprocess.CalledProcessError) as e:
@@ -160,24 +387,44 @@ def uninstall(plist_path: Path | None) -> None:
         sys.exit(1)
 
 
+def _echo_latencies(cfg: Config) -> None:
+    for name, latency in (("Player", cfg.player_latency), ("Helper", cfg.helper_latency)):
+        if latency:
+            click.echo(f"{name} latency: {latency * 1000:.1f} ms (from `bingbong bench`)")
+
+
 @cli.command()
-def status() -> None:
-    """Show config, silence state, player, and plist status."""
-    _require_darwin()
+@click.option(
+    "--next",
+    "next_count",
+    type=click.IntRange(min=0),
+    default=4,
+    show_default=True,
+    help="Upcoming chimes to list",
+)
+def status(next_count: int) -> None:
+    """Show config, silence state, player, plist status and upcoming chimes."""
+    from bingbong import dayplan, ticklock  # noqa: PLC0415 - keeps `tick` light
+    from bingbong.audio import AFPLAY  # noqa: PLC0415 - audio brings in subprocess
+
+    require_darwin()
     debug("status: begin")
     click.echo(f"Label: {LABEL}")
     click.echo(f"Player: {AFPLAY}")
-    default_plist = Path.home() / "Library" / "LaunchAgents" / f"{LABEL}.plist"
+    default_plist = launch_agent_path()
     click.echo(f"Default plist path: {default_plist}")
 
-    if config_path().exists():
-        try:
-            cfg = Config.load()
-        except ConfigNotFoundError as e:
-            click.echo(f"[bingbong] {e} Run: bingbong install ...", err=True)
-            sys.exit(1)
+    with span("state load"):
+        state = load_state()
+    if state.has_config:
+        cfg = Config.load(state)
         click.echo(f"Chime: {cfg.chime_wav}")
         click.echo(f"Pop  : {cfg.pop_wav}")
+        _echo_latencies(cfg)
+        if cfg.quiet_hours:
+            click.echo(f"Quiet hours: {format_quiet_hours(cfg.quiet_hours)}")
+        for rule in cfg.rules or ():
+            click.echo(f"Rule : {rule}")
     else:
         click.echo("Config: (not found)")
 
@@ -186,16 +433,97 @@ def status() -> None:
     else:
         click.secho(f"Plist not present ❌ (expected at {default_plist})", fg="yellow")
 
-    until = get_silence_until()
-    if until and datetime.now(UTC) < until:
-        mins = int((until - datetime.now(UTC)).total_seconds() // 60)
+    now = clock.current().now()
+    resident = _ask_resident("status", count=next_count)
+    if resident is not None:
+        click.echo(f"Resident: running (pid {resident['pid']}), answering from memory")
+    _echo_silence(now, state, resident)
+
+    last = ticklock.last_tick()
+    if last is not None:
+        click.echo(f"Last tick: {datetime.fromtimestamp(last[0]).astimezone().strftime('%a %H:%M')}")
+    if state.has_config and next_count:
+        with span("upcoming"):
+            entries = (
+                _upcoming(resident["next"]) if resident else list(dayplan.upcoming(now, state, next_count))
+            )
+        click.echo("Next chimes:")
+        for when, strike in entries:
+            click.echo(f"  {when.strftime('%a %H:%M')}  {strike.describe()}")
+    debug("status: end")
+
+
+def _echo_silence(now: datetime, state: State, resident: dict[str, Any] | None) -> None:
+    if resident is not None:
+        ts = resident["silence_until"]
+        until = None if ts is None else datetime.fromtimestamp(ts, tz=UTC)
+        calendar = resident["calendar_until"], resident["calendar_next"]
+    else:
+        with span("silence check"):
+            until = get_silence_until(state)
+        calendar = scheduled_silence(now.timestamp(), state) if state.calendar else (None, None)
+    if until and now < until:
+        mins = int((until - now).total_seconds() // 60)
         click.secho(
             f"Silenced for another ~{mins} min (until {until.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')})",
             fg="blue",
         )
     else:
         click.echo("Silence: off")
-    debug("status: end")
+    if state.calendar:
+        _echo_scheduled_silence(*calendar)
+
+
+def _ask_resident(cmd: str, **args: Any) -> dict[str, Any] | None:
+    """Ask `bingbong run` over the control socket; None when it is not running."""
+    from bingbong import control  # noqa: PLC0415 - only these commands talk to the resident process
+
+    try:
+        return control.request(cmd, **args)
+    except control.ControlError as e:
+        click.secho(f"[bingbong] {e}", fg="red", err=True)
+        sys.exit(1)
+
+
+def _upcoming(rows: list[list[float]]) -> list[tuple[datetime, Strike]]:
+    """Decode the ``next`` list of a control reply."""
+    return [(datetime.fromtimestamp(ts).astimezone(), Strike(int(c), int(p))) for ts, c, p in rows]
+
+
+def _echo_scheduled_silence(until: float | None, upcoming: tuple[float, float] | None) -> None:
+    if until is not None:
+        end = datetime.fromtimestamp(until).astimezone()
+        click.secho(f"Calendar: silenced until {end.strftime('%a %H:%M')}", fg="blue")
+    elif upcoming is None:
+        click.echo("Calendar: no silence in the next week")
+    else:
+        start, end = (datetime.fromtimestamp(t).astimezone() for t in upcoming)
+        click.echo(f"Calendar: next silence {start.strftime('%a %H:%M')}-{end.strftime('%H:%M')}")
+
+
+@cli.command("next")
+@click.option(
+    "-n",
+    "--count",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Chimes to list",
+)
+def next_chimes(count: int) -> None:
+    """List the next chimes, after quiet hours and silences."""
+    from bingbong import dayplan  # noqa: PLC0415 - keeps `tick` light
+
+    require_darwin()
+    resident = _ask_resident("next", count=count)
+    if resident is not None:
+        entries = _upcoming(resident["next"])
+    else:
+        entries = list(dayplan.upcoming(clock.current().now(), load_state(), count))
+    if not entries:
+        click.echo("No chimes in the next week")
+    for when, strike in entries:
+        click.echo(f"{when.strftime('%a %Y-%m-%d %H:%M')}  {strike.describe()}")
 
 
 @cli.command()
@@ -203,12 +531,12 @@ def status() -> None:
 @click.option("--until", type=str, help="Silence until HH:MM (24h)")
 def silence(minutes: int | None, until: str | None) -> None:
     """Temporarily silence all chimes."""
-    _require_darwin()
+    require_darwin()
     if (minutes is None) == (until is None):
         click.echo("Provide either --minutes or --until")
         sys.exit(2)
     if until is not None:
-        now = datetime.now().astimezone()
+        now = clock.current().now()
         try:
             target = datetime.strptime(until, "%H:%M").replace(
                 year=now.year, month=now.month, day=now.day, tzinfo=now.tzinfo
@@ -219,51 +547,80 @@ def silence(minutes: int | None, until: str | None) -> None:
         if target <= now:
             target += timedelta(days=1)
         minutes = int((target - now).total_seconds() // 60)
-        debug(f"silence --until computed minutes={minutes} (target={target.isoformat()})")
+        debug("silence --until computed", minutes=minutes, target=target)
     if minutes is None:  # pragma: no cover - defensive
         msg = "minutes not computed"
         raise RuntimeError(msg)
     if minutes <= 0:
         click.echo("Minutes must be > 0")
         sys.exit(2)
-    until_dt = set_silence_for(minutes)
+    resident = _ask_resident("silence", minutes=minutes)
+    until_dt = datetime.fromtimestamp(resident["until"], tz=UTC) if resident else set_silence_for(minutes)
     click.secho(
         f"[bingbong] Silenced until {until_dt.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')}",
         fg="blue",
     )
-    debug("silence: set OK")
+    debug("silence: set OK", resident=resident is not None)
 
 
 @cli.command()
 def resume() -> None:
     """Resume chimes immediately by clearing silence state."""
-    _require_darwin()
-    with contextlib.suppress(FileNotFoundError):
-        silence_path().unlink()
+    require_darwin()
+    if _ask_resident("resume") is None:
+        clear_silence()
     click.secho("[bingbong] Silence cleared", fg="green")
-    debug("resume: cleared silence file (if existed)")
+    debug("resume: cleared silence")
 
 
 @cli.command()
-def doctor() -> None:
-    """Run platform/player/config/plist checks."""
-    _require_darwin()
-    ok = True
-    if not AFPLAY.exists() or not os.access(AFPLAY, os.X_OK):
-        click.secho(f"Player missing or not executable: {AFPLAY}", fg="red")
-        ok = False
-    if config_path().exists():
-        click.secho("Config present ✅", fg="green")
-    else:
-        click.secho(f"Config missing at {config_path()}", fg="yellow")
-    plist = Path.home() / "Library" / "LaunchAgents" / f"{LABEL}.plist"
-    if plist.exists():
-        click.secho("Plist present ✅", fg="green")
-    else:
-        click.secho("Plist missing ❌", fg="yellow")
-    if not ok:
-        sys.exit(1)
-    debug("doctor: completed checks")
+@click.option(
+    "-n", "--lines", type=click.IntRange(min=0), default=50, show_default=True, help="Lines to show"
+)
+@click.option("-f", "--follow", is_flag=True, help="Keep printing new records as they are written")
+def logs(lines: int, *, follow: bool) -> None:
+    """Show the log file written when BINGBONG_LOG_LEVEL is set."""
+    path = log_path()
+    if not path.exists() and not follow:
+        click.echo(f"No log file at {path}. Set BINGBONG_LOG_LEVEL=info (or debug) to write one.")
+        return
+    existed = path.exists()
+    if existed:
+        for line in tail(path, lines):
+            click.echo(line)
+    if follow:
+        _follow(path, from_end=existed)
+
+
+def _follow(path: Path, *, from_end: bool, interval: float = 0.5) -> None:
+    """Print lines appended to ``path``, reopening it after rotation, until interrupted."""
+    with contextlib.suppress(KeyboardInterrupt):
+        _print_appended(path, from_end=from_end, interval=interval)
+
+
+def _print_appended(path: Path, *, from_end: bool, interval: float) -> None:
+    f = None
+    ino = None
+    try:
+        while True:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                st = None
+            if st is not None and st.st_ino != ino:
+                if f is not None:
+                    f.close()
+                f = path.open(encoding="utf-8", errors="replace")
+                if ino is None and from_end:
+                    f.seek(0, os.SEEK_END)  # the tail is already printed
+                ino = st.st_ino
+            if f is not None:
+                for line in f.readlines():
+                    click.echo(line.rstrip("\n"))
+            time.sleep(interval)
+    finally:
+        if f is not None:
+            f.close()
 
 
 @cli.command()
@@ -272,33 +629,11 @@ def tick() -> None:
 
     Called by launchd at :00/:15/:30/:45.
     """
-    _require_darwin()
-    debug("tick: start")
-    if silence_active():
-        debug("tick: skipped (silenced)")
-        return
+    from bingbong.tick import tick_once  # noqa: PLC0415 - keeps the other commands light
 
-    cfg = Config.load()
-    now_local = datetime.now().astimezone()
-    debug(f"tick: now={now_local.isoformat()}")
-    if _quiet_hours_active(now_local):
-        debug("tick: skipped (quiet hours)")
-        return
-    pop_count, do_chime = compute_pop_count(now_local.minute, now_local.hour)
-    if pop_count == 0:
-        debug("tick: skipped (not a chime time)")
-        return
-    start_minute = now_local.minute
-    if do_chime:
-        debug("tick: playing chime")
-        play_once(cfg.chime_wav)
-        time.sleep(CHIME_DELAY)
-        if datetime.now().astimezone().minute != start_minute:
-            debug("tick: minute changed after chime; skipping pops to avoid drift")
-            return
-    debug(f"tick: playing {pop_count} pop(s)")
-    play_repeated(cfg.pop_wav, pop_count, delay=POP_DELAY)
-    debug("tick: done")
+    require_darwin()
+    debug("tick: start")
+    tick_once()
 
 
 def main() -> None:
@@ -0,0 +1,85 @@
+"""Injectable time source.
+
+Code that decides *when* things happen (ticks, silence, playback spacing, the
+tick lock) asks :func:`current` for the time instead of calling
+``datetime.now()``/``time.sleep()`` directly. Normally that is the system
+clock; tests and `bingbong simulate` install a :class:`SimulatedClock` with
+:func:`use` and move through days of schedule without waiting.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+__all__ = ["Clock", "SimulatedClock", "current", "use"]
+
+
+class Clock:
+    """The system clock."""
+
+    def now(self) -> datetime:  # noqa: PLR6301 - overridden by SimulatedClock
+        """Aware local wall-clock time."""
+        return datetime.now().astimezone()
+
+    def time(self) -> float:  # noqa: PLR6301 - overridden by SimulatedClock
+        return time.time()
+
+    def monotonic(self) -> float:  # noqa: PLR6301 - overridden by SimulatedClock
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:  # noqa: PLR6301 - overridden by SimulatedClock
+        time.sleep(seconds)
+
+
+class SimulatedClock(Clock):
+    """A clock that only moves when told to; ``sleep`` advances it instantly."""
+
+    def __init__(self, start: datetime | float) -> None:
+        self._time = start.timestamp() if isinstance(start, datetime) else float(start)
+        self._monotonic = 0.0
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._time).astimezone()
+
+    def time(self) -> float:
+        return self._time
+
+    def monotonic(self) -> float:
+        return self._monotonic
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(max(0.0, seconds))
+
+    def advance(self, seconds: float) -> None:
+        self._time += seconds
+        self._monotonic += seconds
+
+    def set(self, when: datetime | float) -> None:
+        """Jump to ``when``; the monotonic clock moves by the same amount (never backwards)."""
+        target = when.timestamp() if isinstance(when, datetime) else float(when)
+        self._monotonic += max(0.0, target - self._time)
+        self._time = target
+
+
+_state = SimpleNamespace(clock=Clock())
+
+
+def current() -> Clock:
+    return _state.clock
+
+
+@contextmanager
+def use(clock: Clock) -> Generator[Clock]:
+    """Make ``clock`` the current clock for the duration of the block."""
+    previous, _state.clock = _state.clock, clock
+    try:
+        yield clock
+    finally:
+        _state.clock = previous
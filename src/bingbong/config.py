@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+import fcntl
 import json
 import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from bingbong.log import debug, info, warning
+from bingbong.state import State, StateError, read, write
+from bingbong.watch import signature
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from bingbong.watch import Watcher
 
 APP_NAME = "bingbong"
 LABEL = "com.bingbong.chimes"  # change if you want a different launchd label
@@ -20,11 +32,22 @@ def app_support() -> Path:
     )
 
 
+def state_path() -> Path:
+    return app_support() / "state.bin"
+
+
 def config_path() -> Path:
+    """Legacy JSON config, migrated into :func:`state_path` on first read."""
     return app_support() / "config.json"
 
 
+def launch_agent_path() -> Path:
+    """Where launchd loads the job from unless ``install --plist-path`` chose another."""
+    return Path.home() / "Library" / "LaunchAgents" / f"{LABEL}.plist"
+
+
 def silence_path() -> Path:
+    """Legacy JSON silence file, migrated into :func:`state_path` on first read."""
     return app_support() / "silence_until.json"
 
 
@@ -39,46 +62,218 @@ __all__ = [
     "ConfigNotFoundError",
     "app_support",
     "config_path",
+    "invalidate_state_cache",
+    "launch_agent_path",
+    "load_state",
     "silence_path",
+    "state_path",
+    "update_state",
+    "watch_state",
 ]
 
+# Last state read by this process, keyed by the file's path and stat signature.
+# While a watcher runs, the signature check is skipped until it reports a change.
+_cache = SimpleNamespace(path=None, signature=None, state=None, generation=0, watched=False)
+
+
+@contextmanager
+def _state_lock() -> Generator[None]:
+    """Serialise read-modify-write cycles; readers never need the lock."""
+    app_dir = app_support()
+    app_dir.mkdir(parents=True, exist_ok=True)
+    with (app_dir / "state.lock").open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        warning("legacy %s unreadable or corrupt; ignoring", path.name)
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _migrate() -> State:
+    """Fold the legacy JSON files into a fresh state file (must hold the lock)."""
+    state = State()
+    migrated = []
+    cfg = _read_json(config_path())
+    if cfg and "chime_wav" in cfg and "pop_wav" in cfg:
+        state = state.replace(
+            chime_wav=Path(cfg["chime_wav"]),
+            pop_wav=Path(cfg["pop_wav"]),
+            config_version=int(cfg.get("version", 1)),
+        )
+        migrated.append(config_path())
+    silence = _read_json(silence_path())
+    if silence and isinstance(silence.get("until_epoch"), (int, float)):
+        state = state.replace(silence_until=float(silence["until_epoch"]))
+        migrated.append(silence_path())
+    if not migrated:
+        return state
+    state = _write_state(state)
+    for path in migrated:
+        path.replace(path.with_name(f"{path.name}.migrated"))
+    info("migrated legacy files into %s", state_path().name, files=",".join(p.name for p in migrated))
+    return state
+
+
+def invalidate_state_cache() -> None:
+    _cache.generation += 1
+    _cache.path = _cache.signature = _cache.state = None
+
+
+def _remember(path: Path, sig: tuple[int, int, int] | None, state: State | None, generation: int) -> None:
+    # A change reported while we were reading makes what we read suspect.
+    if generation == _cache.generation:
+        _cache.path, _cache.signature, _cache.state = path, sig, state
+
+
+def _read_stored() -> State | None:
+    """Return the stored state, or None without a state file.
+
+    Raises :class:`OSError` or :class:`~bingbong.state.StateError` when the
+    file cannot be read or is corrupt.
+    """
+    path = state_path()
+    if _cache.watched and _cache.state is not None and _cache.path == path:
+        return _cache.state
+    generation = _cache.generation
+    sig = signature(path)
+    if sig is None:
+        return None
+    if sig == _cache.signature and _cache.path == path:
+        return _cache.state
+    state = read(path)
+    _remember(path, sig, state, generation)
+    return state
+
+
+def _read_state() -> State | None:
+    """Like :func:`_read_stored`, for readers: a bad file reads as the defaults."""
+    try:
+        return _read_stored()
+    except (OSError, StateError) as e:
+        warning("state file unreadable (%s); ignoring", e)
+        return State()
+
+
+def _set_aside(error: OSError | StateError) -> State:
+    """Move a corrupt state file out of the way so a write cannot destroy it (must hold the lock)."""
+    path = state_path()
+    corrupt = path.with_name(f"{path.name}.corrupt")
+    path.replace(corrupt)
+    invalidate_state_cache()
+    warning("state file unreadable (%s); moved to %s, starting from defaults", error, corrupt.name)
+    return State()
+
+
+def _write_state(state: State) -> State:
+    generation = _cache.generation
+    path = state_path()
+    written = write(path, state)
+    _remember(path, signature(path), written, generation)
+    return written
+
+
+def load_state() -> State:
+    """Return the current state.
+
+    Costs one ``stat`` when the file is unchanged since the last call (nothing
+    at all under :func:`watch_state`), otherwise one open and one small read.
+    Without a state file nothing is written unless there are legacy files to
+    migrate, so read-only commands leave the disk alone.
+    """
+    state = _read_state()
+    if state is not None:
+        return state
+    if not (config_path().exists() or silence_path().exists()):
+        return State()
+    with _state_lock():
+        return _read_state() or _migrate()
+
+
+def update_state(**changes: Any) -> State:
+    """Atomically apply ``changes`` to the stored state and return the result.
+
+    A state file that cannot be read is never overwritten: it is kept as
+    ``state.bin.corrupt`` and the changes apply to the defaults.
+    """
+    with _state_lock():
+        try:
+            current = _read_stored() or _migrate()
+        except (OSError, StateError) as e:
+            current = _set_aside(e)
+        return _write_state(current.replace(**changes))
+
+
+@contextmanager
+def watch_state() -> Generator[Watcher]:
+    """Trust the cached state until the file is seen to change.
+
+    Meant for long-lived processes: reads become free, and edits made by other
+    processes (``silence``, ``resume``, ``install``) are picked up right away.
+    """
+    from bingbong.watch import Watcher  # noqa: PLC0415
+
+    def on_change() -> None:
+        # Our own writes (e.g. `silence` served over the control socket) already
+        # updated the cache; only a file we did not write needs a re-read. The
+        # lock lets a write in progress remember what it wrote first.
+        with _state_lock():
+            if _cache.signature is not None and signature(state_path()) == _cache.signature:
+                debug("state file changed by this process; cache kept")
+                return
+        debug("state file changed; cache invalidated")
+        invalidate_state_cache()
+
+    with Watcher(state_path(), on_change) as watcher:
+        _cache.watched = True
+        try:
+            yield watcher
+        finally:
+            _cache.watched = False
+            invalidate_state_cache()
+
 
 @dataclass(slots=True)
 class Config:
     chime_wav: Path
     pop_wav: Path
     version: int = 1
+    quiet_hours: tuple[int, int] | None = None  # minutes of day, [start, end)
+    rules: tuple[str, ...] | None = None  # chime rules (see bingbong.pattern); None: quarter hours
+    player_latency: float = 0.0  # measured by `bingbong bench`; not written by save()
+    helper_latency: float = 0.0  # likewise
 
     @staticmethod
-    def load() -> Config:
-        cfg_path = config_path()
-        if not cfg_path.exists():
-            msg = f"Missing config at {cfg_path}."
-            raise ConfigNotFoundError(msg)
-        data: Any = json.loads(cfg_path.read_text(encoding="utf-8"))
-        if not isinstance(data, dict):
-            msg = f"Invalid config structure in {cfg_path}"
+    def load(state: State | None = None) -> Config:
+        state = state or load_state()
+        if state.chime_wav is None or state.pop_wav is None:
+            msg = f"Missing config at {state_path()}."
             raise ConfigNotFoundError(msg)
-        try:
-            chime = Path(data["chime_wav"])
-            pop = Path(data["pop_wav"])
-        except KeyError as e:  # pragma: no cover - defensive
-            msg = f"Missing key in config: {e.args[0]}"
-            raise ConfigNotFoundError(msg) from e
-        version = int(data.get("version", 1))
-        return Config(chime_wav=chime, pop_wav=pop, version=version)
+        return Config(
+            chime_wav=state.chime_wav,
+            pop_wav=state.pop_wav,
+            version=state.config_version,
+            quiet_hours=state.quiet_hours,
+            rules=state.rules,
+            player_latency=state.player_latency or 0.0,
+            helper_latency=state.helper_latency or 0.0,
+        )
 
     def save(self) -> None:
-        app_dir = app_support()
-        app_dir.mkdir(parents=True, exist_ok=True)
-        config_path().write_text(
-            json.dumps(
-                {
-                    "chime_wav": str(self.chime_wav),
-                    "pop_wav": str(self.pop_wav),
-                    "version": self.version,
-                },
-                indent=2,
-            ),
-            encoding="utf-8",
+        update_state(
+            chime_wav=self.chime_wav,
+            pop_wav=self.pop_wav,
+            config_version=self.version,
+            quiet_hours=self.quiet_hours,
+            rules=self.rules,
         )
@@ -5,10 +5,23 @@ QUARTER_3 = 45
 CHIME_DELAY = 0.25
 POP_DELAY = 0.18
 
+QUARTER_INTERVAL = (QUARTER_2 - QUARTER_1) * 60  # seconds between the default ticks
+# Playback a tick has not finished this long after it started is dropped (the
+# players killed), so one stuck player can never hold up the next tick.
+TICK_BUDGET = QUARTER_INTERVAL / 15
+# A player may run this much longer than its sound before it is killed.
+PLAYER_GRACE = 5.0
+# A failed single-file playback is tried this many more times.
+PLAYER_RETRIES = 1
+
 __all__ = [
     "CHIME_DELAY",
+    "PLAYER_GRACE",
+    "PLAYER_RETRIES",
     "POP_DELAY",
     "QUARTER_1",
     "QUARTER_2",
     "QUARTER_3",
+    "QUARTER_INTERVAL",
+    "TICK_BUDGET",
 ]
@@ -0,0 +1,154 @@
+"""Control socket between CLI commands and the resident process.
+
+While `bingbong run` is up it listens on ``app_support()/control.sock`` and
+serves ``silence``, ``resume``, ``status`` and ``next`` from the state it
+already holds in memory, so those commands answer at once and the resident
+loop learns about silence changes without re-reading the state file. With no
+resident process (or one that does not answer) :func:`request` returns None
+and the commands fall back to the state file, which launchd-run ticks read.
+
+The protocol is one JSON object per line: the client sends
+``{"cmd": name, ...arguments}`` and reads back ``{"ok": true, ...result}`` or
+``{"ok": false, "error": message}``, then the connection closes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from bingbong.config import app_support
+from bingbong.log import debug, info, warning
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Mapping
+    from pathlib import Path
+
+__all__ = ["TIMEOUT", "ControlError", "Handler", "close", "request", "serve", "socket_path"]
+
+# A resident process that takes longer than this to answer is treated as absent.
+TIMEOUT = 2.0
+_MAX_LINE = 64 * 1024
+
+type Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+class ControlError(RuntimeError):
+    """Raised when the resident process rejects a request."""
+
+
+def socket_path() -> Path:
+    return app_support() / "control.sock"
+
+
+def request(cmd: str, *, timeout: float = TIMEOUT, **args: Any) -> dict[str, Any] | None:
+    """Send ``cmd`` to the resident process; None when none is listening.
+
+    Raises :class:`ControlError` when it answers with an error.
+    """
+    path = socket_path()
+    if not path.exists():
+        return None
+    try:
+        line = _exchange(path, json.dumps({"cmd": cmd, **args}).encode() + b"\n", timeout)
+    except (ConnectionRefusedError, FileNotFoundError):
+        debug("control: no resident process", path=path)
+        return None
+    except OSError as e:  # timeouts included
+        warning("control: resident process not answering (%s); using the state file", e)
+        return None
+    try:
+        reply = json.loads(line)
+    except ValueError:
+        warning("control: unreadable reply to %s; using the state file", cmd)
+        return None
+    if not reply.get("ok"):
+        raise ControlError(reply.get("error") or "request failed")
+    debug("control: %s answered by resident process", cmd)
+    return reply
+
+
+def _exchange(path: Path, payload: bytes, timeout: float) -> bytes:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(payload)
+        with sock.makefile("rb") as f:
+            return f.readline(_MAX_LINE)
+
+
+def _alive(path: Path) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(TIMEOUT)
+            sock.connect(str(path))
+    except OSError:
+        return False
+    return True
+
+
+async def serve(handlers: Mapping[str, Handler]) -> asyncio.AbstractServer | None:
+    """Start answering requests on the control socket; None when it cannot be used.
+
+    Handlers run in a worker thread and return the fields of the reply; they
+    raise ``ValueError`` (or ``KeyError``/``TypeError`` for missing or wrong
+    arguments) to send an error back.
+    """
+    import asyncio  # noqa: PLC0415 - keep asyncio off the tick path
+
+    path = socket_path()
+    if path.exists():
+        if _alive(path):
+            warning("control: another resident process owns %s; not serving", path)
+            return None
+        path.unlink()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            reply = await _answer(handlers, await asyncio.wait_for(reader.readline(), TIMEOUT))
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+        except (OSError, TimeoutError, ValueError) as e:
+            debug("control: dropped connection (%s)", e)
+        finally:
+            writer.close()
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        server = await asyncio.start_unix_server(handle, path=str(path), limit=_MAX_LINE)
+        path.chmod(0o600)
+    except OSError as e:
+        warning("control: cannot listen on %s (%s)", path, e)
+        return None
+    info("control: listening", path=path, pid=os.getpid())
+    return server
+
+
+async def _answer(handlers: Mapping[str, Handler], line: bytes) -> dict[str, Any]:
+    import asyncio  # noqa: PLC0415 - keep asyncio off the tick path
+
+    try:
+        args = json.loads(line)
+        cmd = args.pop("cmd")
+        handler = handlers[cmd]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return {"ok": False, "error": f"bad request {line[:80]!r}"}
+    try:
+        result = await asyncio.to_thread(handler, args)
+    except (ValueError, KeyError, TypeError) as e:
+        return {"ok": False, "error": f"{cmd}: {e}"}
+    debug("control: served %s", cmd)
+    return {"ok": True, **result}
+
+
+async def close(server: asyncio.AbstractServer | None) -> None:
+    """Stop serving and remove the socket."""
+    if server is None:
+        return
+    server.close()
+    await server.wait_closed()
+    socket_path().unlink(missing_ok=True)
@@ -1,59 +1,153 @@
 from __future__ import annotations
 
-import json
+import os
+import sys
 from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
 
-from bingbong.config import app_support, silence_path
+import click
+
+from bingbong import clock
+from bingbong.config import load_state, update_state
 from bingbong.constants import QUARTER_1, QUARTER_2, QUARTER_3
-from bingbong.log import debug
+from bingbong.log import debug, info
+from bingbong.pattern import PatternError, compile_rules
+
+if TYPE_CHECKING:
+    from bingbong.pattern import Pattern
+    from bingbong.state import State
 
 __all__ = [
+    "clear_silence",
     "compute_pop_count",
+    "effective_quiet_hours",
+    "format_quiet_hours",
     "get_silence_until",
+    "in_quiet_window",
+    "parse_quiet_hours",
+    "parse_quiet_hours_option",
+    "parse_rules_option",
+    "quiet_hours_active",
+    "require_darwin",
+    "scheduled_silence",
     "set_silence_for",
     "silence_active",
 ]
 
 
-def get_silence_until() -> datetime | None:
-    path = silence_path()
-    if not path.exists():
-        debug("silence file not found")
-        return None
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        ts = data.get("until_epoch")
-        if isinstance(ts, (int, float)):
-            until = datetime.fromtimestamp(ts, tz=UTC)
-            debug(f"silence until loaded: {until.isoformat()}")
-            return until
-
-    except (OSError, ValueError, json.JSONDecodeError):
-        # Corrupt file or unreadable — ignore it.
-        debug("silence file unreadable or corrupt; ignoring")
+def require_darwin() -> None:
+    if sys.platform != "darwin":
+        click.secho("[bingbong] macOS (Darwin) only", fg="red", err=True)
+        sys.exit(1)
+
+
+def get_silence_until(state: State | None = None) -> datetime | None:
+    """Return the end of the active silence, if any; pass ``state`` to avoid a re-read."""
+    ts = (state or load_state()).silence_until
+    if ts is None:
+        debug("silence not set")
         return None
-    return None
+    until = datetime.fromtimestamp(ts, tz=UTC)
+    debug("silence until loaded", until=until)
+    return until
 
 
 def set_silence_for(minutes: int) -> datetime:
-    app_dir = app_support()
-    app_dir.mkdir(parents=True, exist_ok=True)
-    until = datetime.now(UTC) + timedelta(minutes=minutes)
-
-    silence_path().write_text(json.dumps({"until_epoch": until.timestamp()}, indent=2), encoding="utf-8")
-    debug(f"silence set for {minutes} minutes (until {until.isoformat()})")
+    until = clock.current().now().astimezone(UTC) + timedelta(minutes=minutes)
+    update_state(silence_until=until.timestamp())
+    info("silence set", minutes=minutes, until=until)
     return until
 
 
-def silence_active(now: datetime | None = None) -> bool:
-    until = get_silence_until()
-    if not until:
-        debug("silence inactive")
+def clear_silence() -> None:
+    update_state(silence_until=None)
+    info("silence cleared")
+
+
+def silence_active(now: datetime | None = None, *, state: State | None = None) -> bool:
+    """Whether ``now`` is silenced, by ``bingbong silence`` or the silence calendar."""
+    state = state or load_state()
+    now = now or clock.current().now()
+    until = get_silence_until(state)
+    if until and now < until:
+        debug("silence check", active=True, now=now, until=until)
+        return True
+    scheduled = None
+    if state.calendar:
+        from bingbong import silences  # noqa: PLC0415 - only with a calendar
+
+        scheduled = silences.silenced_until(now.timestamp(), state.calendar)
+    debug("silence check", active=scheduled is not None, now=now, until=until, scheduled=scheduled)
+    return scheduled is not None
+
+
+def scheduled_silence(ts: float, state: State) -> tuple[float | None, tuple[float, float] | None]:
+    """Return the end of the calendar silence at ``ts`` (if any) and the next one within a week."""
+    from bingbong import silences  # noqa: PLC0415 - keeps `tick` light
+
+    index = silences.index_for(state.calendar, ts)
+    return index.silenced_until(ts), next(index.overlapping(ts, index.hi), None)
+
+
+def parse_quiet_hours(spec: str) -> tuple[int, int]:
+    """Parse ``HH:MM-HH:MM`` into minutes of day; raises ValueError."""
+    start_s, end_s = spec.split("-")
+    start = datetime.strptime(start_s.strip(), "%H:%M")  # noqa: DTZ007
+    end = datetime.strptime(end_s.strip(), "%H:%M")  # noqa: DTZ007
+    return start.hour * 60 + start.minute, end.hour * 60 + end.minute
+
+
+def parse_quiet_hours_option(
+    _ctx: click.Context, _param: click.Parameter, value: str | None
+) -> tuple[int, int] | None:
+    if value is None:
+        return None
+    try:
+        return parse_quiet_hours(value)
+    except ValueError as e:
+        msg = "use HH:MM-HH:MM, e.g. 22:00-07:00"
+        raise click.BadParameter(msg) from e
+
+
+def parse_rules_option(_ctx: click.Context, _param: click.Parameter, value: tuple[str, ...]) -> Pattern:
+    try:
+        return compile_rules(value or None)
+    except PatternError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def format_quiet_hours(window: tuple[int, int]) -> str:
+    start, end = window
+    return f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+
+def effective_quiet_hours(configured: tuple[int, int] | None) -> tuple[int, int] | None:
+    """``BINGBONG_QUIET_HOURS`` wins over the stored window; an invalid value disables quiet hours."""
+    spec = os.environ.get("BINGBONG_QUIET_HOURS")
+    if not spec:
+        return configured
+    try:
+        return parse_quiet_hours(spec)
+    except ValueError:
+        return None
+
+
+def quiet_hours_active(now: datetime, window: tuple[int, int] | None) -> bool:
+    """Whether ``now`` falls in ``window``; windows may wrap past midnight."""
+    return in_quiet_window(now.hour * 60 + now.minute, window)
+
+
+def in_quiet_window(minute_of_day: int, window: tuple[int, int] | None) -> bool:
+    if window is None:
         return False
-    now = now or datetime.now(UTC)
-    active = now < until
-    debug(f"silence active? {active} (now={now.isoformat()} until={until.isoformat()})")
-    return active
+    start, end = window
+    t = minute_of_day
+    if start <= end:
+        return start <= t < end
+    return t >= start or t < end
+
+
+_QUARTER_POPS = {QUARTER_1: 1, QUARTER_2: 2, QUARTER_3: 3}
 
 
 def compute_pop_count(minute: int, hour_24: int) -> tuple[int, bool]:
@@ -65,12 +159,6 @@ def compute_pop_count(minute: int, hour_24: int) -> tuple[int, bool]:
     - :15 -> 1 pop, :30 -> 2 pops, :45 -> 3 pops.
     - Otherwise -> (0, False).
     """
-    quarter_map = {
-        0: (hour_24 % 12 or 12, True),
-        QUARTER_1: (1, False),
-        QUARTER_2: (2, False),
-        QUARTER_3: (3, False),
-    }
-    res = quarter_map.get(minute, (0, False))
-    debug(f"compute_pop_count(minute={minute}, hour={hour_24}) -> {res}")
+    res = (hour_24 % 12 or 12, True) if minute == 0 else (_QUARTER_POPS.get(minute, 0), False)
+    debug("compute_pop_count(minute=%d, hour=%d) -> %s", minute, hour_24, res)
     return res
@@ -0,0 +1,240 @@
+"""Resident scheduler used by `bingbong run`.
+
+Instead of launchd spawning a fresh interpreter for every chime time, a single
+process sleeps until the next minute the chime rules use and invokes the tick
+callback in-process. While it runs it also answers `silence`, `resume`,
+`status` and `next` over the control socket (see :mod:`bingbong.control`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import click
+
+from bingbong import clock, control, dayplan, prerender
+from bingbong.config import Config, ConfigNotFoundError, load_state, watch_state
+from bingbong.constants import QUARTER_1, QUARTER_2, QUARTER_3
+from bingbong.core import clear_silence, require_darwin, scheduled_silence, set_silence_for
+from bingbong.log import debug, info, warning
+from bingbong.mixer import MixError
+from bingbong.pattern import compile_rules
+from bingbong.player import PlayerError, PlayerHelper
+from bingbong.tick import tick_once
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+
+__all__ = [
+    "CONTROL_HANDLERS",
+    "MAX_SLEEP",
+    "STALE_AFTER",
+    "next_boundary",
+    "run",
+    "run_forever",
+    "run_loop",
+]
+
+# Never sleep longer than this in one go: the monotonic clock stops while the
+# machine sleeps, so we re-check wall time regularly to notice wake-ups.
+MAX_SLEEP = 30.0
+# A boundary we reach later than this (e.g. after sleep/wake) is skipped.
+STALE_AFTER = 60.0
+QUARTERS = (0, QUARTER_1, QUARTER_2, QUARTER_3)
+
+
+def _local_now() -> datetime:
+    return clock.current().now()
+
+
+def next_boundary(now: datetime, minutes: Sequence[int] = QUARTERS) -> datetime:
+    """Return the first boundary strictly after ``now`` at one of ``minutes`` past the hour."""
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    later = [m for m in minutes if m > now.minute]
+    if later:
+        return hour_start + timedelta(minutes=min(later))
+    return hour_start + timedelta(hours=1, minutes=min(minutes, default=0))
+
+
+async def run_loop(
+    on_tick: Callable[[], None],
+    *,
+    clock: Callable[[], datetime] = _local_now,
+    stop: asyncio.Event | None = None,
+    minutes: Callable[[], Sequence[int]] = lambda: QUARTERS,
+    lead: Callable[[], float] = lambda: 0.0,
+) -> None:
+    """Call ``on_tick`` ``lead()`` seconds before every boundary in ``minutes()`` until ``stop`` is set.
+
+    ``minutes`` and ``lead`` are re-read for every boundary so rule changes and
+    a new `bingbong bench` calibration apply without a restart.
+    """
+    stop = stop or asyncio.Event()
+    last = None
+    while not stop.is_set():
+        target = next_boundary(clock(), minutes())
+        if target == last:  # woke early for it and it has been played
+            target = next_boundary(target, minutes())
+        wake = target - timedelta(seconds=lead())
+        debug("run: sleeping", until=wake, boundary=target)
+        while (remaining := (wake - clock()).total_seconds()) > 0:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=min(remaining, MAX_SLEEP))
+            except TimeoutError:
+                continue
+            debug("run: stop requested")
+            return
+        last = target
+        late = -remaining
+        if late > STALE_AFTER:
+            warning("run: skipped stale boundary", boundary=target, late_s=late)
+            continue
+        debug("run: boundary reached", boundary=target, late_ms=late * 1000)
+        # Playback blocks; keep it off the event loop so stop requests stay responsive.
+        await asyncio.to_thread(on_tick)
+
+
+def run_forever(
+    on_tick: Callable[[], None],
+    minutes: Callable[[], Sequence[int]] = lambda: QUARTERS,
+    handlers: Mapping[str, control.Handler] | None = None,
+    lead: Callable[[], float] = lambda: 0.0,
+) -> None:
+    """Run the resident loop until interrupted, answering ``handlers`` on the control socket."""
+    try:
+        asyncio.run(_serve_and_run(on_tick, minutes, handlers, lead))
+    except KeyboardInterrupt:
+        debug("run: interrupted")
+
+
+async def _serve_and_run(
+    on_tick: Callable[[], None],
+    minutes: Callable[[], Sequence[int]],
+    handlers: Mapping[str, control.Handler] | None,
+    lead: Callable[[], float],
+) -> None:
+    server = await control.serve(handlers) if handlers else None
+    try:
+        await run_loop(on_tick, minutes=minutes, lead=lead)
+    finally:
+        await control.close(server)
+
+
+def _upcoming(count: int) -> list[tuple[float, int, int]]:
+    now = clock.current().now()
+    return [(when.timestamp(), s.chimes, s.pops) for when, s in dayplan.upcoming(now, load_state(), count)]
+
+
+def _serve_silence(args: dict[str, Any]) -> dict[str, Any]:
+    minutes = int(args["minutes"])
+    if minutes <= 0:
+        msg = "minutes must be > 0"
+        raise ValueError(msg)
+    return {"until": set_silence_for(minutes).timestamp()}
+
+
+def _serve_resume(_args: dict[str, Any]) -> dict[str, Any]:
+    clear_silence()
+    return {}
+
+
+def _serve_status(args: dict[str, Any]) -> dict[str, Any]:
+    state = load_state()
+    now = clock.current().time()
+    calendar_until, calendar_next = scheduled_silence(now, state) if state.calendar else (None, None)
+    return {
+        "pid": os.getpid(),
+        "silence_until": state.silence_until,
+        "calendar_until": calendar_until,
+        "calendar_next": calendar_next,
+        "next": _upcoming(int(args.get("count", 4))) if state.has_config else [],
+    }
+
+
+def _serve_next(args: dict[str, Any]) -> dict[str, Any]:
+    return {"next": _upcoming(int(args.get("count", 4)))}
+
+
+# Served from the state this process holds (see config.watch_state); writes go
+# through the state file so launchd ticks and a restarted process see them.
+CONTROL_HANDLERS: dict[str, control.Handler] = {
+    "next": _serve_next,
+    "resume": _serve_resume,
+    "silence": _serve_silence,
+    "status": _serve_status,
+}
+
+
+def _ensure_sequences(cfg: Config) -> None:
+    """Make sure every tick can be served from the pre-rendered cache."""
+    strikes = compile_rules(cfg.rules).strikes
+    if all(prerender.lookup(cfg.chime_wav, cfg.pop_wav, s.pops, chimes=s.chimes) for s in strikes if s):
+        return
+    try:
+        prerender.build(cfg.chime_wav, cfg.pop_wav, strikes)
+    except MixError as e:
+        warning("run: cannot pre-render sequences (%s); ticks will mix live", e)
+
+
+def _start_helper() -> PlayerHelper | None:
+    helper = PlayerHelper()
+    try:
+        helper.ping()
+    except (PlayerError, OSError) as e:
+        warning("run: player helper unavailable (%s); spawning the player per tick", e)
+        helper.close()
+        return None
+    return helper
+
+
+def _resident_tick(player: PlayerHelper | None) -> None:
+    """Tick with the cached state; config edits since the last tick take effect now."""
+    try:
+        cfg = Config.load()
+    except ConfigNotFoundError as e:
+        warning("run: %s skipping tick", e)
+        return
+    _ensure_sequences(cfg)
+    tick_once(cfg, player)
+
+
+def _rule_minutes() -> tuple[int, ...]:
+    try:
+        rules = Config.load().rules
+    except ConfigNotFoundError:
+        rules = None
+    return compile_rules(rules).minutes()
+
+
+def _helper_latency() -> float:
+    return load_state().helper_latency or 0.0
+
+
+@click.command()
+@click.option("--no-helper", is_flag=True, help="Spawn the player per tick instead of keeping a warm helper")
+def run(*, no_helper: bool) -> None:
+    """Stay resident and tick at every chime time.
+
+    Started by launchd as a KeepAlive job when installed with `--resident`.
+    """
+    require_darwin()
+    try:
+        cfg = Config.load()
+    except ConfigNotFoundError as e:
+        click.echo(f"[bingbong] {e} Run: bingbong install ...", err=True)
+        sys.exit(1)
+    info("run: resident loop starting", chime=cfg.chime_wav, pop=cfg.pop_wav)
+    _ensure_sequences(cfg)
+    player = None if no_helper else _start_helper()
+    try:
+        with watch_state():
+            # Only the warm helper's time to first audio is known; without it ticks start on the boundary.
+            lead = _helper_latency if player is not None else lambda: 0.0
+            run_forever(lambda: _resident_tick(player), _rule_minutes, CONTROL_HANDLERS, lead)
+    finally:
+        if player is not None:
+            player.close()
@@ -0,0 +1,230 @@
+"""Compiled per-day plan: what to play at every minute of one local day.
+
+Slot ``i`` covers the minute starting ``i * 60`` seconds after local
+midnight, so DST days simply have 1380 or 1500 slots instead of 1440 and a
+lookup is ``(ts - start) // 60``. Each slot is one byte indexing the plan's
+distinct strikes (see :mod:`bingbong.pattern`); zero means nothing plays (no
+rule selects the minute, quiet hours, or silenced).
+
+A plan depends on the local day and time zone, the chime rules, the stored quiet hours,
+silence and silence calendar, and any ``BINGBONG_QUIET_HOURS`` override. The current one is cached
+in memory and in ``app_support()/dayplan.bin`` and rebuilt when any of those
+change.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from time import localtime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from bingbong.config import app_support
+from bingbong.core import effective_quiet_hours, in_quiet_window
+from bingbong.log import debug, warning
+from bingbong.pattern import NOTHING, Strike, compile_rules, rules_digest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from bingbong.state import State
+
+__all__ = ["FORMAT_VERSION", "DayPlan", "compile_day", "plan_for", "plan_path", "upcoming"]
+
+FORMAT_VERSION = 2
+_MAGIC = b"BBDP"
+_HEADER = struct.Struct("<4sHqqHB")
+
+MINUTES_PER_DAY = 24 * 60
+
+# ``key`` memoises the last (state, env override, plan key) so repeated lookups
+# against the same state object skip rebuilding the key.
+_cache = SimpleNamespace(plan=None, key=None)
+
+
+def plan_path() -> Path:
+    return app_support() / "dayplan.bin"
+
+
+@dataclass(slots=True, frozen=True)
+class DayPlan:
+    start: int  # epoch seconds of local midnight
+    end: int  # epoch seconds of the next local midnight
+    key: str
+    strikes: tuple[Strike, ...]  # index 0 is NOTHING
+    slots: bytes
+
+    def covers(self, ts: float) -> bool:
+        return self.start <= ts < self.end
+
+    def entry_at(self, ts: float) -> Strike:
+        """Return what plays in the minute containing ``ts``."""
+        i = (int(ts) - self.start) // 60
+        if not 0 <= i < len(self.slots):
+            return NOTHING
+        return self.strikes[self.slots[i]]
+
+    def encode(self) -> bytes:
+        key = self.key.encode()
+        header = _HEADER.pack(_MAGIC, FORMAT_VERSION, self.start, self.end, len(key), len(self.strikes))
+        strikes = bytes(n for strike in self.strikes for n in strike)
+        return header + key + strikes + self.slots
+
+    @staticmethod
+    def decode(data: bytes) -> DayPlan | None:
+        if len(data) < _HEADER.size:
+            return None
+        magic, fmt, start, end, key_len, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or fmt != FORMAT_VERSION:
+            return None
+        key_end = _HEADER.size + key_len
+        strikes_end = key_end + 2 * count
+        raw = data[key_end:strikes_end]
+        slots = data[strikes_end:]
+        if len(slots) != (end - start) // 60 or len(raw) != 2 * count or (slots and max(slots) >= count):
+            return None
+        strikes = tuple(Strike(raw[i], raw[i + 1]) for i in range(0, len(raw), 2))
+        return DayPlan(start, end, data[_HEADER.size : key_end].decode(), strikes, slots)
+
+
+def _midnight(day: datetime) -> datetime:
+    """Local midnight of ``day``'s date, with the offset in force at midnight."""
+    return datetime.combine(day.date(), time()).astimezone()
+
+
+def _zone(start: int) -> str:
+    """Return the time zone name and UTC offset in force at local midnight ``start``."""
+    midnight = localtime(start)
+    return f"{midnight.tm_zone}{midnight.tm_gmtoff:+d}"
+
+
+def _plan_key(state: State) -> str:
+    quiet_env = os.environ.get("BINGBONG_QUIET_HOURS", "")
+    memo = _cache.key
+    if memo is not None and memo[0] is state and memo[1] == quiet_env:
+        return memo[2]
+    key = f"{state.silence_until}|{state.quiet_hours}|{quiet_env}|{rules_digest(state.rules)}"
+    key += f"|{state.calendar:08x}"
+    _cache.key = (state, quiet_env, key)
+    return key
+
+
+def _clear_window(slots: bytearray, window: tuple[int, int]) -> None:
+    """Zero the minutes of ``window`` in a 1440-slot day (same rule as ``in_quiet_window``)."""
+    start, end = window
+    if start <= end:
+        slots[start:end] = bytes(end - start)
+    else:
+        slots[start:] = bytes(len(slots) - start)
+        slots[:end] = bytes(end)
+
+
+def _clear_calendar(slots: bytearray, start: int, end: int, calendar: int) -> None:
+    """Zero the minutes the silence calendar silences between ``start`` and ``end``."""
+    from bingbong import silences  # noqa: PLC0415 - only with a calendar
+
+    for lo, hi in silences.index_for(calendar, start, end).overlapping(start, end):
+        first = max(0, math.ceil((lo - start) / 60))
+        last = min(len(slots), math.ceil((hi - start) / 60))
+        slots[first:last] = bytes(max(0, last - first))
+
+
+def compile_day(day: datetime, state: State, *, limits: bool = True) -> DayPlan:
+    """Build the plan for the local day containing ``day``.
+
+    With ``limits=False`` quiet hours, silence and the silence calendar are
+    ignored: the plan holds everything the rules alone schedule.
+    """
+    start = int(_midnight(day).timestamp())
+    end = int(_midnight(day + timedelta(days=1)).timestamp())
+    pattern = compile_rules(state.rules)
+    quiet = effective_quiet_hours(state.quiet_hours) if limits else None
+    silence_until = (state.silence_until or 0.0) if limits else 0.0
+    table = pattern.table
+    count = (end - start) // 60
+    first = min(count, max(0, math.ceil((silence_until - start) / 60)))  # first minute not silenced
+    midnight, last = localtime(start), localtime(end - 60)
+    if count == MINUTES_PER_DAY and midnight.tm_gmtoff == last.tm_gmtoff:
+        # No offset change today: slot i is wall-clock minute i, so copy the weekday's row.
+        row = midnight.tm_wday * MINUTES_PER_DAY
+        slots = bytearray(table[row : row + MINUTES_PER_DAY])
+        if quiet is not None:
+            _clear_window(slots, quiet)
+        slots[:first] = bytes(first)
+    else:
+        slots = bytearray(count)
+        for i in range(first, count):
+            wall = localtime(start + i * 60)
+            minute_of_day = wall.tm_hour * 60 + wall.tm_min
+            if not in_quiet_window(minute_of_day, quiet):
+                slots[i] = table[wall.tm_wday * MINUTES_PER_DAY + minute_of_day]
+    if limits and state.calendar:
+        _clear_calendar(slots, start, end, state.calendar)
+    return DayPlan(start, end, f"{_plan_key(state)}|{_zone(start)}", pattern.strikes, bytes(slots))
+
+
+def _read_plan() -> DayPlan | None:
+    try:
+        with plan_path().open("rb") as f:
+            return DayPlan.decode(f.read())
+    except OSError:
+        return None
+
+
+def _write_plan(plan: DayPlan) -> None:
+    path = plan_path()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(plan.encode())
+        tmp.replace(path)
+    except OSError as e:
+        warning("dayplan: cannot cache plan (%s)", e)
+
+
+def plan_for(now: datetime, state: State, *, persist: bool = True) -> DayPlan:
+    """Return the plan covering ``now``, from memory, disk, or freshly compiled.
+
+    ``persist=False`` keeps ``dayplan.bin`` out of it (e.g. for simulated days).
+    """
+    # A plan compiled in another time zone starts at another midnight; the zone
+    # in the key also catches a switch between zones that share an offset.
+    start = int(_midnight(now).timestamp())
+    key = f"{_plan_key(state)}|{_zone(start)}"
+
+    def fresh(plan: DayPlan | None) -> bool:
+        return plan is not None and plan.start == start and plan.key == key
+
+    plan = _cache.plan
+    if not fresh(plan) and persist:
+        plan = _read_plan()
+    if plan is None or not fresh(plan):
+        plan = compile_day(now, state)
+        debug("dayplan: compiled %d slots for %s", len(plan.slots), now.date(), key=key)
+        if persist:
+            _write_plan(plan)
+    _cache.plan = plan
+    return plan
+
+
+def upcoming(
+    now: datetime, state: State, count: int, *, max_days: int = 7
+) -> Iterator[tuple[datetime, Strike]]:
+    """Yield the next ``count`` ``(local_time, strike)`` entries after ``now``."""
+    plan = plan_for(now, state)
+    i = (int(now.timestamp()) - plan.start) // 60 + 1
+    for day in range(max_days):
+        if day:
+            plan = compile_day(datetime.fromtimestamp(plan.end).astimezone(), state)
+            i = 0
+        for j in range(max(i, 0), len(plan.slots)):
+            if plan.slots[j]:
+                yield datetime.fromtimestamp(plan.start + j * 60).astimezone(), plan.strikes[plan.slots[j]]
+                count -= 1
+                if count <= 0:
+                    return
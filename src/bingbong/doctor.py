@@ -0,0 +1,296 @@
+"""`bingbong doctor`: independent health checks run concurrently.
+
+Each check runs in its own worker thread with its own timeout, so a slow
+player probe or a launchd that does not answer costs its timeout once, not
+the sum of every check. A check returns a one-line description of what it
+verified, or raises :class:`CheckError`; an error that is not ``fatal`` (the
+service not being installed yet, say) is reported as a warning and does not
+change the exit status.
+"""
+
+from __future__ import annotations
+
+import os
+import plistlib
+import subprocess  # noqa: S404
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from importlib import resources
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+
+from bingbong import audio, silences
+from bingbong.config import LABEL, Config, ConfigNotFoundError, launch_agent_path, load_state, state_path
+from bingbong.core import effective_quiet_hours, require_darwin
+from bingbong.log import debug
+from bingbong.mixer import MixError, decode
+from bingbong.pattern import compile_rules
+from bingbong.preprocess import CANONICAL_CHANNELS, CANONICAL_RATE, MAX_DURATION
+from bingbong.profiling import span
+from bingbong.state import StateError, read
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+__all__ = ["Check", "CheckError", "Result", "checks", "doctor", "run_checks"]
+
+
+class CheckError(RuntimeError):
+    """Raised by a check that found something wrong; only ``fatal`` ones fail `doctor`."""
+
+    def __init__(self, msg: str, *, fatal: bool = True) -> None:
+        super().__init__(msg)
+        self.fatal = fatal
+
+
+@dataclass(slots=True, frozen=True)
+class Check:
+    """A named check; ``run`` gets the check's timeout and returns what it verified."""
+
+    name: str
+    run: Callable[[float], str]
+    timeout: float = 10.0
+
+
+@dataclass(slots=True, frozen=True)
+class Result:
+    name: str
+    status: str  # "ok", "warn" or "fail"
+    detail: str
+    seconds: float  # wall time of the check itself
+
+
+def _player(timeout: float) -> str:
+    player = audio.AFPLAY
+    if not player.exists() or not os.access(player, os.X_OK):
+        msg = f"player missing or not executable: {player}"
+        raise CheckError(msg)
+    probe = resources.files("bingbong.data") / "silence.wav"
+    try:
+        with resources.as_file(probe) as path:
+            result = subprocess.run(  # noqa: S603
+                [player, str(path)], capture_output=True, timeout=timeout, check=False
+            )
+    except subprocess.TimeoutExpired as e:
+        msg = f"{player} did not finish playing {probe.name} within {timeout:g}s"
+        raise CheckError(msg) from e
+    if result.returncode:
+        err = result.stderr.decode(errors="replace").strip()
+        msg = f"{player} failed on {probe.name} (exit {result.returncode}){': ' + err if err else ''}"
+        raise CheckError(msg)
+    return f"{player} played {probe.name}"
+
+
+def _sound(kind: str) -> Callable[[float], str]:
+    def check(_timeout: float) -> str:
+        try:
+            path = getattr(Config.load(), f"{kind}_wav")
+        except ConfigNotFoundError as e:
+            raise CheckError(str(e), fatal=False) from e
+        try:
+            pcm = decode(path)
+        except MixError as e:
+            raise CheckError(str(e)) from e
+        if not pcm.frames:
+            msg = f"{path} contains no audio"
+            raise CheckError(msg)
+        if pcm.duration > MAX_DURATION:
+            msg = f"{path} is too long ({pcm.duration:.1f}s > {MAX_DURATION:g}s)"
+            raise CheckError(msg)
+        detail = f"{path.name}: {pcm.duration:.2f}s, {pcm.rate} Hz, {pcm.channels} channel(s)"
+        if (pcm.rate, pcm.channels) != (CANONICAL_RATE, CANONICAL_CHANNELS):
+            detail += " (not preprocessed)"
+        return detail
+
+    return check
+
+
+def _state(_timeout: float) -> str:
+    path = state_path()
+    try:
+        state = read(path)
+    except (OSError, StateError) as e:
+        msg = f"{path} unreadable: {e}"
+        raise CheckError(msg) from e
+    if state is None or not state.has_config:
+        msg = f"config missing at {path}; run `bingbong install`"
+        raise CheckError(msg, fatal=False)
+    detail = f"{path.name} intact (seq {state.seq})"
+    calendar = silences.calendar_path()
+    try:
+        data = calendar.read_bytes()
+    except FileNotFoundError:
+        data = None
+    if data is not None:
+        try:
+            entries = silences.decode(data)
+        except silences.CalendarError as e:
+            msg = f"{calendar} unreadable: {e}"
+            raise CheckError(msg) from e
+        if state.calendar != (silences.digest(data) if entries else 0):
+            msg = f"{calendar.name} changed behind bingbong's back; re-run `bingbong calendar import`"
+            raise CheckError(msg, fatal=False)
+        detail += f", {len(entries)} scheduled silence(s)"
+    return detail
+
+
+def _entry_key(entry: dict[str, int]) -> frozenset[tuple[str, int]]:
+    return frozenset(entry.items())
+
+
+def _plist(plist: Path) -> Callable[[float], str]:
+    def check(_timeout: float) -> str:
+        try:
+            with plist.open("rb") as f:
+                data = plistlib.load(f)
+        except FileNotFoundError as e:
+            msg = f"{plist} missing; run `bingbong install`"
+            raise CheckError(msg, fatal=False) from e
+        except (OSError, plistlib.InvalidFileException, ValueError) as e:
+            msg = f"{plist} unreadable: {e}"
+            raise CheckError(msg) from e
+        args = data.get("ProgramArguments") or []
+        if not args or not Path(args[0]).exists():
+            program = args[0] if args else "nothing"
+            msg = f"{plist.name} runs {program!r}, which does not exist; re-run `bingbong install`"
+            raise CheckError(msg)
+        if args[-1] == "run":
+            if not data.get("KeepAlive"):
+                msg = f"{plist.name} starts `bingbong run` without KeepAlive"
+                raise CheckError(msg)
+            return f"{plist.name}: resident, kept alive"
+        # onginred (and pydantic under it) is slow to import; do it in this worker.
+        from bingbong.service import build_schedule  # noqa: PLC0415
+
+        state = load_state()
+        expected = (
+            build_schedule(effective_quiet_hours(state.quiet_hours), compile_rules(state.rules))
+            .to_plist_dict()
+            .get("StartCalendarInterval", [])
+        )
+        found = data.get("StartCalendarInterval") or []
+        if isinstance(found, dict):
+            found = [found]
+        if {_entry_key(e) for e in found} != {_entry_key(e) for e in expected}:
+            msg = (
+                f"{plist.name} schedule ({len(found)} entries) does not match the config "
+                f"({len(expected)}); re-run `bingbong install`"
+            )
+            raise CheckError(msg)
+        if not found:
+            return f"{plist.name}: no scheduled launches, as the config has no chime outside quiet hours"
+        return f"{plist.name}: {len(found)} calendar entries match the config"
+
+    return check
+
+
+def _launchd(timeout: float) -> str:
+    target = f"gui/{os.getuid()}/{LABEL}"
+    try:
+        result = subprocess.run(  # noqa: S603
+            ["/bin/launchctl", "print", target], capture_output=True, timeout=timeout, check=False
+        )
+    except FileNotFoundError as e:
+        msg = "launchctl not found"
+        raise CheckError(msg, fatal=False) from e
+    except subprocess.TimeoutExpired as e:
+        msg = f"launchctl did not answer within {timeout:g}s"
+        raise CheckError(msg) from e
+    if result.returncode:
+        msg = f"{LABEL} is not loaded; run `bingbong install`"
+        raise CheckError(msg, fatal=False)
+    return f"{LABEL} is loaded"
+
+
+def checks(plist: Path | None = None) -> list[Check]:
+    """Return the checks `doctor` runs, against ``plist`` (default: the LaunchAgents one)."""
+    return [
+        Check("player", _player, timeout=5.0),
+        Check("chime", _sound("chime")),
+        Check("pop", _sound("pop")),
+        Check("state", _state),
+        Check("plist", _plist(plist or launch_agent_path()), timeout=20.0),
+        Check("launchd", _launchd, timeout=5.0),
+    ]
+
+
+def _timed(check: Check, timeout: float) -> Result:
+    t0 = time.perf_counter()
+    try:
+        with span(f"doctor {check.name}"):
+            detail, status = check.run(timeout), "ok"
+    except CheckError as e:
+        detail, status = str(e), "fail" if e.fatal else "warn"
+    except Exception as e:  # noqa: BLE001 - a check that crashes has failed
+        detail, status = f"{type(e).__name__}: {e}", "fail"
+    return Result(check.name, status, detail, time.perf_counter() - t0)
+
+
+def _resolve(future: Future[Result], check: Check, timeout: float) -> None:
+    future.set_result(_timed(check, timeout))
+
+
+def run_checks(to_run: Sequence[Check], *, timeout: float | None = None) -> list[Result]:
+    """Run ``to_run`` concurrently; results come back in the same order.
+
+    ``timeout`` overrides each check's own. A check still running at its
+    deadline is reported as failed and left to finish in the background: it
+    runs in a daemon thread, so it does not keep the process from exiting.
+    """
+    started = time.perf_counter()
+    limits = [check.timeout if timeout is None else timeout for check in to_run]
+    futures: list[Future[Result]] = []
+    for check, limit in zip(to_run, limits, strict=True):
+        future: Future[Result] = Future()
+        threading.Thread(
+            target=_resolve,
+            args=(future, check, limit),
+            name=f"bingbong-doctor-{check.name}",
+            daemon=True,
+        ).start()
+        futures.append(future)
+    results = []
+    for check, limit, future in zip(to_run, limits, futures, strict=True):
+        try:
+            results.append(future.result(timeout=max(0.0, started + limit - time.perf_counter())))
+        except TimeoutError:
+            results.append(Result(check.name, "fail", f"no answer within {limit:g}s", limit))
+    return results
+
+
+_MARKS = {"ok": ("✅", "green"), "warn": ("⚠️ ", "yellow"), "fail": ("❌", "red")}
+
+
+@click.command()
+@click.option(
+    "--plist-path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Explicit plist path if you used one at install",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Seconds each check may take (default: per check, 5-20s)",
+)
+def doctor(plist_path: Path | None, timeout: float | None) -> None:
+    """Run player/sound/state/plist/launchd checks concurrently."""
+    require_darwin()
+    t0 = time.perf_counter()
+    results = run_checks(checks(plist_path), timeout=timeout)
+    elapsed = time.perf_counter() - t0
+    width = max(len(r.name) for r in results)
+    for r in results:
+        mark, colour = _MARKS[r.status]
+        click.secho(f"{mark} {r.name:<{width}}  {r.detail}  ({r.seconds * 1000:.0f} ms)", fg=colour)
+    total = sum(r.seconds for r in results)
+    click.echo(f"{len(results)} checks in {elapsed:.2f}s ({total:.2f}s of checking)")
+    debug("doctor: completed checks", elapsed=elapsed, failed=[r.name for r in results if r.status == "fail"])
+    if any(r.status == "fail" for r in results):
+        sys.exit(1)
@@ -0,0 +1,76 @@
+"""`bingbong history`: what past ticks decided, read from the tick journal."""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+
+from bingbong import clock, journal
+
+__all__ = ["history"]
+
+_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M"]
+_SHOW_LATE_MS = 1000  # lateness below this is launchd jitter, not worth a mention
+
+
+def _describe(record: journal.Record) -> str:
+    when = datetime.fromtimestamp(record.boundary).astimezone().strftime("%a %Y-%m-%d %H:%M")
+    line = f"{when}  {record.decision:<11}  {record.strike.describe()}"
+    if record.source:
+        line += f" ({record.source}, {record.play_ms / 1000:.1f}s)"
+    if record.late_ms >= _SHOW_LATE_MS:
+        line += f", {record.late_ms / 1000:.0f}s late"
+    return line
+
+
+@click.command()
+@click.option(
+    "--from",
+    "start",
+    type=click.DateTime(_FORMATS),
+    default=None,
+    help="Start of the period (local time; default: 24 hours ago)",
+)
+@click.option(
+    "--to",
+    "end",
+    type=click.DateTime(_FORMATS),
+    default=None,
+    help="End of the period, exclusive (default: now)",
+)
+@click.option(
+    "--decision",
+    "decisions",
+    multiple=True,
+    type=click.Choice(journal.DECISIONS),
+    help="Only show ticks with this decision (repeatable)",
+)
+@click.option("--summary", is_flag=True, help="Only print the count of each decision")
+def history(
+    start: datetime | None,
+    end: datetime | None,
+    decisions: tuple[str, ...],
+    *,
+    summary: bool,
+) -> None:
+    """Show what each tick decided: played, quiet hours, silenced, dropped..."""
+    end = end.astimezone() if end else clock.current().now() + timedelta(seconds=1)
+    start = start.astimezone() if start else end - timedelta(days=1)
+    if end <= start:
+        msg = "must be after --from"
+        raise click.BadParameter(msg, param_hint="--to")
+    found = [
+        r
+        for r in journal.records(start.timestamp(), end.timestamp())
+        if not decisions or r.decision in decisions
+    ]
+    if not found:
+        click.echo(f"No ticks journalled between {start:%Y-%m-%d %H:%M} and {end:%Y-%m-%d %H:%M}.")
+        return
+    if not summary:
+        for record in found:
+            click.echo(_describe(record))
+    counts = Counter(r.decision for r in found)
+    click.echo(f"{len(found)} tick(s): " + ", ".join(f"{n} {d}" for d, n in counts.most_common()))
@@ -0,0 +1,234 @@
+"""Append-only journal of tick decisions.
+
+Every tick appends one fixed-size record to ``app_support()/journal.bin``
+(little-endian)::
+
+    header  magic "BBTJ" | format u16 | record size u16 | 8 bytes reserved
+    record  decided at f64 | boundary i64 | decision u8 | chimes u8 | pops u8
+            | source u8 | late ms f32 | playback ms f32 | pid u32
+
+Records are appended under an ``flock`` with ``O_APPEND``, so concurrent ticks
+never interleave. Once the file reaches ``MAX_BYTES`` it is rotated to
+``journal.bin.1`` (and older files shift up to ``journal.bin.BACKUPS``). A
+record cut short by a crash is trimmed by the next append.
+
+Records are in decision-time order (unless the clock was set back), so
+:func:`records` memory-maps each file and bisects on that field: a range query
+costs two binary searches plus the records it returns.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import math
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from typing import TYPE_CHECKING, NamedTuple
+
+from bingbong.config import app_support
+from bingbong.log import debug, warning
+from bingbong.pattern import NOTHING, Strike
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+__all__ = [
+    "BACKUPS",
+    "DECISIONS",
+    "FORMAT_VERSION",
+    "MAX_BYTES",
+    "SOURCES",
+    "Record",
+    "append",
+    "journal_path",
+    "journal_paths",
+    "records",
+]
+
+FORMAT_VERSION = 1
+_MAGIC = b"BBTJ"
+_RECORD = struct.Struct("<dqBBBBffI")
+_HEADER = struct.Struct("<4sHH8x")
+_HEADER_BYTES = _HEADER.pack(_MAGIC, FORMAT_VERSION, _RECORD.size)
+_AT = struct.Struct("<d")
+
+# 1 MiB holds 32768 records: about a year of quarter-hour ticks.
+MAX_BYTES = 1 << 20
+BACKUPS = 3
+
+# Stored as the index into these tuples.
+DECISIONS = (
+    "unscheduled",  # the chime rules schedule nothing this minute
+    "played",
+    "quiet",  # quiet hours
+    "silenced",  # `bingbong silence`
+    "calendar",  # a scheduled silence
+    "busy",  # another tick was playing
+    "duplicate",  # the boundary already played
+    "stale",  # reached too late (no longer written; keeps the indices stable)
+    "aborted",  # the minute changed mid-sequence, or the tick ran out of time
+    "failed",  # the player kept failing
+)
+SOURCES = ("", "cache", "buffer", "sequence")
+
+
+class Record(NamedTuple):
+    """One journalled tick."""
+
+    at: float  # when the tick decided (epoch seconds)
+    boundary: int  # the minute it decided for (epoch seconds)
+    decision: str
+    chimes: int
+    pops: int
+    source: str  # how it played: "cache", "buffer", "sequence" or ""
+    late_ms: float  # decision time past the boundary
+    play_ms: float
+    pid: int
+
+    @property
+    def strike(self) -> Strike:
+        return Strike(self.chimes, self.pops)
+
+
+def journal_path() -> Path:
+    return app_support() / "journal.bin"
+
+
+def _backup(path: Path, n: int) -> Path:
+    return path.with_name(f"{path.name}.{n}")
+
+
+def journal_paths() -> list[Path]:
+    """Return the journal files, oldest first."""
+    path = journal_path()
+    return [*(_backup(path, n) for n in range(BACKUPS, 0, -1)), path]
+
+
+def append(
+    decision: str,
+    boundary: int,
+    at: float,
+    strike: Strike = NOTHING,
+    *,
+    source: str = "",
+    play_s: float = 0.0,
+) -> None:
+    """Append the record of one tick; a journal that cannot be written is only logged."""
+    record = _RECORD.pack(
+        at,
+        boundary,
+        DECISIONS.index(decision),
+        strike.chimes,
+        strike.pops,
+        SOURCES.index(source),
+        (at - boundary) * 1000,
+        play_s * 1000,
+        os.getpid(),
+    )
+    path = journal_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write(path, record)
+    except OSError as e:
+        warning("journal: cannot append (%s)", e, path=path)
+        return
+    debug("journal: appended", decision=decision, boundary=boundary)
+
+
+def _write(path: Path, record: bytes) -> None:
+    for _ in range(3):
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            st = os.fstat(fd)
+            try:
+                current = path.stat().st_ino
+            except FileNotFoundError:
+                current = None
+            if st.st_ino != current:
+                continue  # rotated away while we waited for the lock
+            size = st.st_size
+            if size >= MAX_BYTES or (size and os.pread(fd, _HEADER.size, 0) != _HEADER_BYTES):
+                _rotate(path)
+                continue
+            if not size:
+                os.write(fd, _HEADER_BYTES + record)
+                return
+            partial = (size - _HEADER.size) % _RECORD.size
+            if partial:
+                os.ftruncate(fd, size - partial)
+            os.write(fd, record)
+            return
+        finally:
+            os.close(fd)  # also releases the lock
+    msg = f"{path} keeps being rotated"
+    raise OSError(msg)
+
+
+def _rotate(path: Path) -> None:
+    for n in range(BACKUPS, 1, -1):
+        with contextlib.suppress(FileNotFoundError):
+            _backup(path, n - 1).replace(_backup(path, n))
+    path.replace(_backup(path, 1))
+    debug("journal: rotated", path=path)
+
+
+class _Times:
+    """The decision times of a mapped journal's records, as a sequence to bisect."""
+
+    __slots__ = ("_data", "_n")
+
+    def __init__(self, data: mmap.mmap, n: int) -> None:
+        self._data, self._n = data, n
+
+    def __getitem__(self, i: int) -> float:
+        return _AT.unpack_from(self._data, _HEADER.size + i * _RECORD.size)[0]
+
+    def __len__(self) -> int:
+        return self._n
+
+
+def _decode(data: mmap.mmap, i: int) -> Record:
+    at, boundary, decision, chimes, pops, source, late_ms, play_ms, pid = _RECORD.unpack_from(
+        data, _HEADER.size + i * _RECORD.size
+    )
+    return Record(
+        at,
+        boundary,
+        DECISIONS[decision] if decision < len(DECISIONS) else f"#{decision}",
+        chimes,
+        pops,
+        SOURCES[source] if source < len(SOURCES) else f"#{source}",
+        late_ms,
+        play_ms,
+        pid,
+    )
+
+
+def _read(path: Path, start: float, end: float) -> list[Record]:
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        n = (os.fstat(f.fileno()).st_size - _HEADER.size) // _RECORD.size
+        if n <= 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[: _HEADER.size] != _HEADER_BYTES:
+                warning("journal: unknown format, skipping %s", path)
+                return []
+            times = _Times(data, n)
+            first = bisect_left(times, start)
+            last = bisect_left(times, end, lo=first)
+            return [_decode(data, i) for i in range(first, last)]
+
+
+def records(start: float = 0.0, end: float = math.inf) -> Iterator[Record]:
+    """Yield the ticks decided in ``[start, end)``, oldest first."""
+    for path in journal_paths():
+        yield from _read(path, start, end)
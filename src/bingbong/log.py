@@ -1,16 +1,72 @@
+"""Leveled, structured logging with lazy formatting.
+
+Calls look like ``debug("tick: playing %s", name, pops=3)``: the message is
+only %-formatted, and ``key=value`` fields only rendered, when some sink
+wants the level, so disabled calls cost one comparison. Sinks:
+
+- the console (``-v``/``BINGBONG_VERBOSE``), every level, as before;
+- an optional log file, ``app_support()/logs/bingbong.log``, enabled with
+  ``BINGBONG_LOG_LEVEL`` (``debug``, ``info``, ``warning`` or ``error``).
+  Records are logfmt lines written by a background thread and rotated by
+  size, so launchd-run ticks leave something cheap to inspect with
+  ``bingbong logs``.
+"""
+
 from __future__ import annotations
 
+import atexit
 import os
+from datetime import datetime
 from types import SimpleNamespace
-from typing import Final
+from typing import TYPE_CHECKING, Any, Final
 
 import click
 
-__all__ = ["debug", "set_verbose", "verbose"]
+if TYPE_CHECKING:
+    import queue
+    import threading
+    from pathlib import Path
+
+__all__ = [
+    "DEBUG",
+    "ERROR",
+    "INFO",
+    "LEVELS",
+    "WARNING",
+    "debug",
+    "enabled",
+    "error",
+    "info",
+    "log",
+    "log_path",
+    "set_verbose",
+    "start_file_log",
+    "stop_file_log",
+    "tail",
+    "verbose",
+    "warning",
+]
+
+DEBUG: Final[int] = 10
+INFO: Final[int] = 20
+WARNING: Final[int] = 30
+ERROR: Final[int] = 40
+LEVELS: Final[dict[str, int]] = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+_NAMES: Final[dict[int, str]] = {v: k for k, v in LEVELS.items()}
+_OFF: Final[int] = 100
 
 _ENV_FLAG: Final[str] = "BINGBONG_VERBOSE"
+_ENV_LEVEL: Final[str] = "BINGBONG_LOG_LEVEL"
+MAX_BYTES: Final[int] = 1024 * 1024
+BACKUPS: Final[int] = 3
+
+# ``threshold`` is the lowest level any sink wants; everything below it is dropped
+# before formatting.
+_state = SimpleNamespace(verbose=False, file_level=_OFF, threshold=_OFF, writer=None)
 
-_state = SimpleNamespace(verbose=False)
+
+def _update_threshold() -> None:
+    _state.threshold = min(DEBUG if _state.verbose else _OFF, _state.file_level)
 
 
 def set_verbose(*, value: bool | None = None) -> None:
@@ -22,13 +78,185 @@ def set_verbose(*, value: bool | None = None) -> None:
         _state.verbose = os.environ.get(_ENV_FLAG, "") not in {"", "0", "false", "False"}
     else:
         _state.verbose = bool(value)
+    _update_threshold()
 
 
 def verbose() -> bool:
     return _state.verbose
 
 
-def debug(msg: str) -> None:
-    """Emit a debug line when verbosity is enabled."""
+def enabled(level: int = DEBUG) -> bool:
+    """Whether a record at ``level`` would go anywhere; guard expensive arguments with it."""
+    return level >= _state.threshold
+
+
+def _render_value(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    text = str(value)
+    if not text or any(c in text for c in ' "=\n'):
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return text
+
+
+def _message(msg: str, args: tuple[Any, ...]) -> str:
+    return msg % args if args else msg
+
+
+def _fields(fields: dict[str, Any]) -> str:
+    return " ".join(f"{k}={_render_value(v)}" for k, v in fields.items())
+
+
+def _emit(level: int, msg: str, args: tuple[Any, ...], fields: dict[str, Any]) -> None:
     if _state.verbose:
-        click.echo(f"[bingbong] {msg}")
+        line = _message(msg, args)
+        if fields:
+            line = f"{line} {_fields(fields)}"
+        click.echo(f"[bingbong] {line}")
+    writer = _state.writer
+    if writer is not None and level >= _state.file_level:
+        writer.put((datetime.now().astimezone(), level, msg, args, fields))
+
+
+def log(level: int, msg: str, *args: Any, **fields: Any) -> None:
+    """Record ``msg % args`` plus ``fields`` at ``level``."""
+    if level >= _state.threshold:
+        _emit(level, msg, args, fields)
+
+
+def debug(msg: str, *args: Any, **fields: Any) -> None:
+    """Emit a debug record when verbosity (or debug file logging) is enabled."""
+    if _state.threshold <= DEBUG:
+        _emit(DEBUG, msg, args, fields)
+
+
+def info(msg: str, *args: Any, **fields: Any) -> None:
+    if _state.threshold <= INFO:
+        _emit(INFO, msg, args, fields)
+
+
+def warning(msg: str, *args: Any, **fields: Any) -> None:
+    if _state.threshold <= WARNING:
+        _emit(WARNING, msg, args, fields)
+
+
+def error(msg: str, *args: Any, **fields: Any) -> None:
+    if _state.threshold <= ERROR:
+        _emit(ERROR, msg, args, fields)
+
+
+def log_path() -> Path:
+    from bingbong.config import app_support  # noqa: PLC0415 - config imports this module
+
+    return app_support() / "logs" / "bingbong.log"
+
+
+class _FileWriter:
+    """Formats and appends records on a daemon thread; rotates at ``max_bytes``."""
+
+    def __init__(self, path: Path, *, max_bytes: int = MAX_BYTES, backups: int = BACKUPS) -> None:
+        import queue  # noqa: PLC0415 - only when file logging is on
+        import threading  # noqa: PLC0415
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue: queue.SimpleQueue[tuple[Any, ...] | None] = queue.SimpleQueue()
+        self.pid = os.getpid()
+        self.thread: threading.Thread = threading.Thread(target=self._run, name="bingbong-log", daemon=True)
+        self.thread.start()
+
+    def put(self, record: tuple[Any, ...]) -> None:
+        self.queue.put(record)
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def _format(self, record: tuple[Any, ...]) -> str:
+        ts, level, msg, args, fields = record
+        try:
+            text = _message(msg, args)
+        except (TypeError, ValueError):
+            text = f"{msg} {args!r}"
+        head = f"ts={ts.isoformat(timespec='milliseconds')} level={_NAMES.get(level, level)} pid={self.pid}"
+        tail = f" {_fields(fields)}" if fields else ""
+        return f"{head} msg={_render_value(text)}{tail}\n"
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def _run(self) -> None:
+        while (record := self.queue.get()) is not None:
+            lines = [self._format(record)]
+            # Drain whatever else is queued so bursts become one write.
+            while not self.queue.empty():
+                nxt = self.queue.get()
+                if nxt is None:
+                    self._write(lines)
+                    return
+                lines.append(self._format(nxt))
+            self._write(lines)
+
+    def _write(self, lines: list[str]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                self._rotate()
+            with self.path.open("a", encoding="utf-8") as f:
+                f.writelines(lines)
+        except OSError:
+            pass  # logging must never break a tick
+
+
+def start_file_log(level: int | str | None = None) -> bool:
+    """Start the background file writer at ``level`` (default: ``BINGBONG_LOG_LEVEL``).
+
+    Returns whether file logging is on.
+    """
+    if level is None:
+        level = os.environ.get(_ENV_LEVEL, "")
+    if isinstance(level, str):
+        level = LEVELS.get(level.strip().lower(), _OFF)
+    if level >= _OFF:
+        return False
+    if _state.writer is None:
+        _state.writer = _FileWriter(log_path())
+        atexit.register(stop_file_log)
+    _state.file_level = level
+    _update_threshold()
+    return True
+
+
+def stop_file_log() -> None:
+    """Flush pending records and stop the writer."""
+    writer = _state.writer
+    _state.writer = None
+    _state.file_level = _OFF
+    _update_threshold()
+    if writer is not None:
+        writer.close()
+
+
+def tail(path: Path, lines: int, *, block: int = 8192) -> list[str]:
+    """Return the last ``lines`` lines of ``path`` without reading the whole file."""
+    if lines <= 0:
+        return []
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= lines:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode("utf-8", errors="replace").splitlines()[-lines:]
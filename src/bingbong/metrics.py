@@ -0,0 +1,168 @@
+"""Tick counters and latency histograms for a Prometheus textfile collector.
+
+Every tick adds its decision and timings to running totals kept in
+``app_support()/metrics.bin`` (a fixed little-endian layout of counters and
+sums) and re-renders ``app_support()/metrics.prom`` from them::
+
+    bingbong_ticks_total{decision="played"} 96
+    bingbong_tick_lateness_seconds_bucket{le="0.5"} 95
+    ...
+    # EOF
+
+The update is one locked read-modify-write of a few hundred bytes, and the
+text file is replaced atomically, so a node exporter pointed at the app
+support directory (``--collector.textfile.directory``) never reads a torn
+file and bingbong runs no server. Totals in another layout (say, from a
+version with more decisions) are started afresh.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import struct
+from typing import TYPE_CHECKING, NamedTuple
+
+from bingbong.config import app_support
+from bingbong.journal import DECISIONS
+from bingbong.log import debug, warning
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__all__ = ["HISTOGRAMS", "Histogram", "metrics_path", "observe", "render", "totals_path"]
+
+
+class Histogram(NamedTuple):
+    name: str
+    help: str
+    bounds: tuple[float, ...]  # bucket upper bounds in seconds; +Inf is implied
+
+
+HISTOGRAMS = (
+    Histogram(
+        "bingbong_tick_lateness_seconds",
+        "How long after its minute boundary a scheduled tick decided what to play.",
+        (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+    ),
+    Histogram(
+        "bingbong_tick_load_seconds",
+        "Time to load the state and config and look up the day plan.",
+        (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    ),
+    Histogram(
+        "bingbong_tick_playback_seconds",
+        "Time spent playing a tick's sounds.",
+        (0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60),
+    ),
+)
+_LATENESS, _LOAD, _PLAYBACK = HISTOGRAMS
+
+_MAGIC = b"BBMX"
+# After the header: the last tick's time, one counter per decision, then per
+# histogram one (non-cumulative) counter per bucket including +Inf, and the sum.
+_HEADER = struct.Struct("<4sH2x")
+_VALUES = "d" + "Q" * len(DECISIONS) + "".join("Q" * (len(h.bounds) + 1) + "d" for h in HISTOGRAMS)
+_TOTALS = struct.Struct(_HEADER.format + _VALUES)
+_EMPTY = [0.0] + [0] * len(DECISIONS) + [v for h in HISTOGRAMS for v in [0] * (len(h.bounds) + 1) + [0.0]]
+
+
+def totals_path() -> Path:
+    return app_support() / "metrics.bin"
+
+
+def metrics_path() -> Path:
+    return app_support() / "metrics.prom"
+
+
+def _histogram_at(index: int) -> int:
+    """Offset of ``HISTOGRAMS[index]``'s first bucket in the values."""
+    return 1 + len(DECISIONS) + sum(len(h.bounds) + 2 for h in HISTOGRAMS[:index])
+
+
+def _add(values: list[float], histogram: Histogram, value: float) -> None:
+    at = _histogram_at(HISTOGRAMS.index(histogram))
+    bucket = next((i for i, bound in enumerate(histogram.bounds) if value <= bound), len(histogram.bounds))
+    values[at + bucket] += 1
+    values[at + len(histogram.bounds) + 1] += value
+
+
+def observe(
+    decision: str, at: float, *, late_s: float | None, load_s: float, play_s: float | None = None
+) -> None:
+    """Count one tick and its timings; metrics that cannot be written are only logged.
+
+    ``late_s`` is None for a minute with nothing scheduled, where lateness
+    means nothing; ``play_s`` is None when nothing played.
+    """
+    path = totals_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _update(path, decision, at, late_s=late_s, load_s=load_s, play_s=play_s)
+    except OSError as e:
+        warning("metrics: cannot update (%s)", e, path=path)
+        return
+    debug("metrics: updated", decision=decision)
+
+
+def _update(
+    path: Path, decision: str, at: float, *, late_s: float | None, load_s: float, play_s: float | None
+) -> None:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        data = os.pread(fd, _TOTALS.size + 1, 0)
+        fresh = len(data) != _TOTALS.size or _HEADER.unpack_from(data) != (_MAGIC, _TOTALS.size)
+        values = list(_EMPTY if fresh else _TOTALS.unpack(data)[2:])
+        values[0] = at
+        values[1 + DECISIONS.index(decision)] += 1
+        if late_s is not None:
+            _add(values, _LATENESS, max(0.0, late_s))
+        _add(values, _LOAD, load_s)
+        if play_s is not None:
+            _add(values, _PLAYBACK, play_s)
+        os.pwrite(fd, _TOTALS.pack(_MAGIC, _TOTALS.size, *values), 0)
+        if fresh:
+            os.ftruncate(fd, _TOTALS.size)
+        _publish(render(values))
+    finally:
+        os.close(fd)  # also releases the lock
+
+
+def _publish(text: str) -> None:
+    path = metrics_path()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(values: list[float]) -> str:
+    """Render totals as text both Prometheus and OpenMetrics parsers accept, ending with ``# EOF``."""
+    lines = [
+        # OpenMetrics names the family without ``_total``; its samples keep it.
+        "# HELP bingbong_ticks Ticks by what they decided.",
+        "# TYPE bingbong_ticks counter",
+    ]
+    lines += [
+        f'bingbong_ticks_total{{decision="{decision}"}} {values[1 + i]}'
+        for i, decision in enumerate(DECISIONS)
+    ]
+    for index, h in enumerate(HISTOGRAMS):
+        at = _histogram_at(index)
+        lines += [f"# HELP {h.name} {h.help}", f"# TYPE {h.name} histogram"]
+        cumulative = 0
+        for i, le in enumerate([*map(_number, h.bounds), "+Inf"]):
+            cumulative += values[at + i]
+            lines.append(f'{h.name}_bucket{{le="{le}"}} {cumulative}')
+        lines += [f"{h.name}_sum {_number(values[at + len(h.bounds) + 1])}", f"{h.name}_count {cumulative}"]
+    lines += [
+        "# HELP bingbong_last_tick_timestamp_seconds When the last tick decided.",
+        "# TYPE bingbong_last_tick_timestamp_seconds gauge",
+        f"bingbong_last_tick_timestamp_seconds {_number(values[0])}",
+        "# EOF",
+    ]
+    return "\n".join(lines) + "\n"
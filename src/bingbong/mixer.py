@@ -0,0 +1,227 @@
+"""In-process PCM mixing: render a whole tick into a single buffer.
+
+Sounds are decoded with the stdlib :mod:`wave` module into interleaved signed
+16-bit samples, converted to a common rate/channel layout and laid out at the
+``CHIME_DELAY``/``POP_DELAY`` offsets, so one player invocation plays the tick.
+"""
+
+from __future__ import annotations
+
+import sys
+import wave
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from bingbong.constants import CHIME_DELAY, POP_DELAY
+from bingbong.log import debug
+
+__all__ = [
+    "SAMPLE_WIDTH",
+    "MixError",
+    "Pcm",
+    "convert",
+    "decode",
+    "load",
+    "mix_at",
+    "render_tick",
+    "wav_duration",
+    "write_wav",
+]
+
+SAMPLE_WIDTH = 2  # we always mix in signed 16-bit
+_INT16_MIN = -32768
+_INT16_MAX = 32767
+
+
+class MixError(ValueError):
+    """Raised when a sound cannot be decoded or mixed."""
+
+
+@dataclass(slots=True, frozen=True)
+class Pcm:
+    """Interleaved signed 16-bit PCM samples."""
+
+    samples: array
+    rate: int
+    channels: int
+
+    @property
+    def frames(self) -> int:
+        return len(self.samples) // self.channels
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.rate
+
+
+def _to_int16(raw: bytes, width: int) -> array:
+    if width == 2:  # noqa: PLR2004
+        samples = array("h", raw)
+        if sys.byteorder == "big":  # pragma: no cover - WAV is little-endian
+            samples.byteswap()
+        return samples
+    if width == 1:  # unsigned 8-bit
+        return array("h", ((b - 128) << 8 for b in raw))
+    if width in {3, 4}:  # keep the most significant 16 bits
+        return array(
+            "h",
+            (
+                int.from_bytes(raw[i + width - 2 : i + width], "little", signed=True)
+                for i in range(0, len(raw), width)
+            ),
+        )
+    msg = f"unsupported sample width: {width} bytes"
+    raise MixError(msg)
+
+
+def decode(path: str | Path) -> Pcm:
+    """Decode a PCM WAV file into 16-bit samples."""
+    try:
+        with wave.open(str(path), "rb") as w:
+            rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+            raw = w.readframes(w.getnframes())
+    except (wave.Error, EOFError, OSError) as e:
+        msg = f"cannot decode {path}: {e}"
+        raise MixError(msg) from e
+    if rate <= 0 or channels <= 0:
+        msg = f"invalid WAV format in {path}: rate={rate} channels={channels}"
+        raise MixError(msg)
+    pcm = Pcm(_to_int16(raw, width), rate, channels)
+    debug("decoded %s", path, rate=rate, channels=channels, width=width, frames=pcm.frames)
+    return pcm
+
+
+def wav_duration(path: str | Path) -> float | None:
+    """Return the playing time of a WAV file from its header, or None if unknown."""
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError, OSError, ZeroDivisionError):
+        return None
+
+
+@lru_cache(maxsize=8)
+def _load_cached(path: str, _mtime_ns: int, _size: int) -> Pcm:
+    return decode(path)
+
+
+def load(path: str | Path) -> Pcm:
+    """Decode ``path``, reusing the previous result while the file is unchanged.
+
+    A resident process therefore decodes each sound once.
+    """
+    try:
+        st = Path(path).stat()
+    except OSError as e:
+        msg = f"cannot decode {path}: {e}"
+        raise MixError(msg) from e
+    return _load_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _remap_channels(samples: array, src: int, dst: int) -> array:
+    if src == dst:
+        return samples
+    frames = len(samples) // src
+    if dst == 1:  # downmix by averaging
+        return array("h", (sum(samples[f * src : (f + 1) * src]) // src for f in range(frames)))
+    # upmix: repeat source channels round-robin (mono -> both stereo sides)
+    return array("h", (samples[f * src + (c % src)] for f in range(frames) for c in range(dst)))
+
+
+def _resample(samples: array, channels: int, src_rate: int, dst_rate: int) -> array:
+    if src_rate == dst_rate:
+        return samples
+    src_frames = len(samples) // channels
+    dst_frames = max(1, round(src_frames * dst_rate / src_rate))
+    out = array("h", bytes(dst_frames * channels * SAMPLE_WIDTH))
+    step = src_rate / dst_rate
+    last = src_frames - 1
+    for f in range(dst_frames):  # linear interpolation
+        pos = f * step
+        i = min(int(pos), last)
+        j = min(i + 1, last)
+        frac = pos - i
+        for c in range(channels):
+            a = samples[i * channels + c]
+            b = samples[j * channels + c]
+            out[f * channels + c] = round(a + (b - a) * frac)
+    return out
+
+
+def convert(pcm: Pcm, rate: int, channels: int) -> Pcm:
+    """Return ``pcm`` converted to ``rate`` Hz and ``channels`` channels."""
+    if pcm.rate == rate and pcm.channels == channels:
+        return pcm
+    samples = _remap_channels(pcm.samples, pcm.channels, channels)
+    samples = _resample(samples, channels, pcm.rate, rate)
+    debug("converted %dHz/%dch -> %dHz/%dch", pcm.rate, pcm.channels, rate, channels)
+    return Pcm(samples, rate, channels)
+
+
+def mix_at(dest: array, src: array, offset: int) -> None:
+    """Add ``src`` into ``dest`` starting at sample ``offset``, clipping to 16 bits."""
+    end = min(len(dest), offset + len(src))
+    if end <= offset:
+        return
+    src = src[: end - offset]
+    if not any(dest[offset:end]):  # common case: nothing there yet
+        dest[offset:end] = src
+        return
+    for i, s in enumerate(src, start=offset):
+        dest[i] = max(_INT16_MIN, min(_INT16_MAX, dest[i] + s))
+
+
+def render_tick(
+    chime: Pcm | None,
+    pop: Pcm,
+    pops: int,
+    *,
+    chimes: int = 1,
+    chime_delay: float = CHIME_DELAY,
+    pop_delay: float = POP_DELAY,
+) -> Pcm:
+    """Lay out ``chimes`` chimes (none when ``chime`` is None) then ``pops`` pops in one buffer.
+
+    Spacing matches sequential playback: each sound starts after the previous
+    one finished plus its delay.
+    """
+    sounds = [chime, pop] if chime else [pop]
+    rate = max(s.rate for s in sounds)
+    channels = max(s.channels for s in sounds)
+    pop = convert(pop, rate, channels)
+
+    starts: list[tuple[int, Pcm]] = []
+    cursor = 0
+    if chime:
+        chime = convert(chime, rate, channels)
+        chime_step = chime.frames + round(chime_delay * rate)
+        starts.extend((i * chime_step, chime) for i in range(chimes))
+        cursor = chimes * chime_step
+    pop_step = pop.frames + round(pop_delay * rate)
+    starts.extend((cursor + i * pop_step, pop) for i in range(pops))
+
+    total = max((start + s.frames for start, s in starts), default=0)
+    out = array("h", bytes(total * channels * SAMPLE_WIDTH))
+    for start, s in starts:
+        mix_at(out, s.samples, start * channels)
+    debug(
+        "rendered tick", chimes=chimes if chime else 0, pops=pops, frames=total, rate=rate, channels=channels
+    )
+    return Pcm(out, rate, channels)
+
+
+def write_wav(pcm: Pcm, path: str | Path) -> Path:
+    """Write ``pcm`` as a 16-bit WAV file."""
+    out = Path(path)
+    samples = pcm.samples
+    if sys.byteorder == "big":  # pragma: no cover - WAV is little-endian
+        samples = array("h", samples)
+        samples.byteswap()
+    with wave.open(str(out), "wb") as w:
+        w.setnchannels(pcm.channels)
+        w.setsampwidth(SAMPLE_WIDTH)
+        w.setframerate(pcm.rate)
+        w.writeframes(samples.tobytes())
+    return out
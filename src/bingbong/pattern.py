@@ -0,0 +1,228 @@
+"""Chime rules and their compiled lookup table.
+
+A rule is one line, ``<minute> <hour> <weekday> <sounds>``:
+
+- the selectors use cron syntax: ``*``, ``N``, ``a-b``, ``a,b``, ``*/n``,
+  ``a-b/n``. Weekdays run 0-6 from Sunday (``7`` is Sunday too) or use
+  ``sun``..``sat``;
+- ``<sounds>`` lists the chimes then the pops, e.g. ``chime pop*hour``,
+  ``chime*2``, ``pop*3``; ``pop*hour`` means one pop per hour on the 12-hour
+  clock. ``none`` silences the selected minutes.
+
+Later rules override earlier ones for the minutes they select. Rules are
+compiled once into a table of one byte per (weekday, hour, minute) holding an
+index into the distinct strikes, so looking up a minute costs the same however
+many rules there are.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from datetime import datetime
+
+__all__ = [
+    "DEFAULT_RULES",
+    "NOTHING",
+    "Pattern",
+    "PatternError",
+    "Strike",
+    "compile_rules",
+    "rules_digest",
+]
+
+DEFAULT_RULES: tuple[str, ...] = (
+    "0 * * chime pop*hour",
+    "15 * * pop",
+    "30 * * pop*2",
+    "45 * * pop*3",
+)
+
+_WEEKDAY_NAMES = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+_MAX_STRIKES = 255
+_MAX_REPEAT = 24
+
+
+class PatternError(ValueError):
+    """Raised for a rule that cannot be parsed."""
+
+
+class Strike(NamedTuple):
+    """What plays at one minute: ``chimes`` chime sounds, then ``pops`` pops."""
+
+    chimes: int = 0
+    pops: int = 0
+
+    def __bool__(self) -> bool:
+        """Return whether the strike plays anything."""
+        return self.chimes > 0 or self.pops > 0
+
+    def describe(self) -> str:
+        parts = []
+        if self.chimes:
+            parts.append("chime" if self.chimes == 1 else f"{self.chimes} chimes")
+        if self.pops:
+            parts.append(f"{self.pops} pop(s)")
+        return " + ".join(parts) or "nothing"
+
+
+NOTHING = Strike()
+
+
+def _field(spec: str, lo: int, hi: int, names: dict[str, int] | None = None) -> set[int]:
+    values: set[int] = set()
+    for part in spec.lower().split(","):
+        try:
+            start, end, step = _range(part, lo, hi, names)
+        except ValueError as e:
+            msg = f"bad selector {spec!r}"
+            raise PatternError(msg) from e
+        if step < 1 or not lo <= start <= end <= hi:
+            msg = f"selector {spec!r} out of range {lo}-{hi}"
+            raise PatternError(msg)
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _range(part: str, lo: int, hi: int, names: dict[str, int] | None) -> tuple[int, int, int]:
+    body, _, step_s = part.partition("/")
+    step = int(step_s) if step_s else 1
+    if body == "*":
+        return lo, hi, step
+    if "-" in body:
+        a, b = body.split("-", 1)
+        return _value(a, names), _value(b, names), step
+    start = _value(body, names)
+    return start, hi if step_s else start, step
+
+
+def _value(token: str, names: dict[str, int] | None) -> int:
+    if names and token in names:
+        return names[token]
+    return int(token)
+
+
+def _sounds(tokens: Sequence[str]) -> tuple[int, int | None]:
+    """Return ``(chimes, pops)``; ``pops`` None means one per hour."""
+    if list(tokens) == ["none"]:
+        return 0, 0
+    chimes, pops = 0, 0
+    hourly = False
+    for token in tokens:
+        name, _, count_s = token.lower().partition("*")
+        if name == "chime":
+            if pops or hourly:
+                msg = f"chimes must come before pops: {' '.join(tokens)!r}"
+                raise PatternError(msg)
+            chimes += _count(count_s, token)
+        elif name == "pop" and count_s == "hour":
+            hourly = True
+        elif name == "pop":
+            pops += _count(count_s, token)
+        else:
+            msg = f"unknown sound {token!r} (use chime, pop, pop*N, pop*hour or none)"
+            raise PatternError(msg)
+    if hourly and pops:
+        msg = "pop*hour cannot be combined with other pops"
+        raise PatternError(msg)
+    return chimes, None if hourly else pops
+
+
+def _count(count_s: str, token: str) -> int:
+    try:
+        count = int(count_s) if count_s else 1
+    except ValueError as e:
+        msg = f"bad repeat count in {token!r}"
+        raise PatternError(msg) from e
+    if not 1 <= count <= _MAX_REPEAT:
+        msg = f"repeat count in {token!r} must be 1-{_MAX_REPEAT}"
+        raise PatternError(msg)
+    return count
+
+
+def _slot(weekday: int, hour: int, minute: int) -> int:
+    return (weekday * 24 + hour) * 60 + minute
+
+
+@dataclass(frozen=True, slots=True)
+class Pattern:
+    """Compiled rules: ``table[(weekday * 24 + hour) * 60 + minute]`` indexes ``strikes``.
+
+    ``weekday`` follows :meth:`datetime.weekday` (Monday is 0).
+    """
+
+    rules: tuple[str, ...]
+    strikes: tuple[Strike, ...]
+    table: bytes
+
+    def strike(self, weekday: int, hour: int, minute: int) -> Strike:
+        return self.strikes[self.table[_slot(weekday, hour, minute)]]
+
+    def strike_at(self, when: datetime) -> Strike:
+        return self.strike(when.weekday(), when.hour, when.minute)
+
+    def active(self) -> Iterable[tuple[int, int, int]]:
+        """Yield every ``(weekday, hour, minute)`` that plays something."""
+        for i, idx in enumerate(self.table):
+            if idx:
+                rest, minute = divmod(i, 60)
+                weekday, hour = divmod(rest, 24)
+                yield weekday, hour, minute
+
+    def column(self, minute: int) -> bytes:
+        """Strike indexes for ``minute`` past every hour, one byte per ``weekday * 24 + hour``."""
+        return self.table[minute::60]
+
+    def minutes(self) -> tuple[int, ...]:
+        """Minutes past the hour at which something may play."""
+        return tuple(m for m in range(60) if any(self.column(m)))
+
+
+def rules_digest(rules: Sequence[str] | None) -> str:
+    """Cheap fingerprint of a rule set, for cache keys."""
+    return _digest(tuple(rules) if rules else DEFAULT_RULES)
+
+
+@lru_cache(maxsize=8)
+def _digest(rules: tuple[str, ...]) -> str:
+    return f"{zlib.crc32('\n'.join(rules).encode()):08x}"
+
+
+@lru_cache(maxsize=8)
+def _compile(rules: tuple[str, ...]) -> Pattern:
+    strikes: list[Strike] = [NOTHING]
+    index: dict[Strike, int] = {NOTHING: 0}
+    table = bytearray(7 * 24 * 60)
+    for line in rules:
+        parts = line.split()
+        if len(parts) < 4:  # noqa: PLR2004 - three selectors and at least one sound
+            msg = f"rule needs '<minute> <hour> <weekday> <sounds>': {line!r}"
+            raise PatternError(msg)
+        minutes = _field(parts[0], 0, 59)
+        hours = _field(parts[1], 0, 23)
+        # cron weekdays (Sunday = 0 or 7) -> datetime.weekday() (Monday = 0)
+        weekdays = {(d - 1) % 7 for d in _field(parts[2], 0, 7, _WEEKDAY_NAMES)}
+        chimes, pops = _sounds(parts[3:])
+        for hour in hours:
+            strike = Strike(chimes, (hour % 12 or 12) if pops is None else pops)
+            if strike not in index:
+                if len(strikes) > _MAX_STRIKES - 1:
+                    msg = f"too many distinct sound sequences (max {_MAX_STRIKES})"
+                    raise PatternError(msg)
+                index[strike] = len(strikes)
+                strikes.append(strike)
+            idx = index[strike]
+            for weekday in weekdays:
+                for minute in minutes:
+                    table[_slot(weekday, hour, minute)] = idx
+    return Pattern(rules, tuple(strikes), bytes(table))
+
+
+def compile_rules(rules: Sequence[str] | None = None) -> Pattern:
+    """Compile ``rules`` (default: quarter-hour chimes); results are memoised."""
+    return _compile(tuple(rules) if rules else DEFAULT_RULES)
@@ -0,0 +1,319 @@
+"""Long-lived player helper spoken to over a pipe.
+
+A resident process starts ``python -m bingbong.player`` once and sends it one
+command per line on stdin; the helper answers each with ``OK`` or
+``ERR <message>`` on stdout::
+
+    LOAD <path>   get a sound ready (decode it for the device backend)
+    PLAY <path>   play a sound (loading it first if needed)
+    LATENCY <path>
+                  get a sound ready and answer ``OK <seconds>``, the output
+                  latency of the stream it plays on (device backend only)
+    PING          liveness check
+    QUIT          exit
+
+The helper keeps decoded sounds and, with the optional ``sounddevice``
+package (the ``device`` extra), an open output stream per format, so playback
+needs no fork/exec.
+Without it, or when ``BINGBONG_PLAYER`` is set, each play runs the command
+player instead.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+from typing import Protocol, Self, TextIO
+
+from bingbong.audio import AFPLAY, sound_timeout
+from bingbong.log import debug, set_verbose, start_file_log
+from bingbong.mixer import MixError, load
+
+# A fresh helper must answer its first PING within this many seconds.
+STARTUP_TIMEOUT = 10.0
+
+__all__ = [
+    "STARTUP_TIMEOUT",
+    "CommandBackend",
+    "DeviceBackend",
+    "PlayerBackend",
+    "PlayerError",
+    "PlayerHelper",
+    "main",
+    "select_backend",
+    "serve",
+]
+
+
+class PlayerError(RuntimeError):
+    """Raised when the helper cannot play a sound."""
+
+
+class PlayerBackend(Protocol):
+    name: str
+
+    def load(self, path: Path) -> None: ...
+
+    def play(self, path: Path) -> None: ...
+
+    def latency(self, path: Path) -> float: ...
+
+    def close(self) -> None: ...
+
+
+class _OutputStream(Protocol):
+    """The part of ``sounddevice.RawOutputStream`` the device backend uses."""
+
+    @property
+    def latency(self) -> float: ...
+
+    def start(self) -> None: ...
+
+    def write(self, data: bytes) -> object: ...
+
+    def close(self) -> None: ...
+
+
+class CommandBackend:
+    """Plays each sound by running the configured player binary."""
+
+    name = "command"
+
+    def __init__(self, player: Path) -> None:
+        self.player = player
+
+    def load(self, path: Path) -> None:  # noqa: PLR6301 - only checks the file; the player decodes it
+        try:
+            path.stat()
+        except OSError as e:
+            msg = f"cannot play {path}: {e}"
+            raise PlayerError(msg) from e
+
+    def play(self, path: Path) -> None:
+        self.load(path)
+        # stdout is our protocol channel; keep the player's chatter out of it.
+        timeout = sound_timeout(path)
+        try:
+            result = subprocess.run(  # noqa: S603
+                [self.player, str(path)], stdout=subprocess.DEVNULL, check=False, timeout=timeout
+            )
+        except subprocess.TimeoutExpired as e:
+            msg = f"player killed after {timeout:.1f}s"
+            raise PlayerError(msg) from e
+        if result.returncode != 0:
+            msg = f"player exited with code {result.returncode}"
+            raise PlayerError(msg)
+
+    def latency(self, path: Path) -> float:  # noqa: PLR6301 - part of PlayerBackend
+        msg = f"the command player does not report when {path.name} starts sounding"
+        raise PlayerError(msg)
+
+    def close(self) -> None:
+        pass
+
+
+class DeviceBackend:
+    """Writes PCM straight to output streams that stay open between plays."""
+
+    name = "device"
+
+    def __init__(self) -> None:
+        import sounddevice  # noqa: PLC0415  # ty: ignore[unresolved-import]
+
+        self._sd = sounddevice
+        self._streams: dict[tuple[int, int], _OutputStream] = {}
+
+    def load(self, path: Path) -> None:  # noqa: PLR6301 - decoded sounds are cached by the mixer
+        load(path)
+
+    def play(self, path: Path) -> None:
+        pcm = load(path)
+        key = (pcm.rate, pcm.channels)
+        try:
+            self._stream(key).write(pcm.samples.tobytes())
+        except self._sd.PortAudioError as e:
+            # The device may have gone away; open a fresh stream next time.
+            self._close(key)
+            msg = f"audio device error: {e}"
+            raise PlayerError(msg) from e
+
+    def latency(self, path: Path) -> float:
+        pcm = load(path)
+        key = (pcm.rate, pcm.channels)
+        try:
+            return float(self._stream(key).latency)
+        except self._sd.PortAudioError as e:
+            self._close(key)
+            msg = f"audio device error: {e}"
+            raise PlayerError(msg) from e
+
+    def _stream(self, key: tuple[int, int]) -> _OutputStream:
+        stream = self._streams.get(key)
+        if stream is None:
+            rate, channels = key
+            stream = self._sd.RawOutputStream(samplerate=rate, channels=channels, dtype="int16")
+            stream.start()
+            self._streams[key] = stream
+        return stream
+
+    def _close(self, key: tuple[int, int]) -> None:
+        stream = self._streams.pop(key, None)
+        if stream is not None:
+            try:
+                stream.close()
+            except self._sd.PortAudioError as e:
+                debug("player helper: cannot close stream (%s)", e)
+
+    def close(self) -> None:
+        for key in list(self._streams):
+            self._close(key)
+
+
+def select_backend() -> PlayerBackend:
+    """Prefer in-process output; honour ``BINGBONG_PLAYER`` as the command fallback."""
+    override = os.environ.get("BINGBONG_PLAYER")
+    if not override:
+        try:
+            return DeviceBackend()
+        except (ImportError, OSError) as e:
+            debug("player helper: device backend unavailable (%s); using command player", e)
+    return CommandBackend(AFPLAY)
+
+
+def _handle(backend: PlayerBackend, line: str) -> tuple[str, bool]:
+    cmd, _, arg = line.rstrip("\n").partition(" ")
+    if cmd == "PING":
+        return "OK", True
+    if cmd == "QUIT":
+        return "OK", False
+    if cmd not in {"LOAD", "PLAY", "LATENCY"} or not arg:
+        return f"ERR unknown command: {line.strip()!r}", True
+    path = Path(arg)
+    try:
+        if cmd == "PLAY":
+            backend.play(path)
+        elif cmd == "LATENCY":
+            return f"OK {backend.latency(path):.6f}", True
+        else:
+            backend.load(path)
+    except (MixError, PlayerError, OSError) as e:
+        return f"ERR {e}", True
+    return "OK", True
+
+
+def serve(stdin: TextIO, stdout: TextIO, backend: PlayerBackend) -> None:
+    """Answer commands from ``stdin`` until ``QUIT`` or end of input."""
+    debug("player helper: serving with %s backend", backend.name)
+    try:
+        for line in stdin:
+            reply, keep_going = _handle(backend, line)
+            stdout.write(reply + "\n")
+            stdout.flush()
+            if not keep_going:
+                break
+    finally:
+        backend.close()
+
+
+class PlayerHelper:
+    """Client side: owns the helper process and restarts it if it dies."""
+
+    def __init__(self, argv: list[str] | None = None) -> None:
+        self.argv = argv or [sys.executable, "-m", "bingbong.player"]
+        self._proc: subprocess.Popen[str] | None = None
+
+    def __enter__(self) -> Self:
+        """Return the helper; the process starts on first request."""
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        """Stop the helper process."""
+        self.close()
+
+    def _ensure(self) -> subprocess.Popen[str]:
+        if self._proc is None or self._proc.poll() is not None:
+            debug("player helper: starting %s", self.argv)
+            self._proc = subprocess.Popen(  # noqa: S603
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        return self._proc
+
+    def _request(self, line: str, timeout: float | None = None) -> str:
+        """Send ``line`` and return what the reply carries after ``OK``.
+
+        A helper silent for ``timeout`` seconds is killed.
+        """
+        proc = self._ensure()
+        if proc.stdin is None or proc.stdout is None:  # pragma: no cover - defensive
+            msg = "player helper has no pipes"
+            raise PlayerError(msg)
+        try:
+            proc.stdin.write(line + "\n")
+            proc.stdin.flush()
+            answered = timeout is None or select.select([proc.stdout], [], [], max(0.0, timeout))[0]
+            reply = proc.stdout.readline().strip() if answered else None
+        except (BrokenPipeError, OSError) as e:
+            self._proc = None
+            msg = f"player helper died: {e}"
+            raise PlayerError(msg) from e
+        if reply is None:
+            self._proc = None
+            proc.kill()
+            proc.wait()
+            msg = f"player helper did not answer within {timeout:.1f}s"
+            raise PlayerError(msg)
+        if not reply:
+            self._proc = None
+            msg = "player helper exited unexpectedly"
+            raise PlayerError(msg)
+        if reply != "OK" and not reply.startswith("OK "):
+            raise PlayerError(reply.removeprefix("ERR ").strip())
+        return reply.removeprefix("OK").strip()
+
+    def ping(self, timeout: float = STARTUP_TIMEOUT) -> None:
+        """Check the helper answers, starting it if needed; one that hangs is killed."""
+        self._request("PING", timeout)
+
+    def load(self, path: str | Path) -> None:
+        self._request(f"LOAD {path}")
+
+    def play(self, path: str | Path, timeout: float | None = None) -> None:
+        debug("player helper: play %s", path)
+        self._request(f"PLAY {path}", timeout)
+
+    def latency(self, path: str | Path, timeout: float = STARTUP_TIMEOUT) -> float:
+        """Return the output latency of the stream ``path`` would play on, in seconds."""
+        return float(self._request(f"LATENCY {path}", timeout))
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.poll() is None and proc.stdin is not None:
+                proc.stdin.write("QUIT\n")
+                proc.stdin.close()
+            proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+        finally:
+            if proc.stdout is not None:
+                proc.stdout.close()
+
+
+def main() -> int:
+    set_verbose(value=False)  # debug lines would corrupt the reply stream
+    start_file_log()  # the file sink is safe: it never touches stdout
+    serve(sys.stdin, sys.stdout, select_backend())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
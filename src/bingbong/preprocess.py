@@ -0,0 +1,131 @@
+"""Install-time clean-up of the chime and pop sounds.
+
+`install` runs every source through :func:`preprocess` once and points the
+config at the results under ``app_support()/sounds/``:
+
+- the WAV header and data are decoded up front, so a corrupt, empty or
+  silent file is rejected at install instead of failing a tick later;
+- leading and trailing silence is trimmed, so the sound starts the moment the
+  player does;
+- the sound is converted to ``CANONICAL_RATE``/``CANONICAL_CHANNELS``, so
+  neither the mixer nor the player resamples at tick time;
+- loudness is normalised to ``TARGET_RMS_DBFS`` RMS, limited so peaks stay
+  below ``PEAK_CEILING_DBFS``.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from array import array
+from typing import TYPE_CHECKING
+
+from bingbong.config import app_support
+from bingbong.log import info
+from bingbong.mixer import MixError, Pcm, convert, decode, write_wav
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__all__ = [
+    "CANONICAL_CHANNELS",
+    "CANONICAL_RATE",
+    "MAX_DURATION",
+    "PEAK_CEILING_DBFS",
+    "SILENCE_DBFS",
+    "TARGET_RMS_DBFS",
+    "normalize",
+    "preprocess",
+    "process",
+    "sounds_dir",
+    "trim_silence",
+]
+
+CANONICAL_RATE = 48000  # the usual output device rate on macOS
+CANONICAL_CHANNELS = 2
+SILENCE_DBFS = -50.0
+TARGET_RMS_DBFS = -20.0
+PEAK_CEILING_DBFS = -1.0
+MAX_DURATION = 30.0  # seconds; anything longer is not a chime
+_PAD = 0.005  # seconds kept around the audible part so attacks are not clipped
+_FULL_SCALE = 32767
+
+
+def _level(dbfs: float) -> float:
+    return _FULL_SCALE * 10 ** (dbfs / 20)
+
+
+def sounds_dir() -> Path:
+    return app_support() / "sounds"
+
+
+def trim_silence(pcm: Pcm, *, threshold_dbfs: float = SILENCE_DBFS, pad: float = _PAD) -> Pcm:
+    """Drop leading and trailing frames quieter than ``threshold_dbfs`` on every channel.
+
+    Raises :class:`MixError` when nothing is louder than the threshold.
+    """
+    threshold = _level(threshold_dbfs)
+    samples, channels = pcm.samples, pcm.channels
+    head = next((i for i, s in enumerate(samples) if abs(s) > threshold), None)
+    if head is None:
+        msg = f"sound is silent (nothing above {threshold_dbfs:g} dBFS)"
+        raise MixError(msg)
+    tail = next(i for i in range(len(samples) - 1, head - 1, -1) if abs(samples[i]) > threshold)
+    keep = round(pad * pcm.rate)
+    first = max(0, head // channels - keep)
+    last = min(pcm.frames, tail // channels + 1 + keep)
+    return Pcm(pcm.samples[first * channels : last * channels], pcm.rate, channels)
+
+
+def normalize(
+    pcm: Pcm, *, target_dbfs: float = TARGET_RMS_DBFS, ceiling_dbfs: float = PEAK_CEILING_DBFS
+) -> Pcm:
+    """Scale ``pcm`` to ``target_dbfs`` RMS without letting peaks exceed ``ceiling_dbfs``."""
+    samples = pcm.samples
+    peak = max(map(abs, samples), default=0)
+    if not peak:
+        return pcm
+    rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+    gain = min(_level(target_dbfs) / rms, _level(ceiling_dbfs) / peak)
+    if math.isclose(gain, 1.0, rel_tol=1e-3):
+        return pcm
+    return Pcm(array("h", (round(s * gain) for s in samples)), pcm.rate, pcm.channels)
+
+
+def process(pcm: Pcm) -> Pcm:
+    """Trim, convert to the canonical format and normalise ``pcm``."""
+    return normalize(convert(trim_silence(pcm), CANONICAL_RATE, CANONICAL_CHANNELS))
+
+
+def preprocess(src: Path, name: str) -> Path:
+    """Validate and clean up ``src``; return the processed copy ``sounds_dir()/<name>.wav``.
+
+    Raises :class:`MixError` when ``src`` is not a usable PCM WAV file.
+    """
+    pcm = decode(src)
+    if not pcm.frames:
+        msg = f"{src} contains no audio"
+        raise MixError(msg)
+    if pcm.duration > MAX_DURATION:
+        msg = f"{src} is too long ({pcm.duration:.1f}s > {MAX_DURATION:g}s)"
+        raise MixError(msg)
+    try:
+        out = process(pcm)
+    except MixError as e:
+        msg = f"{src}: {e}"
+        raise MixError(msg) from e
+    target = sounds_dir() / f"{name}.wav"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    write_wav(out, tmp)
+    tmp.replace(target)
+    info(
+        "preprocessed %s",
+        src,
+        target=target,
+        before_s=pcm.duration,
+        after_s=out.duration,
+        rate=out.rate,
+        channels=out.channels,
+    )
+    return target
@@ -0,0 +1,147 @@
+"""Pre-rendered tick sequences cached under ``app_support()``.
+
+The possible tick outputs are the distinct strikes of the compiled chime rules
+(by default chime + 1..12 pops on the hour and 1/2/3 pops on the quarters).
+`install` renders all of them once; `tick` then does a single lookup and plays
+one file.
+
+Sequences live in ``sequences/<key>/`` where ``key`` hashes the source WAV
+contents, the delays and the output format, so changing `--chime`/`--pop`
+produces a fresh directory. ``index.json`` records the key together with the
+sources' stat signatures, which lets `tick` validate the cache without reading
+the WAVs.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from bingbong.config import app_support
+from bingbong.constants import CHIME_DELAY, POP_DELAY
+from bingbong.log import debug, info
+from bingbong.mixer import SAMPLE_WIDTH, load, render_tick, write_wav
+from bingbong.pattern import compile_rules
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from bingbong.pattern import Strike
+
+__all__ = [
+    "FORMAT_VERSION",
+    "build",
+    "cache_dir",
+    "cache_key",
+    "lookup",
+    "sequence_name",
+]
+
+# Bump when the rendering itself changes so old caches are rebuilt.
+FORMAT_VERSION = 1
+
+
+def cache_dir() -> Path:
+    return app_support() / "sequences"
+
+
+def _index_path() -> Path:
+    return cache_dir() / "index.json"
+
+
+def sequence_name(pop_count: int, *, chime_first: bool = False, chimes: int | None = None) -> str:
+    chimes = int(chime_first) if chimes is None else chimes
+    if chimes == 0:
+        return f"quarter-{pop_count}.wav"
+    if chimes == 1:
+        return f"hour-{pop_count:02d}.wav"
+    return f"chimes-{chimes}-pops-{pop_count:02d}.wav"
+
+
+def _stat_signature(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def cache_key(chime: Path, pop: Path) -> str:
+    """Hash the source WAV contents together with delays and output format."""
+    import hashlib  # noqa: PLC0415 - install-only; keep it off the tick path
+
+    h = hashlib.sha256()
+    for src in (chime, pop):
+        h.update(src.read_bytes())
+        h.update(b"\0")
+    h.update(f"{CHIME_DELAY}|{POP_DELAY}|{SAMPLE_WIDTH}|{FORMAT_VERSION}".encode())
+    return h.hexdigest()[:16]
+
+
+def _sources(chime: Path, pop: Path) -> dict[str, list[str | int]]:
+    return {
+        "chime": [str(chime), *_stat_signature(chime)],
+        "pop": [str(pop), *_stat_signature(pop)],
+    }
+
+
+def build(chime: Path, pop: Path, strikes: Iterable[Strike] | None = None) -> Path:
+    """Render every strike (default: the default rules') and return the cache directory.
+
+    Raises :class:`bingbong.mixer.MixError` when a source cannot be decoded.
+    """
+    import shutil  # noqa: PLC0415 - install-only; keep it off the tick path
+
+    chime_pcm, pop_pcm = load(chime), load(pop)
+    key = cache_key(chime, pop)
+    target = cache_dir() / key
+    target.mkdir(parents=True, exist_ok=True)
+    todo = [s for s in (compile_rules().strikes if strikes is None else strikes) if s]
+    for strike in todo:
+        pcm = render_tick(chime_pcm if strike.chimes else None, pop_pcm, strike.pops, chimes=strike.chimes)
+        write_wav(pcm, target / sequence_name(strike.pops, chimes=strike.chimes))
+    index: dict[str, Any] = {
+        "key": key,
+        "format": FORMAT_VERSION,
+        "chime_delay": CHIME_DELAY,
+        "pop_delay": POP_DELAY,
+        "sources": _sources(chime, pop),
+    }
+    tmp = _index_path().with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    tmp.replace(_index_path())
+    for old in cache_dir().iterdir():
+        if old.is_dir() and old.name != key:
+            shutil.rmtree(old, ignore_errors=True)
+    info("pre-rendered %d sequences into %s", len(todo), target)
+    return target
+
+
+def _index_matches(index: object, chime: Path, pop: Path) -> bool:
+    if not isinstance(index, dict):
+        return False
+    settings = (index.get("format"), index.get("chime_delay"), index.get("pop_delay"))
+    if settings != (FORMAT_VERSION, CHIME_DELAY, POP_DELAY):
+        return False
+    try:
+        return index.get("sources") == _sources(chime, pop)
+    except OSError:
+        return False
+
+
+def lookup(
+    chime: Path, pop: Path, pop_count: int, *, chime_first: bool = False, chimes: int | None = None
+) -> Path | None:
+    """Return the pre-rendered file for this tick, or None when missing or stale."""
+    try:
+        index = json.loads(_index_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        debug("sequence cache: no usable index")
+        return None
+    if not _index_matches(index, chime, pop):
+        debug("sequence cache: stale (sources, delays or format changed)")
+        return None
+    path = cache_dir() / str(index["key"]) / sequence_name(pop_count, chime_first=chime_first, chimes=chimes)
+    if not path.is_file():
+        debug("sequence cache: missing %s", path.name)
+        return None
+    debug("sequence cache: hit %s", path)
+    return path
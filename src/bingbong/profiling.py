@@ -0,0 +1,129 @@
+"""Opt-in profiling: cProfile stats plus a span timeline for one command.
+
+Enabled with ``bingbong --profile <command>`` or ``BINGBONG_PROFILE=1`` (so
+launchd-run ticks can be profiled too). On exit the command writes
+``<command>-<timestamp>-<pid>.pstats`` and ``.trace.json`` (Chrome trace-event
+format, open in chrome://tracing or Perfetto) under ``app_support()/profiles``.
+When disabled, :func:`span` costs one attribute check.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Final, Self
+
+from bingbong.config import app_support
+from bingbong.log import debug
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__all__ = ["enabled", "env_enabled", "finish", "profiles_dir", "span", "start"]
+
+_ENV_FLAG: Final[str] = "BINGBONG_PROFILE"
+
+_state = SimpleNamespace(enabled=False, profiler=None, spans=[], command="bingbong")
+
+
+def env_enabled() -> bool:
+    return os.environ.get(_ENV_FLAG, "") not in {"", "0", "false", "False"}
+
+
+def enabled() -> bool:
+    return _state.enabled
+
+
+def profiles_dir() -> Path:
+    return app_support() / "profiles"
+
+
+class _Span:
+    __slots__ = ("args", "name", "start")
+
+    def __init__(self, name: str, args: dict[str, Any]) -> None:
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> Self:
+        """Start timing when profiling is on."""
+        if _state.enabled:
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        """Record the span when profiling is on."""
+        if _state.enabled and self.start:
+            _state.spans.append((
+                self.name,
+                self.start,
+                time.perf_counter_ns(),
+                threading.get_ident(),
+                self.args,
+            ))
+
+
+def span(name: str, **args: Any) -> _Span:
+    """Time a block as a named span in the profile timeline."""
+    return _Span(name, args)
+
+
+def start(command: str) -> None:
+    """Begin profiling ``command``; imports so far are recorded as one span."""
+    import cProfile  # noqa: PLC0415 - only when profiling
+
+    import bingbong  # noqa: PLC0415
+
+    now = time.perf_counter_ns()
+    _state.enabled = True
+    _state.command = command
+    _state.spans = [("import", bingbong._IMPORT_STARTED_NS, now, threading.get_ident(), {})]  # noqa: SLF001
+    _state.profiler = cProfile.Profile()
+    _state.profiler.enable()
+    debug("profiling %s", command)
+
+
+def _trace_events() -> dict[str, Any]:
+    origin = min((s[1] for s in _state.spans), default=0)
+    pid = os.getpid()
+    events = [
+        {
+            "name": name,
+            "ph": "X",
+            "ts": (begin - origin) / 1000,
+            "dur": (end - begin) / 1000,
+            "pid": pid,
+            "tid": tid,
+            "args": {k: str(v) for k, v in args.items()},
+        }
+        for name, begin, end, tid, args in _state.spans
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"command": _state.command}}
+
+
+def finish() -> tuple[Path, Path] | None:
+    """Stop profiling and write the stats and trace; returns their paths."""
+    if not _state.enabled:
+        return None
+    profiler = _state.profiler
+    if profiler is not None:
+        profiler.disable()
+    out_dir = profiles_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().astimezone().strftime("%Y%m%d-%H%M%S")
+    base = f"{_state.command}-{stamp}-{os.getpid()}"
+    stats_path = out_dir / f"{base}.pstats"
+    trace_path = out_dir / f"{base}.trace.json"
+    if profiler is not None:
+        profiler.dump_stats(stats_path)
+    trace_path.write_text(json.dumps(_trace_events()), encoding="utf-8")
+    _state.enabled = False
+    _state.profiler = None
+    _state.spans = []
+    debug("profile written", stats=stats_path, trace=trace_path)
+    return stats_path, trace_path
@@ -1,32 +1,84 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from onginred.schedule import LaunchdSchedule
 from onginred.service import LaunchdService
 
 from bingbong.config import LABEL
-from bingbong.constants import QUARTER_1, QUARTER_2, QUARTER_3
+from bingbong.core import in_quiet_window
 from bingbong.log import debug
+from bingbong.pattern import compile_rules
+
+if TYPE_CHECKING:
+    from bingbong.pattern import Pattern
+
+__all__ = ["build_resident_schedule", "build_schedule", "calendar_entries", "service"]
+
+
+def calendar_entries(
+    quiet_hours: tuple[int, int] | None = None, pattern: Pattern | None = None
+) -> list[dict[str, int]]:
+    """Smallest StartCalendarInterval set firing at every chime time outside ``quiet_hours``.
 
-__all__ = ["build_schedule", "service"]
+    ``pattern`` defaults to the quarter-hour rules. A minute that plays in
+    every hour of every day needs one minute-only entry; otherwise it gets one
+    entry per hour it still plays in, narrowed to weekdays when a rule does,
+    so launchd never starts a tick that would play nothing.
+    """
+    pattern = pattern or compile_rules()
+    entries: list[dict[str, int]] = []
+    all_hours, all_days = range(24), range(7)
+    for m in pattern.minutes():
+        column = pattern.column(m)
+        hours = [h for h in all_hours if not in_quiet_window(h * 60 + m, quiet_hours)]
+        if len(hours) == len(all_hours) and all(column):
+            entries.append({"minute": m})
+            continue
+        for h in hours:
+            days = [d for d in all_days if column[d * 24 + h]]
+            if len(days) == len(all_days):
+                entries.append({"hour": h, "minute": m})
+            else:
+                # launchd counts weekdays from Sunday = 0; the pattern from Monday = 0
+                entries.extend({"weekday": (d + 1) % 7, "hour": h, "minute": m} for d in days)
+    return entries
+
+
+def build_schedule(
+    quiet_hours: tuple[int, int] | None = None, pattern: Pattern | None = None
+) -> LaunchdSchedule:
+    sched = LaunchdSchedule()
+    for entry in calendar_entries(quiet_hours, pattern):
+        sched.time.add_calendar_entry(**entry)
+    debug(
+        "built schedule with %d calendar entries", len(sched.time.calendar_entries), quiet_hours=quiet_hours
+    )
+    return sched
 
 
-# We build a fixed StartCalendarInterval set for :00/:15/:30/:45 across 24h.
-def build_schedule() -> LaunchdSchedule:
+# The resident `bingbong run` process schedules itself; launchd only keeps it alive.
+def build_resident_schedule() -> LaunchdSchedule:
     sched = LaunchdSchedule()
-    # Every hour at minute 0/15/30/45 (24h)
-    for h in range(24):
-        for m in (0, QUARTER_1, QUARTER_2, QUARTER_3):
-            sched.time.add_calendar_entry(hour=h, minute=m)
-    debug(f"built schedule with {len(sched.time.calendar_entries)} calendar entries")
+    sched.behavior.run_at_load = True
+    sched.behavior.keep_alive = True
+    debug("built resident schedule (RunAtLoad + KeepAlive)")
     return sched
 
 
-def service(plist_path: str | None, program_args: list[str]) -> LaunchdService:
-    debug(f"creating LaunchdService: label={LABEL} plist_path={plist_path} args={program_args}")
+def service(
+    plist_path: str | None,
+    program_args: list[str],
+    *,
+    resident: bool = False,
+    quiet_hours: tuple[int, int] | None = None,
+    pattern: Pattern | None = None,
+) -> LaunchdService:
+    debug("creating LaunchdService", label=LABEL, plist_path=plist_path, args=program_args)
     return LaunchdService(
         bundle_identifier=LABEL,
         command=program_args,  # ProgramArguments
-        schedule=build_schedule(),
+        schedule=build_resident_schedule() if resident else build_schedule(quiet_hours, pattern),
         plist_path=plist_path,  # None -> ~/Library/LaunchAgents/<label>.plist
         # We let logs go to defaults (/var/log/<label>.out/.err)
         launchctl=None,
@@ -0,0 +1,323 @@
+"""Silence calendar: scheduled, possibly recurring, silences.
+
+Entries live in ``app_support()/silences.bin`` (little-endian)::
+
+    header  magic "BBSC" | format u16 | count u32
+    entry   start f64 | end f64 | until f64 | count u32 | interval u16
+            | freq u8 | weekdays u8 | label_len u16 | source_len u16
+            | label (utf-8) | source (utf-8)
+    footer  crc32 u32 over header + entries
+
+The file's digest is stored in the state record (``State.calendar``), so a
+changed calendar changes the day plan key without ticks reading this file.
+
+Recurring entries repeat in local wall-clock time, like the chime rules, so a
+daily 09:00 focus block stays at 09:00 across DST changes. Lookups go through
+an :class:`Index`: the occurrences of a window of days, sorted and merged into
+disjoint intervals, so asking whether an instant is silenced is one bisect
+however many entries the calendar holds.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from bingbong.config import app_support, update_state
+from bingbong.log import debug, info, warning
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+__all__ = [
+    "DAILY",
+    "FORMAT_VERSION",
+    "ONCE",
+    "WEEKLY",
+    "Calendar",
+    "CalendarError",
+    "Entry",
+    "Index",
+    "calendar_path",
+    "decode",
+    "digest",
+    "encode",
+    "index_for",
+    "load",
+    "save",
+    "silenced_until",
+]
+
+FORMAT_VERSION = 1
+_MAGIC = b"BBSC"
+_HEADER = struct.Struct("<4sHI")
+_ENTRY = struct.Struct("<dddIHBBHH")
+_CRC = struct.Struct("<I")
+
+ONCE, DAILY, WEEKLY = 0, 1, 2
+DAY = 86400.0
+# How far past the instant asked about an index reaches; one rebuild serves a
+# week of ticks.
+WINDOW_DAYS = 7
+
+_cache = SimpleNamespace(digest=None, calendar=None, index=None)
+
+
+class CalendarError(ValueError):
+    """Raised when the calendar file is corrupt or from an unknown format."""
+
+
+def calendar_path() -> Path:
+    return app_support() / "silences.bin"
+
+
+def _wall(ts: float) -> datetime:
+    """Naive local wall-clock time of ``ts``."""
+    return datetime.fromtimestamp(ts).astimezone().replace(tzinfo=None)
+
+
+def _epoch(wall: datetime) -> float:
+    return wall.astimezone().timestamp()
+
+
+@dataclass(slots=True, frozen=True)
+class Entry:
+    """One silence; ``start``/``end`` (epoch seconds) bound its first occurrence.
+
+    ``freq`` is :data:`ONCE`, :data:`DAILY` (every ``interval`` days) or
+    :data:`WEEKLY` (every ``interval`` weeks on ``weekdays``, a bitmask with
+    Monday as bit 0; 0 means the first occurrence's weekday). Repeats stop
+    after ``count`` occurrences and before ``until`` when those are set.
+    """
+
+    start: float
+    end: float
+    freq: int = ONCE
+    interval: int = 1
+    weekdays: int = 0
+    until: float = 0.0
+    count: int = 0
+    label: str = ""
+    source: str = ""  # the .ics file it was imported from, if any
+
+    def days(self, skip: int = 0) -> Iterator[int]:
+        """Yield the day offsets (from the first occurrence's date) of the occurrences.
+
+        ``skip`` starts at the repeat period containing that offset; it must be 0
+        when ``count`` limits the repeats, since those count from the first one.
+        """
+        step = max(1, self.interval)
+        if self.freq == DAILY:
+            yield from range(skip // step * step, (self.count or 2**31) * step, step)
+            return
+        first = _wall(self.start).weekday()
+        weekdays = [d for d in range(7) if self.weekdays >> d & 1] or [first]
+        n = 0
+        for week in range((skip + first) // 7 // step * step, 2**31, step):
+            for d in weekdays:
+                offset = week * 7 + d - first
+                if offset < 0:
+                    continue
+                yield offset
+                n += 1
+                if n == self.count:
+                    return
+
+    def occurrences(self, lo: float, hi: float) -> Iterator[tuple[float, float]]:
+        """Yield ``(start, end)`` of every occurrence overlapping ``[lo, hi)``, in order."""
+        if self.freq == ONCE:
+            if self.start < hi and self.end > lo:
+                yield self.start, self.end
+            return
+        duration = self.end - self.start
+        first = _wall(self.start)
+        # Without a count, skip straight to the window (a day of slack for DST).
+        skip = 0 if self.count else max(0, math.floor((lo - duration - self.start) / DAY) - 1)
+        for offset in self.days(skip):
+            start = _epoch(first + timedelta(days=offset))
+            if start >= hi or (self.until and start > self.until):
+                return
+            if start + duration > lo:
+                yield start, start + duration
+
+
+@dataclass(slots=True, frozen=True)
+class Index:
+    """Disjoint silenced intervals covering ``[lo, hi)``, sorted by start."""
+
+    lo: float
+    hi: float
+    starts: array = field(default_factory=lambda: array("d"))
+    ends: array = field(default_factory=lambda: array("d"))
+
+    def covers(self, lo: float, hi: float) -> bool:
+        return self.lo <= lo and hi <= self.hi
+
+    def silenced_until(self, ts: float) -> float | None:
+        """Return the end of the silence containing ``ts``, if any."""
+        i = bisect_right(self.starts, ts) - 1
+        if i >= 0 and ts < self.ends[i]:
+            return self.ends[i]
+        return None
+
+    def overlapping(self, lo: float, hi: float) -> Iterator[tuple[float, float]]:
+        """Yield the intervals overlapping ``[lo, hi)``."""
+        for i in range(bisect_right(self.ends, lo), len(self.starts)):
+            if self.starts[i] >= hi:
+                return
+            yield self.starts[i], self.ends[i]
+
+    def __len__(self) -> int:
+        """Return the number of disjoint intervals."""
+        return len(self.starts)
+
+
+@dataclass(slots=True, frozen=True)
+class Calendar:
+    """The stored entries, with one-off silences sorted for range queries."""
+
+    entries: tuple[Entry, ...] = ()
+    once: tuple[Entry, ...] = field(init=False)
+    once_starts: array = field(init=False)
+    recurring: tuple[Entry, ...] = field(init=False)
+    longest: float = field(init=False)  # longest one-off silence, bounds the range query
+
+    def __post_init__(self) -> None:
+        """Split out the one-off silences, sorted by start."""
+        once = sorted((e for e in self.entries if e.freq == ONCE), key=lambda e: e.start)
+        object.__setattr__(self, "once", tuple(once))
+        object.__setattr__(self, "once_starts", array("d", (e.start for e in once)))
+        object.__setattr__(self, "recurring", tuple(e for e in self.entries if e.freq != ONCE))
+        object.__setattr__(self, "longest", max((e.end - e.start for e in once), default=0.0))
+
+    def index(self, lo: float, hi: float) -> Index:
+        """Build the merged index of every occurrence overlapping ``[lo, hi)``."""
+        first = bisect_left(self.once_starts, lo - self.longest)
+        last = bisect_left(self.once_starts, hi)
+        spans = [(e.start, e.end) for e in self.once[first:last] if e.end > lo]
+        for entry in self.recurring:
+            spans.extend(entry.occurrences(lo, hi))
+        spans.sort()
+        starts, ends = array("d"), array("d")
+        for start, end in spans:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return Index(lo, hi, starts, ends)
+
+
+def encode(entries: Iterable[Entry]) -> bytes:
+    entries = tuple(entries)
+    parts = [_HEADER.pack(_MAGIC, FORMAT_VERSION, len(entries))]
+    for e in entries:
+        label, source = e.label.encode(), e.source.encode()
+        parts.append(
+            _ENTRY.pack(
+                e.start, e.end, e.until, e.count, e.interval, e.freq, e.weekdays, len(label), len(source)
+            )
+        )
+        parts += (label, source)
+    body = b"".join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def decode(data: bytes) -> tuple[Entry, ...]:
+    if len(data) < _HEADER.size + _CRC.size:
+        msg = "calendar truncated"
+        raise CalendarError(msg)
+    magic, fmt, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or fmt != FORMAT_VERSION:
+        msg = f"unknown calendar format: {magic!r} v{fmt}"
+        raise CalendarError(msg)
+    if _CRC.unpack_from(data, len(data) - _CRC.size)[0] != zlib.crc32(data[: -_CRC.size]):
+        msg = "calendar checksum mismatch"
+        raise CalendarError(msg)
+    entries = []
+    pos = _HEADER.size
+    try:
+        for _ in range(count):
+            entry, pos = _entry(data, pos)
+            entries.append(entry)
+    except (struct.error, UnicodeDecodeError) as e:
+        msg = f"calendar entry {len(entries)} unreadable: {e}"
+        raise CalendarError(msg) from e
+    return tuple(entries)
+
+
+def _entry(data: bytes, pos: int) -> tuple[Entry, int]:
+    """Decode the entry at ``pos``; returns it and the position after it."""
+    start, end, until, repeat, interval, freq, weekdays, label_len, source_len = _ENTRY.unpack_from(data, pos)
+    pos += _ENTRY.size
+    label = data[pos : pos + label_len].decode()
+    source = data[pos + label_len : pos + label_len + source_len].decode()
+    entry = Entry(start, end, freq, interval, weekdays, until, repeat, label, source)
+    return entry, pos + label_len + source_len
+
+
+def digest(data: bytes) -> int:
+    """Digest recorded in the state; never 0, which means "no calendar"."""
+    return zlib.crc32(data) or 1
+
+
+def load() -> Calendar:
+    """Read the stored calendar; a missing or unreadable file is an empty one."""
+    try:
+        data = calendar_path().read_bytes()
+    except FileNotFoundError:
+        return Calendar()
+    try:
+        return Calendar(decode(data))
+    except (OSError, CalendarError) as e:
+        warning("silence calendar unreadable (%s); ignoring", e)
+        return Calendar()
+
+
+def save(entries: Iterable[Entry]) -> Calendar:
+    """Atomically replace the stored calendar and record its digest in the state."""
+    calendar = Calendar(tuple(entries))
+    data = encode(calendar.entries)
+    path = calendar_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    update_state(calendar=digest(data) if calendar.entries else 0)
+    _cache.digest = _cache.calendar = _cache.index = None
+    info("silence calendar saved", entries=len(calendar.entries))
+    return calendar
+
+
+def index_for(calendar_digest: int, lo: float, hi: float | None = None) -> Index:
+    """Return an index covering ``[lo, hi)`` for the calendar with ``calendar_digest``.
+
+    The calendar and the last index are kept in memory, so repeated lookups
+    cost a bisect until the calendar changes or the window runs out.
+    """
+    hi = lo if hi is None else hi
+    if _cache.digest != calendar_digest or _cache.calendar is None:
+        _cache.calendar = load() if calendar_digest else Calendar()
+        _cache.digest, _cache.index = calendar_digest, None
+    index = _cache.index
+    if index is None or not index.covers(lo, hi):
+        index = _cache.calendar.index(lo - DAY, max(hi, lo + WINDOW_DAYS * DAY))
+        _cache.index = index
+        debug("silences: indexed %d interval(s)", len(index), entries=len(_cache.calendar.entries))
+    return index
+
+
+def silenced_until(ts: float, calendar_digest: int) -> float | None:
+    """Return the end of the scheduled silence containing ``ts``, if any."""
+    if not calendar_digest:
+        return None
+    return index_for(calendar_digest, ts).silenced_until(ts)
@@ -0,0 +1,170 @@
+"""Compact binary record holding config, silence and quiet hours.
+
+Layout (little-endian)::
+
+    header  magic "BBST" | format u16 | flags u16 | seq u64 | silence_until f64
+            | quiet_start u16 | quiet_end u16 | config_version u16
+            | calendar u32 | player_latency f32 | helper_latency f32
+            | chime_len u16 | pop_len u16 | rules_len u16
+    body    chime path (utf-8) | pop path (utf-8) | rules (utf-8, one per line)
+    footer  crc32 u32 over header + body
+
+``calendar`` is the digest of the silence calendar (:mod:`bingbong.silences`),
+0 when it is empty. ``player_latency`` is the command player's measured
+overhead per sound and ``helper_latency`` the warm player helper's time to
+first audio, both in seconds (see `bingbong bench`).
+
+Writers replace the whole file via temp-file-and-rename, so a reader sees
+either the previous or the next record, never a torn one; the CRC catches
+anything else. ``seq`` increases with every write.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, NamedTuple
+
+__all__ = ["FORMAT_VERSION", "State", "StateError", "decode", "encode", "read", "write"]
+
+FORMAT_VERSION = 1
+_MAGIC = b"BBST"
+_HEADER = struct.Struct("<4sHHQdHHHIffHHH")
+_CRC = struct.Struct("<I")
+
+_HAS_CONFIG = 1
+_HAS_SILENCE = 2
+_HAS_QUIET = 4
+_HAS_RULES = 8
+_HAS_LATENCY = 16
+_HAS_HELPER_LATENCY = 32
+
+
+class StateError(ValueError):
+    """Raised when a state record is corrupt or from an unknown format."""
+
+
+@dataclass(slots=True, frozen=True)
+class State:
+    chime_wav: Path | None = None
+    pop_wav: Path | None = None
+    config_version: int = 1
+    silence_until: float | None = None  # epoch seconds
+    quiet_hours: tuple[int, int] | None = None  # minutes of day, [start, end)
+    rules: tuple[str, ...] | None = None  # None: the default quarter-hour pattern
+    calendar: int = 0  # digest of the silence calendar; 0: no scheduled silences
+    player_latency: float | None = None  # seconds; None: never calibrated
+    helper_latency: float | None = None  # seconds; None: never calibrated
+    seq: int = 0
+
+    @property
+    def has_config(self) -> bool:
+        return self.chime_wav is not None and self.pop_wav is not None
+
+    def replace(self, **changes: Any) -> State:
+        return replace(self, **changes)
+
+
+def encode(state: State) -> bytes:
+    chime = str(state.chime_wav or "").encode()
+    pop = str(state.pop_wav or "").encode()
+    rules = "\n".join(state.rules or ()).encode()
+    flags = (
+        (_HAS_CONFIG if state.has_config else 0)
+        | (_HAS_SILENCE if state.silence_until is not None else 0)
+        | (_HAS_QUIET if state.quiet_hours is not None else 0)
+        | (_HAS_RULES if state.rules is not None else 0)
+        | (_HAS_LATENCY if state.player_latency is not None else 0)
+        | (_HAS_HELPER_LATENCY if state.helper_latency is not None else 0)
+    )
+    quiet_start, quiet_end = state.quiet_hours or (0, 0)
+    header = _HEADER.pack(
+        _MAGIC,
+        FORMAT_VERSION,
+        flags,
+        state.seq,
+        state.silence_until or 0.0,
+        quiet_start,
+        quiet_end,
+        state.config_version,
+        state.calendar,
+        state.player_latency or 0.0,
+        state.helper_latency or 0.0,
+        len(chime),
+        len(pop),
+        len(rules),
+    )
+    body = header + chime + pop + rules
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+class _Header(NamedTuple):
+    magic: bytes
+    format: int
+    flags: int
+    seq: int
+    silence_until: float
+    quiet_start: int
+    quiet_end: int
+    config_version: int
+    calendar: int
+    player_latency: float
+    helper_latency: float
+    chime_len: int
+    pop_len: int
+    rules_len: int
+
+
+def decode(data: bytes) -> State:
+    if len(data) < _HEADER.size + _CRC.size:
+        msg = "state record truncated"
+        raise StateError(msg)
+    h = _Header._make(_HEADER.unpack_from(data))
+    if h.magic != _MAGIC or h.format != FORMAT_VERSION:
+        msg = f"unknown state format: {h.magic!r} v{h.format}"
+        raise StateError(msg)
+    pop_at = _HEADER.size + h.chime_len
+    rules_at = pop_at + h.pop_len
+    end = rules_at + h.rules_len
+    if len(data) != end + _CRC.size or _CRC.unpack_from(data, end)[0] != zlib.crc32(data[:end]):
+        msg = "state record checksum mismatch"
+        raise StateError(msg)
+    rules = data[rules_at:end].decode()
+    return State(
+        chime_wav=Path(data[_HEADER.size : pop_at].decode()) if h.flags & _HAS_CONFIG else None,
+        pop_wav=Path(data[pop_at:rules_at].decode()) if h.flags & _HAS_CONFIG else None,
+        config_version=h.config_version,
+        silence_until=h.silence_until if h.flags & _HAS_SILENCE else None,
+        quiet_hours=(h.quiet_start, h.quiet_end) if h.flags & _HAS_QUIET else None,
+        rules=tuple(rules.split("\n")) if h.flags & _HAS_RULES and rules else None,
+        calendar=h.calendar,
+        player_latency=h.player_latency if h.flags & _HAS_LATENCY else None,
+        helper_latency=h.helper_latency if h.flags & _HAS_HELPER_LATENCY else None,
+        seq=h.seq,
+    )
+
+
+def read(path: Path) -> State | None:
+    """Return the stored state, or None when there is no state file yet."""
+    try:
+        with path.open("rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return decode(data)
+
+
+def write(path: Path, state: State) -> State:
+    """Atomically replace the state file; returns the state with its new ``seq``."""
+    new = state.replace(seq=state.seq + 1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(encode(new))
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+    return new
@@ -0,0 +1,188 @@
+"""One tick: decide what the current minute plays, play it and record it.
+
+Used by `bingbong tick` (one launchd launch per chime time) and by the
+resident `bingbong run` loop, which passes its already-loaded config and a
+warm player helper.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import click
+
+from bingbong import clock, dayplan, journal, metrics
+from bingbong.config import Config, load_state
+from bingbong.constants import CHIME_DELAY, POP_DELAY, TICK_BUDGET
+from bingbong.log import debug, info, warning
+from bingbong.pattern import NOTHING, Strike, compile_rules
+from bingbong.profiling import span
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+    from bingbong.player import PlayerHelper
+    from bingbong.state import State
+
+__all__ = ["due_strike", "tick_once"]
+
+
+def _play_file(path: Path, player: PlayerHelper | None, deadline: float) -> None:
+    from bingbong import audio  # noqa: PLC0415 - audio brings in subprocess
+
+    if player is not None:
+        from bingbong.player import PlayerError  # noqa: PLC0415
+
+        try:
+            player.play(path, timeout=deadline - clock.current().monotonic())
+        except PlayerError as e:
+            debug("tick: player helper failed (%s); using the command player", e)
+        else:
+            return
+    audio.play_once(path, deadline=deadline)
+
+
+def tick_once(cfg: Config | None = None, player: PlayerHelper | None = None) -> None:
+    """Decide what to play for the current time and play it.
+
+    The state file is read once per tick; what to play is one lookup in the
+    day plan compiled from it (chime rules, quiet hours, silence). The config
+    comes from the same state unless a resident process passes its
+    already-loaded ``cfg``. ``player`` is a warm helper process to play
+    pre-rendered sequences through. Only one tick plays per boundary (see
+    :mod:`bingbong.ticklock`). Every decision is appended to the tick journal
+    (see :mod:`bingbong.journal`) and counted in the metrics textfile (see
+    :mod:`bingbong.metrics`). Playback is bounded by ``TICK_BUDGET``; a
+    player that keeps failing is reported and journalled, not retried further.
+
+    With a ``player`` the tick decides for when its first sound will be heard,
+    the helper's ``helper_latency`` (see `bingbong bench`) from now, so a
+    resident loop that wakes that much before a boundary plays the boundary's
+    strike on time.
+    """
+    t0 = time.perf_counter()
+    with span("state load"):
+        state = load_state()
+    lead = 0.0 if player is None else state.helper_latency or 0.0
+    with span("day plan"):
+        now_local, strike = due_strike(state, lead=lead)
+    now = now_local.timestamp()
+    boundary = int(now) // 60 * 60
+    if not strike:
+        reason = _silent_reason(now_local, boundary, state)
+        debug("tick: nothing to play", reason=reason)
+        _record(reason, boundary, now, load_s=time.perf_counter() - t0)
+        return
+    # Only a tick that plays pays for the players, the tick lock and the mixer.
+    from bingbong import audio, ticklock  # noqa: PLC0415
+
+    if cfg is None:
+        cfg = Config.load(state)
+    loaded = time.perf_counter() - t0
+    with ticklock.claim(boundary) as claimed:
+        if not claimed:
+            _record(claimed.dropped, boundary, now, strike, load_s=loaded)
+            return
+        started = time.perf_counter()
+        try:
+            source, outcome = _play_strike(cfg, strike, now_local, player, lead)
+        except audio.PlaybackError as e:
+            click.secho(f"[bingbong] {e}", fg="red", err=True)
+            source, outcome = "", "failed"
+        played = time.perf_counter() - started
+        _record(outcome, boundary, now, strike, load_s=loaded, source=source, play_s=played)
+
+
+def _record(
+    decision: str,
+    boundary: int,
+    now: float,
+    strike: Strike = NOTHING,
+    *,
+    load_s: float,
+    source: str = "",
+    play_s: float | None = None,
+) -> None:
+    """Journal a tick's decision and add it to the metrics."""
+    journal.append(decision, boundary, now, strike, source=source, play_s=play_s or 0.0)
+    metrics.observe(
+        decision,
+        now,
+        late_s=None if decision == "unscheduled" else now - boundary,
+        load_s=load_s,
+        play_s=play_s,
+    )
+
+
+def _silent_reason(now_local: datetime, boundary: int, state: State) -> str:
+    """Why the day plan has nothing at ``now_local``, as a journal decision."""
+    if not compile_rules(state.rules).strike_at(now_local):
+        return "unscheduled"
+    if boundary < (state.silence_until or 0.0):
+        return "silenced"
+    if state.calendar:
+        from bingbong import silences  # noqa: PLC0415 - only with a calendar
+
+        if silences.silenced_until(boundary, state.calendar) is not None:
+            return "calendar"
+    return "quiet"
+
+
+def due_strike(state: State, *, persist: bool = True, lead: float = 0.0) -> tuple[datetime, Strike]:
+    """Return the time ``lead`` seconds from now and what plays in its minute."""
+    now_local = clock.current().now() + timedelta(seconds=lead)
+    debug("tick: begin", now=now_local)
+    plan = dayplan.plan_for(now_local, state, persist=persist)
+    return now_local, plan.entry_at(now_local.timestamp())
+
+
+def _play_strike(
+    cfg: Config, strike: Strike, now_local: datetime, player: PlayerHelper | None, lead: float
+) -> tuple[str, str]:
+    """Play ``strike`` within ``TICK_BUDGET``; return how it played and the journal decision."""
+    from bingbong import audio, mixer, prerender  # noqa: PLC0415
+
+    chimes, pop_count = strike
+    deadline = clock.current().monotonic() + TICK_BUDGET
+    cached = prerender.lookup(cfg.chime_wav, cfg.pop_wav, pop_count, chimes=chimes)
+    if cached:
+        info("tick: playing", source="cache", file=cached.name, chimes=chimes, pops=pop_count)
+        with span("playback", source="cache", file=cached.name):
+            _play_file(cached, player, deadline)
+        debug("tick: done")
+        return "cache", "played"
+    try:
+        with span("mix", chimes=chimes, pops=pop_count):
+            rendered = mixer.render_tick(
+                mixer.load(cfg.chime_wav) if chimes else None,
+                mixer.load(cfg.pop_wav),
+                pop_count,
+                chimes=chimes,
+            )
+    except mixer.MixError as e:
+        warning("tick: cannot mix in-process (%s); playing sounds one by one", e)
+    else:
+        info("tick: playing", source="buffer", chimes=chimes, pops=pop_count)
+        with span("playback", source="buffer", seconds=round(rendered.duration, 3)):
+            audio.play_pcm(rendered, deadline=deadline)
+        debug("tick: done")
+        return "buffer", "played"
+    start_minute = now_local.minute
+
+    def same_minute() -> bool:
+        if (clock.current().now() + timedelta(seconds=lead)).minute == start_minute:
+            return True
+        warning("tick: minute changed mid-sequence; dropping remaining sounds to avoid drift")
+        return False
+
+    sounds = [(cfg.chime_wav, CHIME_DELAY)] * chimes + [(cfg.pop_wav, POP_DELAY)] * pop_count
+    info("tick: playing", source="sequence", chimes=chimes, pops=pop_count)
+    with span("playback", source="sequence", sounds=len(sounds)):
+        dropped = audio.play_sequence(
+            sounds, keep_going=same_minute, deadline=deadline, latency=cfg.player_latency
+        )
+    debug("tick: done")
+    return "sequence", "aborted" if dropped else "played"
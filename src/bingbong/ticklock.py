@@ -0,0 +1,103 @@
+"""Single-instance guard and last-tick record for ticks.
+
+After a wake from sleep launchd can start several queued ticks at once. Each
+tick first claims its boundary (the start of the minute it plays for):
+
+- an exclusive, non-blocking ``flock`` on ``app_support()/tick.lock`` lets only
+  one tick play at a time; the others give up immediately instead of waiting
+  and playing over it;
+- ``app_support()/lasttick`` records the newest boundary claimed, so a
+  duplicate launch for a boundary that already played (or an older one) is
+  dropped.
+
+Queued launches all decide for the minute they run in, so after a wake only
+that minute's strike can play, once.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import struct
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from bingbong import clock
+from bingbong.config import app_support
+from bingbong.log import debug, info
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+__all__ = ["Claim", "claim", "last_tick", "last_tick_path", "lock_path"]
+
+_RECORD = struct.Struct("<qd")  # boundary (epoch s), claimed at (epoch s)
+
+
+@dataclass(slots=True, frozen=True)
+class Claim:
+    """Outcome of :func:`claim`; true when this process should play."""
+
+    dropped: str = ""  # why not: "busy" or "duplicate"
+
+    def __bool__(self) -> bool:
+        """Return whether the tick was claimed."""
+        return not self.dropped
+
+
+def lock_path() -> Path:
+    return app_support() / "tick.lock"
+
+
+def last_tick_path() -> Path:
+    return app_support() / "lasttick"
+
+
+def last_tick() -> tuple[int, float] | None:
+    """Return ``(boundary, claimed_at)`` of the newest claimed tick, if any."""
+    try:
+        data = last_tick_path().read_bytes()
+    except OSError:
+        return None
+    if len(data) != _RECORD.size:
+        return None
+    return _RECORD.unpack(data)
+
+
+def _record(boundary: int, now: float) -> None:
+    path = last_tick_path()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(_RECORD.pack(boundary, now))
+    tmp.replace(path)
+
+
+@contextmanager
+def claim(boundary: int) -> Generator[Claim]:
+    """Yield whether (and if not, why not) this process should play the tick for ``boundary``.
+
+    When it should, the tick lock is held until the block exits.
+    """
+    path = lock_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            info("tick: dropped, another tick is playing", boundary=boundary)
+            yield Claim("busy")
+            return
+        try:
+            now = clock.current().time()
+            last = last_tick()
+            # a record from the future means the clock was set back; ignore it
+            if last is not None and boundary <= last[0] <= now:
+                info("tick: dropped, boundary already played", boundary=boundary, last=last[0])
+                yield Claim("duplicate")
+            else:
+                _record(boundary, now)
+                debug("tick: claimed", boundary=boundary, late_s=now - boundary)
+                yield Claim()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
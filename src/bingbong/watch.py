@@ -0,0 +1,195 @@
+"""Background file watcher used to invalidate cached state instantly.
+
+On Linux it uses inotify (through ``ctypes``, no extra dependency) on the
+file's directory, so atomic replace-by-rename is seen as one event. On macOS
+it waits on a kqueue vnode filter for the directory, which fires when an entry
+is renamed into it; the file's stat signature tells whether the event was
+about the file. Elsewhere, or if neither is available, it polls that
+signature.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import select
+import struct
+import sys
+import threading
+from typing import TYPE_CHECKING, Self
+
+from bingbong.log import debug
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+__all__ = ["POLL_INTERVAL", "Watcher", "signature"]
+
+POLL_INTERVAL = 1.0
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def signature(path: Path) -> tuple[int, int, int] | None:
+    """``(inode, mtime_ns, size)`` of ``path``, or None when it does not exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _inotify_fd(directory: Path) -> int | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes  # noqa: PLC0415 - only for the Linux watcher
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _vnode_fd(directory: Path) -> int | None:
+    if sys.platform != "darwin":
+        return None
+    try:
+        return os.open(directory, os.O_EVTONLY)
+    except OSError:
+        return None
+
+
+class Watcher:
+    """Call ``on_change`` from a daemon thread whenever ``path`` changes."""
+
+    def __init__(self, path: Path, on_change: Callable[[], None], *, interval: float = POLL_INTERVAL) -> None:
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.mode = "poll"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._fd: int | None = None
+        self._wake_r, self._wake_w = -1, -1
+
+    def start(self) -> Self:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = _inotify_fd(self.path.parent)
+        if self._fd is not None:
+            self.mode = "inotify"
+            target = self._run_inotify
+        elif (fd := _vnode_fd(self.path.parent)) is not None:
+            self._fd = fd
+            self.mode = "kqueue"
+            target = self._run_kqueue
+        else:
+            target = self._run_poll
+        if self._fd is not None:
+            self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=target, name="bingbong-watch", daemon=True)
+        self._thread.start()
+        debug("watching %s (%s)", self.path, self.mode)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._wake_w >= 0:
+            with contextlib.suppress(OSError):
+                os.write(self._wake_w, b"x")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd is not None and fd >= 0:
+                with contextlib.suppress(OSError):
+                    os.close(fd)
+        self._fd, self._wake_r, self._wake_w = None, -1, -1
+
+    def __enter__(self) -> Self:
+        """Start watching."""
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        """Stop watching."""
+        self.stop()
+
+    def _run_poll(self) -> None:
+        last = signature(self.path)
+        while not self._stop.wait(self.interval):
+            current = signature(self.path)
+            if current != last:
+                last = current
+                self.on_change()
+
+    def _run_inotify(self) -> None:
+        fd = self._fd
+        if fd is None:
+            return
+        name = os.fsencode(self.path.name)
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd, self._wake_r], [], [])
+            if fd not in ready:
+                continue
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            if name in _event_names(data):
+                self.on_change()
+
+    def _run_kqueue(self) -> None:
+        fd = self._fd
+        if fd is None or sys.platform != "darwin":
+            return
+        kq = select.kqueue()
+        try:
+            kq.control(
+                [
+                    select.kevent(
+                        fd,
+                        select.KQ_FILTER_VNODE,
+                        select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+                        select.KQ_NOTE_WRITE | select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME,
+                    ),
+                    select.kevent(self._wake_r, select.KQ_FILTER_READ, select.KQ_EV_ADD),
+                ],
+                0,
+            )
+            last = signature(self.path)
+            while not self._stop.is_set():
+                events = kq.control(None, 2)
+                if not any(event.ident == fd for event in events):
+                    continue
+                current = signature(self.path)
+                if current != last:
+                    last = current
+                    self.on_change()
+        finally:
+            kq.close()
+
+
+def _event_names(data: bytes) -> set[bytes]:
+    names = set()
+    offset = 0
+    while offset + _EVENT.size <= len(data):
+        _wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+        offset += _EVENT.size
+        names.add(data[offset : offset + length].rstrip(b"\0"))
+        offset += length
+    return names
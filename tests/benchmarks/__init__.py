@@ -0,0 +1,3 @@
+"""Performance benchmarks for bingbong (run with ``pytest -m bench``)."""
+
+__all__ = []
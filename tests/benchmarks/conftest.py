@@ -0,0 +1,129 @@
+"""Minimal benchmark harness with stored baselines.
+
+Each benchmark is timed as a ratio to a reference workload of the same kind
+(``scale``: pure Python, file reads, file writes, process spawns or
+interpreter startup), measured in alternation with it in the same run. A
+slower or busier machine slows both sides alike, so ``baselines.json`` stays
+meaningful across machines where a single pure-Python yardstick does not
+(file system and ``fork``/``exec`` costs vary far more between machines than
+bytecode speed does). A benchmark fails when it is slower than its baseline by
+more than ``BINGBONG_BENCH_TOLERANCE`` percent (default 50). Run with
+``BINGBONG_BENCH_UPDATE=1`` to record new baselines.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+from operator import itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+BASELINES = Path(__file__).with_name("baselines.json")
+DEFAULT_TOLERANCE_PCT = 50.0
+
+
+def _references(scratch: Path) -> dict[str, Callable[[], object]]:
+    """Return the reference workload for each scale."""
+    small = scratch / "reference.bin"
+    small.write_bytes(bytes(256))
+    tmp = scratch / "reference.tmp"
+
+    def python() -> int:
+        return sum(i * i for i in range(2_000))
+
+    def read() -> bytes:
+        small.stat()
+        return small.read_bytes()
+
+    def write() -> None:
+        tmp.write_bytes(bytes(256))
+        tmp.replace(small)
+
+    def process() -> None:
+        subprocess.run(["/bin/sh", "-c", ":"], check=False)
+
+    def interpreter() -> None:
+        subprocess.run([sys.executable, "-c", "pass"], check=False)
+
+    return {"python": python, "read": read, "write": write, "process": process, "interpreter": interpreter}
+
+
+class Bench:
+    def __init__(
+        self,
+        references: dict[str, Callable[[], object]],
+        baselines: dict[str, float],
+        *,
+        update: bool,
+        tolerance: float,
+    ) -> None:
+        self.references = references
+        self.baselines = baselines
+        self.update = update
+        self.tolerance = tolerance
+
+    def __call__(
+        self, name: str, fn: Callable[[], object], *, scale: str, number: int = 1000, repeat: int = 5
+    ) -> float:
+        """Time ``fn`` against the ``scale`` reference and check the ratio against its baseline.
+
+        A new baseline is the median of three measurements; a check that
+        exceeds the limit is measured once more before it fails.
+        """
+        reference = self.references[scale]
+        fn()  # warm caches and lazy imports outside the timed region
+        reference()
+        per_call, units = _ratio(fn, reference, number, repeat)
+        baseline = self.baselines.get(name)
+        if self.update:
+            units = statistics.median([units, *(_ratio(fn, reference, number, repeat)[1] for _ in range(2))])
+            self.baselines[name] = float(f"{units:.4g}")
+        elif baseline is not None and units > baseline * (1 + self.tolerance / 100):
+            per_call, units = min((per_call, units), _ratio(fn, reference, number, repeat), key=itemgetter(1))
+        print(f"bench {name}: {per_call * 1e6:.1f} us ({units:.3g} {scale} units, baseline {baseline})")
+        if self.update:
+            return per_call
+        if baseline is None:
+            pytest.skip(f"no baseline for {name}; record one with BINGBONG_BENCH_UPDATE=1")
+        limit = baseline * (1 + self.tolerance / 100)
+        assert units <= limit, (
+            f"{name} regressed: {units:.3g} {scale} units > {limit:.3g} "
+            f"(baseline {baseline} +{self.tolerance:.0f}%)"
+        )
+        return per_call
+
+
+def _ratio(
+    fn: Callable[[], object], reference: Callable[[], object], number: int, repeat: int
+) -> tuple[float, float]:
+    """Return ``fn``'s best time per call and its ratio to the reference's, both best of ``repeat``."""
+    # Size the reference batch to last as long as one of ``fn``'s, so both are
+    # as likely to be preempted on a busy machine.
+    batch = timeit.timeit(fn, number=number)
+    ref_number = max(1, round(batch / timeit.timeit(reference, number=1)))
+    ref_best, per_call = float("inf"), batch / number
+    for _ in range(repeat):  # alternate so both sides see the same machine load
+        ref_best = min(ref_best, timeit.timeit(reference, number=ref_number) / ref_number)
+        per_call = min(per_call, timeit.timeit(fn, number=number) / number)
+    return per_call, per_call / ref_best
+
+
+@pytest.fixture(scope="session")
+def bench(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Bench]:
+    update = os.environ.get("BINGBONG_BENCH_UPDATE", "") not in {"", "0"}
+    tolerance = float(os.environ.get("BINGBONG_BENCH_TOLERANCE", DEFAULT_TOLERANCE_PCT))
+    baselines = json.loads(BASELINES.read_text(encoding="utf-8")) if BASELINES.exists() else {}
+    references = _references(tmp_path_factory.mktemp("bench-reference"))
+    yield Bench(references, baselines, update=update, tolerance=tolerance)
+    if update:
+        BASELINES.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bingbong import audio, cli, clock, journal, metrics, prerender, silences, ticklock
+from bingbong.clock import SimulatedClock
+from bingbong.config import Config, load_state
+from bingbong.core import compute_pop_count, get_silence_until, set_silence_for, silence_active
+from bingbong.service import build_schedule
+from bingbong.silences import WEEKLY, Entry
+from bingbong.simulate import replay
+from bingbong.state import State
+from bingbong.tick import tick_once
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.benchmarks.conftest import Bench
+
+pytestmark = pytest.mark.bench
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    chime, pop = cli._default_wavs()
+    Config(chime, pop).save()
+    return tmp_path
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_bench_cold_tick_startup(bench: Bench) -> None:
+    env = {**os.environ, "BINGBONG_QUIET_HOURS": "00:00-23:59"}
+    argv = [sys.executable, "-m", "bingbong", "tick"]
+
+    def run() -> None:
+        subprocess.run(argv, env=env, capture_output=True, check=False)
+
+    bench("cold_tick_startup", run, scale="interpreter", number=1)
+
+
+def test_bench_compute_pop_count(bench: Bench) -> None:
+    bench("compute_pop_count", lambda: compute_pop_count(0, 11), scale="python", number=20_000)
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_bench_silence(bench: Bench) -> None:
+    set_silence_for(30)
+    bench("get_silence_until", get_silence_until, scale="read")
+    bench("silence_active", silence_active, scale="read")
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_bench_config_load(bench: Bench) -> None:
+    bench("config_load", Config.load, scale="read")
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_bench_silence_calendar(bench: Bench) -> None:
+    """Scheduled-silence lookups against a calendar of thousands of entries."""
+    start = datetime(2024, 1, 1).astimezone().timestamp()
+    entries = [Entry(start + i * 1800, start + i * 1800 + 600) for i in range(5000)]
+    entries += [Entry(start + i * 600, start + i * 600 + 900, WEEKLY, weekdays=0b11111) for i in range(100)]
+    silences.save(entries)
+    digest = load_state().calendar
+    instants = [start + 50 * 86400 + i * 600 for i in range(1000)]  # a week, every 10 minutes
+
+    def lookups() -> None:
+        for t in instants:
+            silences.silenced_until(t, digest)
+
+    bench("silence_calendar_lookup", lookups, scale="python", number=20)
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_bench_journal_history(bench: Bench) -> None:
+    """A day's range query against a full journal and its rotated files."""
+    start = int(datetime(2024, 1, 1).astimezone().timestamp())
+    per_file = (journal.MAX_BYTES - 16) // 32
+    for n in range(journal.BACKUPS + 1):
+        records = b"".join(
+            journal._RECORD.pack(t + 0.1, t, 1, 0, 1, 1, 100.0, 800.0, 1)
+            for t in range(start + n * per_file * 900, start + (n + 1) * per_file * 900, 900)
+        )
+        journal.journal_paths()[n].write_bytes(journal._HEADER_BYTES + records)
+    day = start + 500 * 86400
+
+    bench("journal_history_day", lambda: list(journal.records(day, day + 86400)), scale="read", number=200)
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_bench_metrics_observe(bench: Bench) -> None:
+    """One tick's metrics update: locked read-modify-write plus the textfile rewrite."""
+    bench(
+        "metrics_observe",
+        lambda: metrics.observe("played", 1e9, late_s=0.4, load_s=0.002, play_s=3.1),
+        scale="write",
+        number=200,
+    )
+
+
+def test_bench_build_schedule(bench: Bench) -> None:
+    bench("build_schedule", build_schedule, scale="python", number=20)
+
+
+def test_bench_tick_end_to_end(bench: Bench, app_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Full in-process tick at 11:00 through a no-op player binary."""
+    fake_player = app_dir / "player"
+    fake_player.write_text("#!/bin/sh\nexit 0\n")
+    fake_player.chmod(0o755)
+    monkeypatch.setattr(audio, "AFPLAY", fake_player)
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+
+    eleven = datetime(2024, 1, 1, 11, 0).astimezone().timestamp() + 0.5
+    sim = SimulatedClock(eleven)
+    cfg = Config.load()
+    prerender.build(cfg.chime_wav, cfg.pop_wav)
+
+    def tick() -> None:
+        ticklock.last_tick_path().unlink(missing_ok=True)  # every run plays, as a fresh boundary would
+        sim.set(eleven)
+        tick_once(cfg)
+
+    with clock.use(sim):
+        bench("tick_end_to_end", tick, scale="process", number=20)
+
+
+def test_bench_simulate_week(bench: Bench) -> None:
+    start = datetime(2024, 1, 1).astimezone()
+    end = datetime(2024, 1, 8).astimezone()
+    bench("simulate_week", lambda: replay(start, end, State()), scale="python", number=5)
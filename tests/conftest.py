@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import pytest
+
+from bingbong.config import invalidate_state_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state_cache() -> None:
+    """Drop the cached state; tests swap app support dirs and fake filesystems."""
+    invalidate_state_cache()
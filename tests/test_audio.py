@@ -1,14 +1,21 @@
+import os
+import subprocess
+from array import array
 from pathlib import Path
 
 import pytest
 
-from bingbong.audio import AFPLAY, play_once, play_repeated
+from bingbong import audio, clock
+from bingbong.audio import AFPLAY, PlaybackError, play_once, play_pcm, play_repeated, play_sequence
+from bingbong.clock import SimulatedClock
+from bingbong.constants import PLAYER_RETRIES
+from bingbong.mixer import Pcm
 
 
 def test_play_once_missing_file(fs):
     missing = Path("/no.wav")  # pyfakefs: path does not exist
     assert not fs.exists(str(missing))
-    with pytest.raises(SystemExit):
+    with pytest.raises(PlaybackError, match="audio file not found"):
         play_once(missing)
 
 
@@ -16,9 +23,35 @@ def test_play_once_nonzero(fake_process, fs):
     f = Path("/a.wav")
     fs.create_file(str(f), contents="0")
     # Expect the player to be invoked and return a non-zero exit code.
-    fake_process.register_subprocess(([AFPLAY, str(f)]), returncode=1)
-    with pytest.raises(SystemExit):
+    fake_process.register_subprocess(([AFPLAY, str(f)]), returncode=1, occurrences=1 + PLAYER_RETRIES)
+    with pytest.raises(PlaybackError, match="exited with code 1"):
         play_once(f)
+    assert fake_process.call_count([AFPLAY, str(f)]) == 1 + PLAYER_RETRIES
+
+
+def test_play_once_retries_then_succeeds(fake_process, fs):
+    f = Path("/a.wav")
+    fs.create_file(str(f), contents="0")
+    fake_process.register_subprocess([AFPLAY, str(f)], returncode=1)
+    fake_process.register_subprocess([AFPLAY, str(f)], returncode=0)
+    play_once(f)
+    assert fake_process.call_count([AFPLAY, str(f)]) == 2
+
+
+def test_play_once_kills_a_hung_player(fs, mocker):
+    f = Path("/a.wav")
+    fs.create_file(str(f), contents="0")  # not a WAV: length unknown
+    run = mocker.patch("bingbong.audio.subprocess.run", side_effect=subprocess.TimeoutExpired("p", 1))
+    with pytest.raises(PlaybackError, match="killed after"):
+        play_once(f, deadline=clock.current().monotonic() + 2.5)
+    timeouts = [c.kwargs["timeout"] for c in run.call_args_list]
+    assert len(timeouts) == 1 + PLAYER_RETRIES
+    assert all(t <= 2.5 for t in timeouts)
+    # a deadline already passed fails without starting a player
+    run.reset_mock()
+    with pytest.raises(PlaybackError, match="no time left"):
+        play_once(f, deadline=clock.current().monotonic())
+    run.assert_not_called()
 
 
 def test_play_repeated_calls(fake_process, fs):
@@ -32,3 +65,47 @@ def test_play_repeated_calls(fake_process, fs):
     # Ensure exactly three invocations happened.
     # fake_process.calls is a list of arg-lists.
     assert fake_process.call_count([AFPLAY, str(f)]) == 3
+
+
+@pytest.fixture
+def timed_player(fs, mocker):
+    """Each play lasts one simulated second; returns the (name, start) of every play."""
+    for name in ("a.wav", "b.wav"):
+        fs.create_file(f"/{name}", contents="0")
+    starts = []
+
+    def run(path, _timeout):
+        starts.append((path.name, round(clock.current().monotonic(), 3)))
+        clock.current().advance(1.0)
+        return 0
+
+    mocker.patch.object(audio, "_run_player", side_effect=run)
+    with clock.use(SimulatedClock(0.0)):
+        yield starts
+
+
+def test_play_sequence_spaces_sounds_by_their_gaps(timed_player):
+    sounds = [(Path("/a.wav"), 0.5), (Path("/b.wav"), 0.25), (Path("/b.wav"), 0.25)]
+    assert play_sequence(sounds) == 0
+    assert timed_player == [("a.wav", 0.0), ("b.wav", 1.5), ("b.wav", 2.75)]
+    timed_player.clear()
+    play_sequence(sounds, latency=0.3)  # the gaps start when the player exits
+    assert timed_player == [("a.wav", 3.75), ("b.wav", 4.95), ("b.wav", 5.95)]
+
+
+def test_play_sequence_drops_the_rest(timed_player):
+    sounds = [(Path("/a.wav"), 0.5)] + [(Path("/b.wav"), 0.25)] * 4
+    assert play_sequence(sounds, keep_going=lambda: len(timed_player) < 2) == 3
+    assert [name for name, _ in timed_player] == ["a.wav", "b.wav"]
+    timed_player.clear()
+    assert play_sequence(sounds, deadline=clock.current().monotonic() + 2.0) == 3  # out of time
+    assert len(timed_player) == 2
+
+
+def test_play_pcm_single_invocation(fake_process, tmp_path, monkeypatch):
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    rendered = tmp_path / f"render-{os.getpid()}.wav"
+    fake_process.register_subprocess([AFPLAY, str(rendered)], returncode=0)
+    play_pcm(Pcm(array("h", [0] * 8), 8000, 1))
+    assert fake_process.call_count([AFPLAY, str(rendered)]) == 1
+    assert not rendered.exists()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import audio
+from bingbong.calibrate import measure, measure_helper, summarize
+from bingbong.cli import cli as cli_group
+from bingbong.config import Config, load_state
+from bingbong.player import PlayerHelper
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def player(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.setattr(sys, "platform", "darwin")
+    path = tmp_path / "player"
+    # a player that takes 50 ms longer than the 0.2 s probe
+    path.write_text('#!/bin/sh\necho "$1" >> "$(dirname "$0")/played"\nsleep 0.25\n', encoding="utf-8")
+    path.chmod(0o755)
+    monkeypatch.setattr(audio, "AFPLAY", path)
+    monkeypatch.setenv("BINGBONG_PLAYER", str(path))  # the helper plays through it too
+    return path
+
+
+def test_summarize_percentiles() -> None:
+    stats = summarize([i / 1000 for i in range(1, 101)])
+    assert stats["p50"] == pytest.approx(0.0505)
+    assert stats["p95"] == pytest.approx(0.09505)
+    assert stats["p99"] == pytest.approx(0.09901)
+    assert (stats["min"], stats["max"]) == (0.001, 0.1)
+    assert stats["stdev"] == pytest.approx(0.02901, abs=1e-5)
+
+
+def test_measure_discards_the_warm_up_run(player: Path) -> None:
+    overheads = measure(3, player)
+    assert len(overheads) == 3
+    assert all(o >= 0.04 for o in overheads)
+    assert len((player.parent / "played").read_text().splitlines()) == 4
+
+
+def test_measure_helper_adds_the_round_trip() -> None:
+    with PlayerHelper(["/bin/sh", "-c", 'while read -r cmd path; do echo "OK 0.010000"; done']) as helper:
+        latencies = measure_helper(3, helper)
+    assert len(latencies) == 3
+    assert all(0.01 < latency < 1 for latency in latencies)
+
+
+def test_bench_stores_the_median(tmp_path: Path) -> None:
+    res = CliRunner().invoke(cli_group, ["bench", "-n", "3"])
+    assert res.exit_code == 0, res.output
+    assert "p50 " in res.output
+    assert "p99 " in res.output
+    assert "helper   not measured: the command player does not report" in res.output
+    assert "Saved: `run` starts ticks on their boundary" in res.output
+    state = load_state()
+    latency = state.player_latency
+    assert latency is not None
+    assert latency > 0
+    assert state.helper_latency is None
+    Config(tmp_path / "c.wav", tmp_path / "p.wav").save()  # a later install keeps it
+    assert Config.load().player_latency == latency
+
+    res = CliRunner().invoke(cli_group, ["bench", "-n", "2", "--no-save"])
+    assert res.exit_code == 0, res.output
+    assert "Saved" not in res.output
+
+
+def test_bench_reports_a_failing_player(player: Path) -> None:
+    player.write_text("#!/bin/sh\necho 'no output device' >&2\nexit 2\n", encoding="utf-8")
+    res = CliRunner().invoke(cli_group, ["bench"])
+    assert res.exit_code == 1
+    assert "failed on silence.wav (exit 2): no output device" in res.output
+    assert load_state().player_latency is None
@@ -1,10 +1,13 @@
 import os
 import sys
+from pathlib import Path
 
 from click.testing import CliRunner
 
 from bingbong import __version__  # noqa: F401  # simple import sanity check
-from bingbong.cli import _default_wavs, cli, compute_pop_count
+from bingbong.cli import _default_wavs, cli
+from bingbong.config import load_state
+from bingbong.core import compute_pop_count
 
 
 def test_import():
@@ -49,12 +52,12 @@ def test_status_silence_resume(fs, mocker):
     res2 = runner.invoke(cli, ["silence", "--minutes", "1"])
     assert res2.exit_code == 0
     assert "[bingbong] Silenced until" in res2.output
-    silence_file = "/AppSupport/silence_until.json"
-    assert fs.exists(silence_file)
+    assert fs.exists("/AppSupport/state.bin")
+    assert load_state().silence_until is not None
     res3 = runner.invoke(cli, ["resume"])
     assert res3.exit_code == 0
     assert "[bingbong] Silence cleared" in res3.output
-    assert not fs.exists(silence_file)
+    assert load_state().silence_until is None
 
 
 def test_install_platform_guard(mocker):
@@ -63,3 +66,45 @@ def test_install_platform_guard(mocker):
     res = runner.invoke(cli, ["install", "--chime", __file__, "--pop", __file__])
     assert res.exit_code != 0
     assert "macOS (Darwin) only" in res.output
+
+
+class _FakeService:
+    def __init__(self, plist_path, args, **kwargs):
+        self.plist_path = Path(plist_path)
+        self.body = f"{args} {kwargs}\n"
+
+    def install(self):
+        self.plist_path.write_text(self.body)
+        _FakeService.loads.append(self.plist_path)
+
+
+def test_install_skips_when_nothing_changed(tmp_path, mocker):
+    from bingbong import audio
+
+    mocker.patch.dict(os.environ, {"BINGBONG_APP_SUPPORT": str(tmp_path)}, clear=False)
+    mocker.patch.object(sys, "platform", "darwin")
+    player = tmp_path / "player"
+    player.write_text("#!/bin/sh\nexit 0\n")
+    player.chmod(0o755)
+    mocker.patch.object(audio, "AFPLAY", player)
+    _FakeService.loads = []
+    mocker.patch("bingbong.service.service", side_effect=_FakeService)
+    plist = tmp_path / "job.plist"
+    runner = CliRunner()
+
+    def install(*extra):
+        res = runner.invoke(cli, ["install", "--plist-path", str(plist), "--no-preprocess", *extra])
+        assert res.exit_code == 0, res.output
+        return res.output
+
+    assert "Installed" in install()
+    assert "up to date; nothing to do" in install()
+    assert len(_FakeService.loads) == 1
+    install("--quiet-hours", "22:00-07:00")  # a changed setting reinstalls
+    assert "up to date" in install("--quiet-hours", "22:00-07:00")
+    install("--quiet-hours", "22:00-07:00", "--force")
+    assert len(_FakeService.loads) == 3
+    plist.write_text("edited by hand\n")  # what is on disk counts, not just the stamp
+    install("--quiet-hours", "22:00-07:00")
+    assert len(_FakeService.loads) == 4
+    assert load_state().quiet_hours == (22 * 60, 7 * 60)
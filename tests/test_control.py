@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import control, dayplan
+from bingbong.cli import cli
+from bingbong.config import Config, load_state
+from bingbong.control import ControlError
+from bingbong.daemon import CONTROL_HANDLERS
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(dayplan, "_cache", dayplan.SimpleNamespace(plan=None, key=None))
+    monkeypatch.setattr(sys, "platform", "darwin")
+    Config(Path("/c.wav"), Path("/p.wav")).save()
+    return tmp_path
+
+
+@contextmanager
+def _resident(handlers: Mapping[str, control.Handler] = CONTROL_HANDLERS) -> Generator[object]:
+    """Serve ``handlers`` from an event loop in a background thread."""
+    loop = asyncio.new_event_loop()
+    started: list[object] = []
+    ready = threading.Event()
+
+    def run() -> None:
+        started.append(loop.run_until_complete(control.serve(handlers)))
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    try:
+        yield started[0]
+    finally:
+        asyncio.run_coroutine_threadsafe(control.close(started[0]), loop).result(5)  # type: ignore[arg-type]
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+def test_no_resident_means_files() -> None:
+    assert control.request("status") is None
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(control.socket_path()))  # left behind by a crashed process
+    stale.close()
+    assert control.request("status") is None
+
+
+def test_served_from_memory() -> None:
+    with _resident():
+        reply = control.request("silence", minutes=5)
+        assert reply is not None
+        assert load_state().silence_until == pytest.approx(reply["until"])
+        status = control.request("status", count=2)
+        assert status is not None
+        assert status["pid"] == os.getpid()
+        assert status["silence_until"] == pytest.approx(reply["until"])
+        assert len(status["next"]) == 2
+        assert control.request("resume") == {"ok": True}
+        assert load_state().silence_until is None
+        upcoming = control.request("next", count=3)
+        assert upcoming is not None
+        assert len(upcoming["next"]) == 3
+        with pytest.raises(ControlError, match="minutes must be > 0"):
+            control.request("silence", minutes=0)
+        with pytest.raises(ControlError, match="bad request"):
+            control.request("launch")
+    assert not control.socket_path().exists()
+
+
+def test_second_resident_does_not_take_over() -> None:
+    with _resident() as first:
+        assert first is not None
+        with _resident() as second:
+            assert second is None
+        assert control.request("next", count=1) is not None
+
+
+def test_commands_use_the_resident_process(mocker: MockerFixture) -> None:
+    runner = CliRunner()
+    with _resident():
+        request = mocker.spy(control, "request")
+        res = runner.invoke(cli, ["silence", "--minutes", "5"])
+        assert res.exit_code == 0, res.output
+        assert "Silenced until" in res.output
+        assert request.call_args.args == ("silence",)
+        res = runner.invoke(cli, ["status", "--next", "2"])
+        assert res.exit_code == 0, res.output
+        assert f"Resident: running (pid {os.getpid()})" in res.output
+        assert "Silenced for another ~" in res.output
+        res = runner.invoke(cli, ["resume"])
+        assert res.exit_code == 0, res.output
+        assert load_state().silence_until is None
+    res = runner.invoke(cli, ["next", "-n", "2"])
+    assert res.exit_code == 0, res.output
+    assert len(res.output.splitlines()) == 2
+    assert "Resident" not in runner.invoke(cli, ["status"]).output
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bingbong import clock, journal
+from bingbong.clock import SimulatedClock
+from bingbong.config import Config
+from bingbong.daemon import STALE_AFTER, _resident_tick, next_boundary, run_loop
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        ("2024-01-01 10:00:00", "2024-01-01 10:15:00"),
+        ("2024-01-01 10:14:59.999", "2024-01-01 10:15:00"),
+        ("2024-01-01 10:15:00", "2024-01-01 10:30:00"),
+        ("2024-01-01 10:44:10", "2024-01-01 10:45:00"),
+        ("2024-01-01 23:50:00", "2024-01-02 00:00:00"),
+    ],
+)
+def test_next_boundary(now: str, expected: str) -> None:
+    assert next_boundary(datetime.fromisoformat(now)) == datetime.fromisoformat(expected)
+
+
+def test_next_boundary_follows_rule_minutes() -> None:
+    now = datetime.fromisoformat("2024-01-01 10:52:00")
+    assert next_boundary(now, (0, 5, 10, 55)) == datetime.fromisoformat("2024-01-01 10:55:00")
+    assert next_boundary(now, (7,)) == datetime.fromisoformat("2024-01-01 11:07:00")
+
+
+def _scripted_clock(*stamps: str) -> Callable[[], datetime]:
+    times = iter(datetime.fromisoformat(s) for s in stamps)
+    last: list[datetime] = []
+
+    def clock() -> datetime:
+        last[:] = [next(times, last[0] if last else datetime.fromisoformat(stamps[-1]))]
+        return last[0]
+
+    return clock
+
+
+def test_run_loop_ticks_once_per_boundary() -> None:
+    clock = _scripted_clock(
+        "2024-01-01 10:14:59.999",  # pick target 10:15
+        "2024-01-01 10:14:59.999",  # 1 ms remaining -> short wait
+        "2024-01-01 10:15:00.002",  # boundary reached
+    )
+    calls: list[str] = []
+
+    async def main() -> None:
+        stop = asyncio.Event()
+
+        def on_tick() -> None:
+            calls.append("tick")
+            stop.set()
+
+        await run_loop(on_tick, clock=clock, stop=stop)
+
+    asyncio.run(main())
+    assert calls == ["tick"]
+
+
+def test_run_loop_skips_stale_boundary() -> None:
+    late = datetime.fromisoformat("2024-01-01 10:15:00") + timedelta(seconds=STALE_AFTER + 5)
+    clock = _scripted_clock(
+        "2024-01-01 10:14:59.999",
+        late.isoformat(),  # woke far past the boundary (e.g. machine slept)
+        "2024-01-01 10:29:59.999",  # next target 10:30
+        "2024-01-01 10:30:00",
+    )
+    calls: list[str] = []
+
+    async def main() -> None:
+        stop = asyncio.Event()
+
+        def on_tick() -> None:
+            calls.append("tick")
+            stop.set()
+
+        await run_loop(on_tick, clock=clock, stop=stop)
+
+    asyncio.run(main())
+    assert calls == ["tick"]
+
+
+def test_run_loop_wakes_early_by_the_lead() -> None:
+    script = _scripted_clock(
+        "2024-01-01 10:14:59.000",  # pick target 10:15, wake at 10:14:59.700
+        "2024-01-01 10:14:59.701",  # woke early for 10:15
+        "2024-01-01 10:14:59.800",  # still before 10:15, which has played: pick 10:16
+        "2024-01-01 10:15:59.600",  # 100 ms to go
+        "2024-01-01 10:15:59.701",
+    )
+    seen: list[datetime] = []
+
+    def clock() -> datetime:
+        seen.append(script())
+        return seen[-1]
+
+    ticked: list[datetime] = []
+
+    async def main() -> None:
+        stop = asyncio.Event()
+
+        def on_tick() -> None:
+            ticked.append(seen[-1])
+            if len(ticked) == 2:
+                stop.set()
+
+        await run_loop(on_tick, clock=clock, stop=stop, minutes=lambda: range(60), lead=lambda: 0.3)
+
+    asyncio.run(main())
+    assert ticked == [
+        datetime.fromisoformat("2024-01-01 10:14:59.701"),
+        datetime.fromisoformat("2024-01-01 10:15:59.701"),
+    ]
+
+
+def test_run_loop_stops_while_waiting() -> None:
+    clock = _scripted_clock("2024-01-01 10:00:00")
+    calls: list[str] = []
+
+    async def main() -> None:
+        stop = asyncio.Event()
+        task = asyncio.create_task(run_loop(lambda: calls.append("tick"), clock=clock, stop=stop))
+        await asyncio.sleep(0)
+        stop.set()
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(main())
+    assert not calls
+
+
+def test_resident_loop_survives_a_missing_sound(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A sound deleted under a running loop fails each tick; the loop keeps going."""
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    Config(tmp_path / "chime.wav", tmp_path / "pop.wav").save()
+    boundaries = ["2024-01-01 11:00:00", "2024-01-01 11:15:00"]
+    loop_clock = _scripted_clock(
+        "2024-01-01 10:59:59.999",
+        "2024-01-01 11:00:00.001",
+        "2024-01-01 11:14:59.999",
+        "2024-01-01 11:15:00.001",
+    )
+    sim = SimulatedClock(0.0)
+    ticked: list[str] = []
+
+    async def main() -> None:
+        stop = asyncio.Event()
+
+        def on_tick() -> None:
+            sim.set(datetime.fromisoformat(boundaries[len(ticked)]).astimezone())
+            _resident_tick(None)
+            ticked.append("tick")
+            if len(ticked) == len(boundaries):
+                stop.set()
+
+        await run_loop(on_tick, clock=loop_clock, stop=stop)
+
+    with clock.use(sim):
+        asyncio.run(main())
+    assert [r.decision for r in journal.records()] == ["failed", "failed"]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+from freezegun import freeze_time
+
+from bingbong import dayplan
+from bingbong.cli import cli
+from bingbong.config import Config, load_state
+from bingbong.core import in_quiet_window
+from bingbong.pattern import NOTHING, Strike, compile_rules
+from bingbong.state import State
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(dayplan, "_cache", dayplan.SimpleNamespace(plan=None, key=None))
+    return tmp_path
+
+
+@pytest.fixture
+def new_york(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _local(spec: str) -> datetime:
+    return datetime.fromisoformat(spec).astimezone()
+
+
+def _entry(plan: dayplan.DayPlan, spec: str) -> tuple[int, bool]:
+    return plan.entry_at(_local(spec).timestamp())
+
+
+def test_regular_day() -> None:
+    plan = dayplan.compile_day(_local("2024-01-01 12:00"), State())
+    assert len(plan.slots) == 1440
+    assert _entry(plan, "2024-01-01 00:00") == Strike(1, 12)
+    assert _entry(plan, "2024-01-01 10:00:30") == Strike(1, 10)
+    assert _entry(plan, "2024-01-01 10:15") == Strike(0, 1)
+    assert _entry(plan, "2024-01-01 10:45") == Strike(0, 3)
+    assert _entry(plan, "2024-01-01 10:07") == NOTHING
+    assert _entry(plan, "2024-01-02 10:00") == NOTHING  # outside the plan
+    assert sum(1 for s in plan.slots if s) == 96
+
+
+def test_quiet_hours_and_silence(monkeypatch: pytest.MonkeyPatch) -> None:
+    silence_until = _local("2024-01-01 12:20").timestamp()
+    plan = dayplan.compile_day(
+        _local("2024-01-01"), State(quiet_hours=(22 * 60, 7 * 60), silence_until=silence_until)
+    )
+    assert _entry(plan, "2024-01-01 06:45") == NOTHING
+    assert _entry(plan, "2024-01-01 07:00") == NOTHING  # silenced
+    assert _entry(plan, "2024-01-01 12:15") == NOTHING
+    assert _entry(plan, "2024-01-01 12:30") == Strike(0, 2)
+    assert _entry(plan, "2024-01-01 21:45") == Strike(0, 3)
+    assert _entry(plan, "2024-01-01 22:00") == NOTHING
+    monkeypatch.setenv("BINGBONG_QUIET_HOURS", "12:00-13:00")
+    plan = dayplan.compile_day(_local("2024-01-01"), State(quiet_hours=(22 * 60, 7 * 60)))
+    assert _entry(plan, "2024-01-01 12:30") == NOTHING
+    assert _entry(plan, "2024-01-01 23:00") == Strike(1, 11)
+
+
+@pytest.mark.usefixtures("new_york")
+def test_dst_transitions() -> None:
+    spring = dayplan.compile_day(_local("2024-03-10 12:00"), State())
+    assert len(spring.slots) == 23 * 60
+    assert _entry(spring, "2024-03-10 01:45") == Strike(0, 3)
+    assert _entry(spring, "2024-03-10 03:00") == Strike(1, 3)
+    autumn = dayplan.compile_day(_local("2024-11-03 12:00"), State())
+    assert len(autumn.slots) == 25 * 60
+    first_one_am = _local("2024-11-03 01:00").timestamp()
+    assert autumn.entry_at(first_one_am) == Strike(1, 1)
+    assert autumn.entry_at(first_one_am + 3600) == Strike(1, 1)  # the repeated hour chimes again
+    assert sum(1 for s in autumn.slots if s) == 100
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_plan_cached_on_disk_and_rebuilt_on_change(mocker: MockerFixture) -> None:
+    now = _local("2024-01-01 10:00")
+    plan = dayplan.plan_for(now, State())
+    assert dayplan.plan_path().exists()
+    compile_day = mocker.spy(dayplan, "compile_day")
+    dayplan._cache.plan = None
+    assert dayplan.plan_for(now, State()) == plan  # read back from disk
+    assert dayplan.plan_for(_local("2024-01-01 23:59"), State()) == plan
+    compile_day.assert_not_called()
+    dayplan.plan_for(now, State(silence_until=now.timestamp() + 60))
+    dayplan.plan_for(_local("2024-01-02 00:00"), State(silence_until=now.timestamp() + 60))
+    assert compile_day.call_count == 2
+
+
+@pytest.mark.usefixtures("app_dir", "new_york")
+def test_plan_rebuilt_after_a_time_zone_change(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert _entry(dayplan.plan_for(_local("2024-01-01 10:00"), State()), "2024-01-01 10:00") == Strike(1, 10)
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    now = _local("2024-01-01 10:00")
+    assert dayplan.plan_for(now, State()).entry_at(now.timestamp()) == Strike(1, 10)
+    dayplan._cache.plan = None
+    assert dayplan.plan_for(now, State()).entry_at(now.timestamp()) == Strike(1, 10)  # not the cached file
+
+
+@pytest.mark.parametrize("quiet", [None, (22 * 60, 7 * 60), (11 * 60 + 7, 13 * 60), (0, 0)])
+@pytest.mark.parametrize("day", ["2024-01-01", "2024-03-10", "2024-11-03"])
+@pytest.mark.usefixtures("new_york")
+def test_compiled_day_matches_minute_by_minute(day: str, quiet: tuple[int, int] | None) -> None:
+    state = State(quiet_hours=quiet, rules=("*/5 * * pop", "0 9-17 mon-fri chime pop*hour"))
+    plan = dayplan.compile_day(_local(f"{day} 12:00"), state)
+    pattern = compile_rules(state.rules)
+    for i, idx in enumerate(plan.slots):
+        wall = datetime.fromtimestamp(plan.start + i * 60).astimezone()
+        expected = (
+            NOTHING if in_quiet_window(wall.hour * 60 + wall.minute, quiet) else pattern.strike_at(wall)
+        )
+        assert plan.strikes[idx] == expected, wall
+
+
+def test_upcoming_crosses_midnight() -> None:
+    got = list(dayplan.upcoming(_local("2024-01-01 23:40"), State(), 3))
+    assert [(w.strftime("%d %H:%M"), s) for w, s in got] == [
+        ("01 23:45", Strike(0, 3)),
+        ("02 00:00", Strike(1, 12)),
+        ("02 00:15", Strike(0, 1)),
+    ]
+
+
+def test_status_lists_next_chimes(app_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("sys.platform", "darwin")
+    Config(app_dir / "c.wav", app_dir / "p.wav", quiet_hours=(11 * 60, 12 * 60)).save()
+    assert load_state().has_config
+    with freeze_time("2024-01-01 10:50:00"):
+        res = CliRunner().invoke(cli, ["status", "--next", "2"])
+    assert res.exit_code == 0, res.output
+    assert "Quiet hours: 11:00-12:00" in res.output
+    assert "Next chimes:\n  Mon 12:00  chime + 12 pop(s)\n  Mon 12:15  1 pop(s)\n" in res.output
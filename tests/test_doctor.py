@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import plistlib
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import audio, cli, doctor
+from bingbong.cli import cli as cli_group
+from bingbong.config import Config, state_path, update_state
+from bingbong.doctor import Check, CheckError, run_checks
+from bingbong.service import build_schedule
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(sys, "platform", "darwin")
+    player = tmp_path / "player"
+    player.write_text("#!/bin/sh\nexit 0\n")
+    player.chmod(0o755)
+    monkeypatch.setattr(audio, "AFPLAY", player)
+    return tmp_path
+
+
+def _install(app_dir: Path, schedule: list[dict[str, int]] | None = None) -> Path:
+    chime, pop = cli._default_wavs()
+    Config(chime, pop).save()
+    plist = app_dir / "job.plist"
+    entries = build_schedule().to_plist_dict()["StartCalendarInterval"] if schedule is None else schedule
+    plist.write_bytes(
+        plistlib.dumps({
+            "ProgramArguments": [sys.executable, "-m", "bingbong", "tick"],
+            "StartCalendarInterval": entries,
+        })
+    )
+    return plist
+
+
+def test_doctor_passes_on_a_healthy_install(app_dir: Path) -> None:
+    plist = _install(app_dir)
+    res = CliRunner().invoke(cli_group, ["doctor", "--plist-path", str(plist)])
+    assert res.exit_code == 0, res.output
+    lines = res.output.splitlines()
+    assert lines[0].startswith("✅ player ")
+    assert "chime.wav: " in lines[1]
+    assert "pop.wav: " in lines[2]
+    assert "state.bin intact" in lines[3]
+    assert "job.plist: 4 calendar entries match the config" in lines[4]
+    assert lines[6].startswith("6 checks in ")
+
+
+def test_plist_without_launches_matches_an_always_quiet_config(app_dir: Path) -> None:
+    plist = _install(app_dir, schedule=[])
+    update_state(quiet_hours=(0, 24 * 60))
+    (result,) = run_checks([Check("plist", doctor._plist(plist))])
+    assert result.status == "ok", result.detail
+    assert result.detail.startswith("job.plist: no scheduled launches")
+
+
+def test_doctor_fails_on_stale_plist_and_corrupt_state(app_dir: Path) -> None:
+    plist = _install(app_dir, [{"Minute": 0}])
+    res = CliRunner().invoke(cli_group, ["doctor", "--plist-path", str(plist)])
+    assert res.exit_code == 1
+    assert "❌ plist " in res.output
+    assert "schedule (1 entries) does not match the config (4)" in res.output
+
+    state_path().write_bytes(b"BBST garbage")
+    assert doctor.checks(plist)[3].name == "state"
+    with pytest.raises(CheckError, match="unreadable"):
+        doctor.checks(plist)[3].run(1.0)
+
+
+def test_broken_player_and_sound(app_dir: Path) -> None:
+    bad = app_dir / "bad.wav"
+    bad.write_bytes(b"RIFF....WAVE")
+    Config(bad, cli._default_wavs()[1]).save()
+    audio.AFPLAY.write_text("#!/bin/sh\necho 'no output device' >&2\nexit 2\n")
+    results = {r.name: r for r in run_checks(doctor.checks(app_dir / "missing.plist"))}
+    assert results["player"].status == "fail"
+    assert results["player"].detail.endswith("(exit 2): no output device")
+    assert (results["chime"].status, results["pop"].status) == ("fail", "ok")
+    assert results["plist"].status == "warn"
+
+
+def test_checks_run_concurrently_with_timeouts() -> None:
+    def slow(seconds: float) -> Check:
+        return Check(f"sleep {seconds}", lambda _timeout: time.sleep(seconds) or "slept", timeout=1.0)
+
+    def crash(_timeout: float) -> str:
+        key = "boom"
+        raise KeyError(key)
+
+    t0 = time.perf_counter()
+    results = run_checks([slow(0.3), slow(0.3), slow(0.3), slow(2), Check("crash", crash)])
+    assert time.perf_counter() - t0 < 2
+    assert [r.status for r in results] == ["ok", "ok", "ok", "fail", "fail"]
+    assert results[0].seconds == pytest.approx(0.3, abs=0.2)
+    assert results[3].detail == "no answer within 1s"
+    assert results[4].detail == "KeyError: 'boom'"
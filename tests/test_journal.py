@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+from freezegun import freeze_time
+
+from bingbong import audio, cli, dayplan, journal, mixer, tick, ticklock
+from bingbong.cli import cli as cli_group
+from bingbong.clock import SimulatedClock, use
+from bingbong.config import Config, update_state
+from bingbong.journal import Record, append, journal_path, records
+from bingbong.pattern import Strike
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+BOUNDARY = 1_704_103_200  # 2024-01-01 10:00:00 UTC
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(dayplan, "_cache", dayplan.SimpleNamespace(plan=None, key=None))
+    return tmp_path
+
+
+def test_append_and_range_query() -> None:
+    for i in range(100):
+        append("played" if i % 2 else "quiet", BOUNDARY + i * 900, BOUNDARY + i * 900 + 0.25, Strike(0, 1))
+    found = list(records(BOUNDARY + 10 * 900, BOUNDARY + 13 * 900))
+    assert [r.boundary for r in found] == [BOUNDARY + i * 900 for i in (10, 11, 12)]
+    assert found[1] == Record(
+        BOUNDARY + 11 * 900 + 0.25, BOUNDARY + 11 * 900, "played", 0, 1, "", 250.0, 0.0, os.getpid()
+    )
+    assert len(list(records())) == 100
+    assert list(records(BOUNDARY + 100 * 900)) == []
+
+
+def test_rotation_keeps_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(journal, "MAX_BYTES", 16 + 10 * 32)
+    for i in range(45):
+        append("played", BOUNDARY + i * 60, BOUNDARY + i * 60)
+    path = journal_path()
+    assert [p.exists() for p in journal.journal_paths()] == [True, True, True, True]
+    assert path.stat().st_size == 16 + 5 * 32
+    assert [r.boundary for r in records()] == [
+        BOUNDARY + i * 60 for i in range(10, 45)
+    ]  # the first ten fell off
+    for i in range(45, 55):
+        append("played", BOUNDARY + i * 60, BOUNDARY + i * 60)
+    assert [r.boundary for r in records()] == [BOUNDARY + i * 60 for i in range(20, 55)]
+    # a range straddling two files
+    assert [r.boundary for r in records(BOUNDARY + 29 * 60, BOUNDARY + 31 * 60)] == [
+        BOUNDARY + 29 * 60,
+        BOUNDARY + 30 * 60,
+    ]
+
+
+def test_torn_record_is_trimmed_and_foreign_file_rotated() -> None:
+    append("played", BOUNDARY, BOUNDARY)
+    path = journal_path()
+    with path.open("ab") as f:
+        f.write(b"\x01\x02\x03")  # a crash mid-append
+    assert len(list(records())) == 1
+    append("stale", BOUNDARY + 60, BOUNDARY + 200)
+    assert [r.decision for r in records()] == ["played", "stale"]
+
+    path.write_bytes(b"not a journal" * 10)
+    assert list(records()) == []
+    append("played", BOUNDARY + 120, BOUNDARY + 120)
+    assert path.stat().st_size == 16 + 32
+    assert journal.journal_paths()[-2].read_bytes().startswith(b"not a journal")
+
+
+def test_unwritable_journal_does_not_break_the_tick() -> None:
+    journal_path().mkdir()
+    append("played", BOUNDARY, BOUNDARY)  # only logged
+
+
+def _play(mocker: MockerFixture) -> None:
+    mocker.patch.object(mixer, "render_tick", side_effect=mixer.MixError("no mixer"))
+    mocker.patch.object(audio, "play_sequence", return_value=0)
+
+
+def test_ticks_journal_their_decision(app_dir: Path, mocker: MockerFixture) -> None:
+    _play(mocker)
+    cfg = Config(app_dir / "c.wav", app_dir / "p.wav", quiet_hours=(22 * 60, 7 * 60))
+    cfg.save()
+    for spec in ("2024-01-01 10:00:05", "2024-01-01 10:00:20", "2024-01-01 10:07:00", "2024-01-01 23:00:00"):
+        with use(SimulatedClock(datetime.fromisoformat(spec).astimezone())):
+            tick.tick_once(cfg)
+    with use(SimulatedClock(datetime.fromisoformat("2024-01-02 10:00").astimezone())):
+        update_state(silence_until=datetime.fromisoformat("2024-01-02 11:00").astimezone().timestamp())
+        tick.tick_once(cfg)
+    with freeze_time("2024-01-02 12:15:00"):
+        update_state(silence_until=None)
+        with ticklock.lock_path().open("a") as other:
+            ticklock.fcntl.flock(other, ticklock.fcntl.LOCK_EX)
+            tick.tick_once(cfg)
+
+    found = list(records())
+    assert [r.decision for r in found] == ["played", "duplicate", "unscheduled", "quiet", "silenced", "busy"]
+    played = found[0]
+    assert (played.strike, played.source, played.late_ms) == (Strike(1, 10), "sequence", pytest.approx(5000))
+    assert found[1].strike == Strike(1, 10)
+
+
+def test_failed_playback_is_journalled(mocker: MockerFixture) -> None:
+    mocker.patch.object(audio, "play_pcm", side_effect=audio.PlaybackError("player exited with code 1"))
+    cfg = Config(*cli._default_wavs())
+    with use(SimulatedClock(datetime.fromisoformat("2024-01-01 10:15:00").astimezone())):
+        tick.tick_once(cfg)  # reported, not raised
+    mocker.patch.object(mixer, "render_tick", side_effect=mixer.MixError("no mixer"))
+    mocker.patch.object(audio, "play_sequence", return_value=3)
+    with use(SimulatedClock(datetime.fromisoformat("2024-01-01 10:30:00").astimezone())):
+        tick.tick_once(cfg)
+    assert [(r.decision, r.source) for r in records()] == [("failed", ""), ("aborted", "sequence")]
+
+
+def test_history_command() -> None:
+    start = datetime.fromisoformat("2024-01-01 09:00").astimezone().timestamp()
+    for i, decision in enumerate(["played", "quiet", "played", "stale"]):
+        append(
+            decision,
+            int(start) + i * 900,
+            start + i * 900 + 90,
+            Strike(1, 9),
+            source="cache" if i == 0 else "",
+        )
+    runner = CliRunner()
+    with use(SimulatedClock(start + 3 * 3600)):
+        res = runner.invoke(cli_group, ["history"])
+        assert res.exit_code == 0, res.output
+        assert "Mon 2024-01-01 09:00  played       chime + 9 pop(s) (cache, 0.0s), 90s late" in res.output
+        assert res.output.endswith("4 tick(s): 2 played, 1 quiet, 1 stale\n")
+        res = runner.invoke(
+            cli_group, ["history", "--from", "2024-01-01 09:10", "--decision", "played", "--summary"]
+        )
+        assert res.output == "1 tick(s): 1 played\n"
+        res = runner.invoke(cli_group, ["history", "--to", "2024-01-01"])
+        assert "No ticks journalled" in res.output
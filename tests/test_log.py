@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import log
+from bingbong.cli import cli
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class _Expensive:
+    def __init__(self) -> None:
+        self.renders = 0
+
+    def __str__(self) -> str:
+        self.renders += 1
+        return "rendered"
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logging() -> Iterator[None]:
+    log.set_verbose(value=False)
+    yield
+    log.stop_file_log()
+    log.set_verbose(value=False)
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    return tmp_path
+
+
+def test_disabled_calls_do_not_format() -> None:
+    arg = _Expensive()
+    log.debug("value %s", arg, field=arg)
+    log.info("value %s", arg)
+    assert arg.renders == 0
+    assert not log.enabled(log.ERROR)
+
+
+def test_console_renders_message_and_fields(capsys: pytest.CaptureFixture[str]) -> None:
+    log.set_verbose(value=True)
+    log.debug("tick: %d pop(s)", 3, chime=True, file=Path("/a b/c.wav"), late_ms=1.25)
+    assert capsys.readouterr().out == '[bingbong] tick: 3 pop(s) chime=true file="/a b/c.wav" late_ms=1.25\n'
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_file_log_respects_level_and_writes_logfmt() -> None:
+    assert log.start_file_log("info")
+    log.debug("hidden")
+    log.info("tick: playing", pops=2, source="cache")
+    log.warning("odd %s", "thing")
+    log.stop_file_log()
+    lines = log.log_path().read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert " level=info " in lines[0]
+    assert lines[0].endswith('msg="tick: playing" pops=2 source=cache')
+    assert lines[1].endswith("level=warning pid=" + lines[1].split("pid=")[1].split()[0] + ' msg="odd thing"')
+
+
+def test_file_log_off_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("BINGBONG_LOG_LEVEL", raising=False)
+    assert not log.start_file_log()
+    assert not log.enabled(log.ERROR)
+
+
+def test_rotation_keeps_backups(tmp_path: Path) -> None:
+    path = tmp_path / "bingbong.log"
+    writer = log._FileWriter(path, max_bytes=100, backups=2)
+    for i in range(4):
+        writer._write([f"{i}" * 120 + "\n"])
+    writer.close()
+    assert path.read_text(encoding="utf-8").startswith("3")
+    assert path.with_name("bingbong.log.1").read_text(encoding="utf-8").startswith("2")
+    assert path.with_name("bingbong.log.2").read_text(encoding="utf-8").startswith("1")
+    assert not path.with_name("bingbong.log.3").exists()
+
+
+def test_tail_reads_only_the_end(tmp_path: Path) -> None:
+    path = tmp_path / "x.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1000)), encoding="utf-8")
+    assert log.tail(path, 3, block=16) == ["line 997", "line 998", "line 999"]
+    assert log.tail(path, 0) == []
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_logs_command() -> None:
+    runner = CliRunner()
+    res = runner.invoke(cli, ["logs"])
+    assert res.exit_code == 0
+    assert "BINGBONG_LOG_LEVEL" in res.output
+    log.log_path().parent.mkdir(parents=True)
+    log.log_path().write_text("a\nb\nc\n", encoding="utf-8")
+    res = runner.invoke(cli, ["logs", "-n", "2"])
+    assert res.output == "b\nc\n"
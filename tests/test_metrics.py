@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bingbong import audio, dayplan, metrics, mixer, tick
+from bingbong.clock import SimulatedClock, use
+from bingbong.config import Config
+from bingbong.metrics import metrics_path, observe, totals_path
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(dayplan, "_cache", dayplan.SimpleNamespace(plan=None, key=None))
+    return tmp_path
+
+
+def _samples() -> dict[str, float]:
+    text = metrics_path().read_text()
+    assert text.endswith("# EOF\n")
+    return {
+        name: float(value)
+        for line in text.splitlines()
+        if not line.startswith("#")
+        for name, value in [line.rsplit(" ", 1)]
+    }
+
+
+def test_observe_accumulates_counters_and_histograms() -> None:
+    observe("played", 1000.0, late_s=0.3, load_s=0.002, play_s=2.5)
+    observe("played", 1900.0, late_s=7.0, load_s=0.004, play_s=1.5)
+    observe("quiet", 2800.0, late_s=0.04, load_s=0.001)
+    observe("unscheduled", 2860.0, late_s=None, load_s=0.001)
+    samples = _samples()
+    assert samples['bingbong_ticks_total{decision="played"}'] == 2
+    assert samples['bingbong_ticks_total{decision="quiet"}'] == 1
+    assert samples['bingbong_ticks_total{decision="failed"}'] == 0
+    assert samples['bingbong_tick_lateness_seconds_bucket{le="0.05"}'] == 1
+    assert samples['bingbong_tick_lateness_seconds_bucket{le="0.5"}'] == 2  # buckets are cumulative
+    assert samples['bingbong_tick_lateness_seconds_bucket{le="+Inf"}'] == 3
+    assert samples["bingbong_tick_lateness_seconds_sum"] == pytest.approx(7.34)
+    assert samples["bingbong_tick_load_seconds_count"] == 4
+    assert samples['bingbong_tick_playback_seconds_bucket{le="2"}'] == 1
+    assert samples["bingbong_tick_playback_seconds_count"] == 2
+    assert samples["bingbong_last_tick_timestamp_seconds"] == 2860
+    assert not list(metrics_path().parent.glob(".*.tmp"))
+
+
+@pytest.mark.parametrize("parser", ["prometheus_client.parser", "prometheus_client.openmetrics.parser"])
+def test_textfile_parses_as_prometheus_and_openmetrics(parser: str) -> None:
+    parse = pytest.importorskip(parser).text_string_to_metric_families
+    observe("played", 1000.0, late_s=0.3, load_s=0.002, play_s=2.5)
+    observe("quiet", 1900.0, late_s=0.04, load_s=0.001)
+    families = list(parse(metrics_path().read_text()))
+    samples = {
+        (s.name, s.labels.get("decision"), s.labels.get("le")): s.value for f in families for s in f.samples
+    }
+    assert samples["bingbong_ticks_total", "played", None] == 1
+    assert samples["bingbong_ticks_total", "quiet", None] == 1
+    assert samples["bingbong_tick_lateness_seconds_bucket", None, "0.5"] == 2
+    assert samples["bingbong_tick_playback_seconds_count", None, None] == 1
+    types = {f.name: f.type for f in families}
+    assert types["bingbong_ticks"] == "counter"
+    assert types["bingbong_tick_load_seconds"] == "histogram"
+
+
+def test_foreign_totals_start_afresh() -> None:
+    totals_path().write_bytes(b"BBMX" + b"\0" * 40)
+    observe("busy", 1000.0, late_s=0.1, load_s=0.001)
+    assert totals_path().stat().st_size == metrics._TOTALS.size
+    assert _samples()["bingbong_tick_load_seconds_count"] == 1
+
+
+def test_unwritable_metrics_do_not_break_the_tick() -> None:
+    totals_path().mkdir()
+    observe("played", 1000.0, late_s=0.1, load_s=0.001)  # only logged
+    assert not metrics_path().exists()
+
+
+def test_ticks_update_the_textfile(app_dir: Path, mocker: MockerFixture) -> None:
+    mocker.patch.object(mixer, "render_tick", side_effect=mixer.MixError("no mixer"))
+    mocker.patch.object(audio, "play_sequence", return_value=0)
+    cfg = Config(app_dir / "c.wav", app_dir / "p.wav", quiet_hours=(22 * 60, 7 * 60))
+    cfg.save()
+    for spec in ("2024-01-01 10:00:02", "2024-01-01 10:00:30", "2024-01-01 10:07:00", "2024-01-01 23:00:00"):
+        with use(SimulatedClock(datetime.fromisoformat(spec).astimezone())):
+            tick.tick_once(cfg)
+    samples = _samples()
+    assert [
+        samples[f'bingbong_ticks_total{{decision="{d}"}}']
+        for d in ("played", "duplicate", "unscheduled", "quiet")
+    ] == [1, 1, 1, 1]
+    assert samples["bingbong_tick_lateness_seconds_count"] == 3
+    assert samples["bingbong_tick_lateness_seconds_sum"] == pytest.approx(32)
+    assert samples["bingbong_tick_playback_seconds_count"] == 1
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from array import array
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from bingbong.mixer import MixError, Pcm, convert, decode, load, mix_at, render_tick, write_wav
+
+DATA = Path(str(resources.files("bingbong.data")))
+
+
+def _tone(frames: int, *, rate: int = 1000, channels: int = 1, value: int = 1000) -> Pcm:
+    return Pcm(array("h", [value] * frames * channels), rate, channels)
+
+
+def test_decode_packaged_sounds() -> None:
+    chime = decode(DATA / "chime.wav")
+    assert chime.rate == 24000
+    assert chime.channels == 2
+    assert chime.frames == 6364
+
+
+def test_decode_rejects_non_wav(tmp_path: Path) -> None:
+    bogus = tmp_path / "bogus.wav"
+    bogus.write_text("0")
+    with pytest.raises(MixError):
+        decode(bogus)
+    with pytest.raises(MixError):
+        load(tmp_path / "missing.wav")
+
+
+def test_load_reuses_decoded_sound(tmp_path: Path) -> None:
+    path = write_wav(_tone(10), tmp_path / "t.wav")
+    assert load(path) is load(path)
+
+
+def test_write_wav_roundtrip(tmp_path: Path) -> None:
+    pcm = Pcm(array("h", [0, -1, 32767, -32768]), 8000, 2)
+    back = decode(write_wav(pcm, tmp_path / "rt.wav"))
+    assert back == pcm
+
+
+def test_convert_channels_and_rate() -> None:
+    mono = Pcm(array("h", [0, 100, 200, 300]), 1000, 1)
+    stereo = convert(mono, 1000, 2)
+    assert list(stereo.samples) == [0, 0, 100, 100, 200, 200, 300, 300]
+    assert list(convert(stereo, 1000, 1).samples) == [0, 100, 200, 300]
+    doubled = convert(mono, 2000, 1)
+    assert doubled.frames == 8
+    assert list(doubled.samples[:4]) == [0, 50, 100, 150]
+
+
+def test_mix_at_clips_overlaps() -> None:
+    dest = array("h", [30000, 0, 0])
+    mix_at(dest, array("h", [30000, 5]), 0)
+    assert list(dest) == [32767, 5, 0]
+    mix_at(dest, array("h", [7, 7, 7]), 2)  # truncated at the end of dest
+    assert list(dest) == [32767, 5, 7]
+
+
+def test_render_tick_layout() -> None:
+    chime = _tone(100, value=1)
+    pop = _tone(10, value=2)
+    out = render_tick(chime, pop, 3, chime_delay=0.05, pop_delay=0.02)
+    # chime 100 frames, +50 gap, then pops every 10 + 20 frames
+    starts = [150, 180, 210]
+    assert out.frames == starts[-1] + 10
+    assert set(out.samples[:100]) == {1}
+    assert set(out.samples[100:150]) == {0}
+    for s in starts:
+        assert set(out.samples[s : s + 10]) == {2}
+        assert set(out.samples[s + 10 : s + 20]) <= {0}
+
+
+def test_render_tick_matches_formats() -> None:
+    chime = _tone(100, rate=2000, channels=2, value=1)
+    pop = _tone(10, rate=1000, channels=1, value=2)
+    out = render_tick(chime, pop, 1, chime_delay=0, pop_delay=0)
+    assert (out.rate, out.channels) == (2000, 2)
+    assert out.frames == 100 + 20
+
+
+def test_render_tick_repeats_chime() -> None:
+    chime = _tone(100, value=1)
+    out = render_tick(chime, _tone(10, value=2), 1, chimes=2, chime_delay=0.05, pop_delay=0)
+    assert out.frames == 2 * 150 + 10
+    assert set(out.samples[150:250]) == {1}
+    assert set(out.samples[300:310]) == {2}
+
+
+def test_render_tick_pops_only() -> None:
+    out = render_tick(None, _tone(10), 2, pop_delay=0.01)
+    assert out.frames == 10 + 10 + 10
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+
+from bingbong.core import compute_pop_count
+from bingbong.pattern import DEFAULT_RULES, NOTHING, PatternError, Strike, compile_rules, rules_digest
+
+
+@pytest.mark.parametrize("hour", range(24))
+@pytest.mark.parametrize("minute", range(60))
+def test_default_rules_match_quarter_chimes(hour: int, minute: int) -> None:
+    pops, chime = compute_pop_count(minute, hour)
+    assert compile_rules().strike(0, hour, minute) == Strike(int(chime and pops > 0), pops)
+
+
+def test_default_pattern_shape() -> None:
+    pattern = compile_rules()
+    assert pattern.rules == DEFAULT_RULES
+    assert pattern.minutes() == (0, 15, 30, 45)
+    assert len(pattern.strikes) == 1 + 12 + 3
+    assert len(pattern.table) == 7 * 24 * 60
+
+
+def test_selectors_and_weekdays() -> None:
+    pattern = compile_rules(["*/5 9-17/2 mon-fri pop", "0,30 12 sun chime*2"])
+    monday, sunday = datetime(2024, 1, 1, 9, 5, tzinfo=UTC), datetime(2024, 1, 7, 12, 30, tzinfo=UTC)
+    assert pattern.strike_at(monday) == Strike(0, 1)
+    assert pattern.strike_at(monday.replace(hour=10)) == NOTHING
+    assert pattern.strike_at(monday.replace(minute=7)) == NOTHING
+    assert pattern.strike_at(sunday) == Strike(2, 0)
+    assert pattern.strike_at(sunday.replace(minute=5)) == NOTHING
+    # 7 is Sunday too, as in cron
+    assert compile_rules(["0 0 7 pop"]).strike(6, 0, 0) == Strike(0, 1)
+
+
+def test_later_rules_override() -> None:
+    pattern = compile_rules([*DEFAULT_RULES, "* 0-6 * none", "0 12 * chime*3 pop*2"])
+    assert pattern.strike(2, 3, 0) == NOTHING
+    assert pattern.strike(2, 7, 0) == Strike(1, 7)
+    assert pattern.strike(2, 12, 0) == Strike(3, 2)
+    assert pattern.strike(2, 12, 15) == Strike(0, 1)
+
+
+def test_every_five_minutes() -> None:
+    pattern = compile_rules(["*/5 * * pop"])
+    assert pattern.minutes() == tuple(range(0, 60, 5))
+    assert sum(1 for _ in pattern.active()) == 7 * 24 * 12
+
+
+@pytest.mark.parametrize(
+    ("rule", "match"),
+    [
+        ("0 * *", "needs"),
+        ("60 * * pop", "out of range"),
+        ("x * * pop", "bad selector"),
+        ("*/0 * * pop", "out of range"),
+        ("0 * funday pop", "bad selector"),
+        ("0 * * pop chime", "before pops"),
+        ("0 * * bell", "unknown sound"),
+        ("0 * * pop*99", "repeat count"),
+        ("0 * * pop*hour pop", "cannot be combined"),
+    ],
+)
+def test_bad_rules(rule: str, match: str) -> None:
+    with pytest.raises(PatternError, match=match):
+        compile_rules([rule])
+
+
+def test_strike_describe_and_digest() -> None:
+    assert Strike(1, 12).describe() == "chime + 12 pop(s)"
+    assert Strike(2, 0).describe() == "2 chimes"
+    assert not NOTHING
+    assert rules_digest(None) == rules_digest(DEFAULT_RULES)
+    assert rules_digest(["0 * * pop"]) != rules_digest(None)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import io
+import sys
+from importlib import resources
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from bingbong.mixer import load
+from bingbong.player import CommandBackend, DeviceBackend, PlayerError, PlayerHelper, select_backend, serve
+
+DATA = Path(str(resources.files("bingbong.data")))
+POP = DATA / "pop.wav"
+
+
+class RecordingBackend:
+    name = "recording"
+
+    def __init__(self) -> None:
+        self.played: list[Path] = []
+        self.closed = False
+
+    def load(self, path: Path) -> None:  # noqa: PLR6301
+        load(path)
+
+    def play(self, path: Path) -> None:
+        self.load(path)
+        self.played.append(path)
+
+    def latency(self, path: Path) -> float:
+        self.load(path)
+        return 0.25
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _serve(*lines: str) -> tuple[list[str], RecordingBackend]:
+    backend = RecordingBackend()
+    out = io.StringIO()
+    serve(io.StringIO("".join(f"{line}\n" for line in lines)), out, backend)
+    return out.getvalue().splitlines(), backend
+
+
+def test_serve_protocol() -> None:
+    replies, backend = _serve(
+        "PING", f"LOAD {POP}", f"PLAY {POP}", "PLAY /missing.wav", "BOGUS", f"LATENCY {POP}", "QUIT", "PING"
+    )
+    assert replies[:3] == ["OK", "OK", "OK"]
+    assert replies[3].startswith("ERR cannot decode /missing.wav")
+    assert replies[4].startswith("ERR unknown command")
+    assert replies[5] == "OK 0.250000"
+    assert replies[6:] == ["OK"]  # nothing is answered after QUIT
+    assert backend.played == [POP]
+    assert backend.closed
+
+
+@pytest.fixture
+def fake_player(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    log = tmp_path / "plays.log"
+    script = tmp_path / "player.sh"
+    script.write_text(f'#!/bin/sh\necho "$1" >> {log}\n[ "$(basename "$1")" != fail.wav ]\n')
+    script.chmod(0o755)
+    monkeypatch.setenv("BINGBONG_PLAYER", str(script))
+    return log
+
+
+def test_command_backend_reports_exit_code(fake_player: Path, tmp_path: Path) -> None:
+    backend = CommandBackend(tmp_path / "player.sh")
+    backend.play(POP)
+    fail = tmp_path / "fail.wav"
+    fail.write_bytes(b"not a wav")  # the player, not the helper, decides what it can play
+    with pytest.raises(PlayerError, match="exited with code 1"):
+        backend.play(fail)
+    with pytest.raises(PlayerError, match=r"cannot play /missing\.wav"):
+        backend.play(Path("/missing.wav"))
+    assert fake_player.read_text(encoding="utf-8").splitlines() == [str(POP), str(fail)]
+
+
+def test_helper_process_roundtrip(fake_player: Path) -> None:
+    with PlayerHelper() as helper:
+        helper.ping()
+        helper.play(POP)
+        helper.play(POP)
+        with pytest.raises(PlayerError, match=r"cannot play /missing\.wav"):
+            helper.play("/missing.wav")
+    assert fake_player.read_text(encoding="utf-8").splitlines() == [str(POP), str(POP)]
+
+
+def test_helper_reports_latency() -> None:
+    with PlayerHelper(["/bin/sh", "-c", 'while read -r cmd path; do echo "OK 0.012500"; done']) as helper:
+        assert helper.latency(POP) == pytest.approx(0.0125)
+    with (
+        PlayerHelper(["/bin/sh", "-c", 'while read -r cmd path; do echo "ERR no stream"; done']) as helper,
+        pytest.raises(PlayerError, match="no stream"),
+    ):
+        helper.latency(POP)
+    with pytest.raises(PlayerError, match="does not report"):
+        CommandBackend(Path("/usr/bin/afplay")).latency(POP)
+
+
+def test_helper_restarts_after_crash(fake_player: Path) -> None:
+    helper = PlayerHelper()
+    try:
+        helper.ping()
+        assert helper._proc is not None
+        helper._proc.kill()
+        helper._proc.wait()
+        helper.play(POP)
+    finally:
+        helper.close()
+    assert fake_player.read_text(encoding="utf-8").splitlines() == [str(POP)]
+
+
+def test_helper_that_never_answers_is_killed() -> None:
+    helper = PlayerHelper(["/bin/sh", "-c", "sleep 30"])
+    try:
+        with pytest.raises(PlayerError, match=r"did not answer within 0\.2s"):
+            helper.ping(timeout=0.2)
+        assert helper._proc is None
+    finally:
+        helper.close()
+
+
+class PortAudioError(Exception):
+    pass
+
+
+class FakeStream:
+    latency = 0.02
+
+    def __init__(self, **settings: object) -> None:
+        self.settings = settings
+        self.written: list[bytes] = []
+        self.started = self.closed = self.broken = False
+
+    def start(self) -> None:
+        self.started = True
+
+    def write(self, data: bytes) -> None:
+        if self.broken:
+            msg = "Internal PortAudio error [PaErrorCode -9986]"
+            raise PortAudioError(msg)
+        self.written.append(data)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def sounddevice(monkeypatch: pytest.MonkeyPatch) -> list[FakeStream]:
+    streams: list[FakeStream] = []
+
+    def open_stream(**settings: object) -> FakeStream:
+        streams.append(FakeStream(**settings))
+        return streams[-1]
+
+    monkeypatch.setitem(
+        sys.modules,
+        "sounddevice",
+        SimpleNamespace(RawOutputStream=open_stream, PortAudioError=PortAudioError),
+    )
+    monkeypatch.delenv("BINGBONG_PLAYER", raising=False)
+    return streams
+
+
+def test_device_backend_keeps_one_stream_per_format(sounddevice: list[FakeStream]) -> None:
+    pcm = load(POP)
+    backend = select_backend()
+    assert isinstance(backend, DeviceBackend)
+    backend.play(POP)
+    backend.play(POP)
+    assert len(sounddevice) == 1
+    (stream,) = sounddevice
+    assert stream.settings == {"samplerate": pcm.rate, "channels": pcm.channels, "dtype": "int16"}
+    assert stream.started
+    assert stream.written == [pcm.samples.tobytes()] * 2
+    assert backend.latency(POP) == pytest.approx(0.02)
+    backend.close()
+    assert stream.closed
+
+
+def test_device_error_is_answered_and_the_stream_reopened(sounddevice: list[FakeStream]) -> None:
+    backend = select_backend()
+    backend.play(POP)
+    sounddevice[0].broken = True
+    out = io.StringIO()
+    serve(io.StringIO(f"PLAY {POP}\nPLAY {POP}\n"), out, backend)
+    replies = out.getvalue().splitlines()
+    assert replies[0] == "ERR audio device error: Internal PortAudio error [PaErrorCode -9986]"
+    assert replies[1] == "OK"
+    assert len(sounddevice) == 2
+    assert sounddevice[0].closed
+    assert len(sounddevice[1].written) == 1
+
+
+@pytest.mark.usefixtures("sounddevice")
+def test_select_backend_falls_back_to_the_command_player(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("BINGBONG_PLAYER", "/bin/true")
+    assert isinstance(select_backend(), CommandBackend)
+    monkeypatch.delenv("BINGBONG_PLAYER")
+    monkeypatch.setitem(sys.modules, "sounddevice", None)  # not installed
+    assert isinstance(select_backend(), CommandBackend)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from importlib import resources
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import audio
+from bingbong.cli import cli
+from bingbong.config import load_state
+from bingbong.mixer import MixError, Pcm, decode, write_wav
+from bingbong.preprocess import (
+    CANONICAL_CHANNELS,
+    CANONICAL_RATE,
+    PEAK_CEILING_DBFS,
+    TARGET_RMS_DBFS,
+    normalize,
+    preprocess,
+    trim_silence,
+)
+
+DATA = Path(str(resources.files("bingbong.data")))
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path / "app"))
+    return tmp_path / "app"
+
+
+def _dbfs(value: float) -> float:
+    return 20 * math.log10(value / 32767)
+
+
+def test_trim_silence_keeps_a_short_pad() -> None:
+    samples = array("h", [0] * 500 + [1000] * 100 + [3] * 400)
+    out = trim_silence(Pcm(samples, 1000, 1), pad=0.01)
+    assert out.frames == 10 + 100 + 10
+    assert out.samples[10] == 1000
+
+
+def test_trim_silence_rejects_silence() -> None:
+    with pytest.raises(MixError, match="silent"):
+        trim_silence(decode(DATA / "silence.wav"))
+
+
+def test_normalize_targets_rms_and_limits_peaks() -> None:
+    quiet = Pcm(array("h", [100, -100] * 500), 1000, 1)
+    rms = normalize(quiet).samples[0]
+    assert _dbfs(rms) == pytest.approx(TARGET_RMS_DBFS, abs=0.01)
+    spiky = Pcm(array("h", [30000] + [10] * 999), 1000, 1)
+    assert _dbfs(max(normalize(spiky).samples)) == pytest.approx(PEAK_CEILING_DBFS, abs=0.01)
+
+
+def test_preprocess_writes_canonical_copy(app_dir: Path, tmp_path: Path) -> None:
+    chime = decode(DATA / "chime.wav")
+    padded = Pcm(array("h", [0] * 2400 * 2) + chime.samples, chime.rate, chime.channels)
+    src = write_wav(padded, tmp_path / "padded.wav")
+    out = preprocess(src, "chime")
+    assert out == app_dir / "sounds" / "chime.wav"
+    pcm = decode(out)
+    assert (pcm.rate, pcm.channels) == (CANONICAL_RATE, CANONICAL_CHANNELS)
+    assert pcm.duration < padded.duration - 0.09  # the 100 ms of leading silence is gone
+    assert abs(pcm.samples[2 * round(0.01 * CANONICAL_RATE)]) > 0
+
+
+def test_preprocess_rejects_corrupt_file(app_dir: Path, tmp_path: Path) -> None:
+    bad = tmp_path / "bad.wav"
+    bad.write_bytes(b"RIFF\x00\x00\x00\x00WAVEjunk")
+    with pytest.raises(MixError, match="cannot decode"):
+        preprocess(bad, "pop")
+    assert not (app_dir / "sounds" / "pop.wav").exists()
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_install_rejects_corrupt_sound(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    player = tmp_path / "player"
+    player.write_text("#!/bin/sh\nexit 0\n")
+    player.chmod(0o755)
+    monkeypatch.setattr(sys, "platform", "darwin")
+    monkeypatch.setattr(audio, "AFPLAY", player)
+    bad = tmp_path / "bad.wav"
+    bad.write_bytes(b"not a wav")
+    res = CliRunner().invoke(cli, ["install", "--chime", str(bad)])
+    assert res.exit_code == 1
+    assert "Unusable sound file" in res.output
+    assert not load_state().has_config
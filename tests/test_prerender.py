@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from bingbong import prerender
+from bingbong.mixer import MixError, decode
+
+DATA = Path(str(resources.files("bingbong.data")))
+
+
+@pytest.fixture
+def sounds(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[Path, Path]:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path / "app"))
+    chime = tmp_path / "chime.wav"
+    pop = tmp_path / "pop.wav"
+    chime.write_bytes((DATA / "chime.wav").read_bytes())
+    pop.write_bytes((DATA / "pop.wav").read_bytes())
+    return chime, pop
+
+
+def test_build_renders_all_sequences(sounds: tuple[Path, Path]) -> None:
+    chime, pop = sounds
+    target = prerender.build(chime, pop)
+    names = sorted(p.name for p in target.iterdir())
+    assert len(names) == 15
+    assert "hour-12.wav" in names
+    assert "quarter-3.wav" in names
+    hit = prerender.lookup(chime, pop, 3, chime_first=True)
+    assert hit == target / "hour-03.wav"
+    assert decode(hit).frames > decode(chime).frames
+
+
+def test_lookup_missing_cache(sounds: tuple[Path, Path]) -> None:
+    chime, pop = sounds
+    assert prerender.lookup(chime, pop, 1, chime_first=False) is None
+
+
+def test_lookup_stale_after_source_change(sounds: tuple[Path, Path]) -> None:
+    chime, pop = sounds
+    old = prerender.build(chime, pop)
+    pop.write_bytes(chime.read_bytes())
+    assert prerender.lookup(chime, pop, 2, chime_first=False) is None
+    new = prerender.build(chime, pop)
+    assert new != old
+    assert not old.exists()
+    assert prerender.lookup(chime, pop, 2, chime_first=False) == new / "quarter-2.wav"
+
+
+def test_lookup_rejects_other_sources(sounds: tuple[Path, Path], tmp_path: Path) -> None:
+    chime, pop = sounds
+    prerender.build(chime, pop)
+    other = tmp_path / "other.wav"
+    other.write_bytes(pop.read_bytes())
+    os.utime(other, ns=(pop.stat().st_atime_ns, pop.stat().st_mtime_ns))
+    assert prerender.lookup(chime, other, 1, chime_first=False) is None
+
+
+def test_build_rejects_undecodable(sounds: tuple[Path, Path]) -> None:
+    chime, pop = sounds
+    pop.write_text("0")
+    with pytest.raises(MixError):
+        prerender.build(chime, pop)
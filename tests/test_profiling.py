@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import pstats
+import sys
+from typing import TYPE_CHECKING
+
+from click.testing import CliRunner
+
+from bingbong import profiling
+from bingbong.cli import cli
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _run_status(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, *args: str) -> list[Path]:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.setattr(sys, "platform", "darwin")
+    res = CliRunner().invoke(cli, [*args, "status"])
+    assert res.exit_code == 0, res.output
+    return sorted((tmp_path / "profiles").glob("status-*")) if (tmp_path / "profiles").exists() else []
+
+
+def test_profile_flag_writes_stats_and_trace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("BINGBONG_PROFILE", raising=False)
+    written = _run_status(tmp_path, monkeypatch, "--profile")
+    stats = next(p for p in written if p.suffix == ".pstats")
+    trace = next(p for p in written if p.name.endswith(".trace.json"))
+    assert pstats.Stats(str(stats)).total_calls > 0
+    data = json.loads(trace.read_text(encoding="utf-8"))
+    names = [e["name"] for e in data["traceEvents"]]
+    assert names[0] == "import"
+    assert "silence check" in names
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in data["traceEvents"])
+    assert not profiling.enabled()
+
+
+def test_profile_env_var(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("BINGBONG_PROFILE", "1")
+    assert len(_run_status(tmp_path, monkeypatch)) == 2
+
+
+def test_profile_off_by_default(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("BINGBONG_PROFILE", raising=False)
+    assert _run_status(tmp_path, monkeypatch) == []
+    with profiling.span("noop"):
+        pass
+    assert profiling.finish() is None
@@ -1,8 +1,47 @@
 from __future__ import annotations
 
-from bingbong.service import build_schedule
+from bingbong.pattern import compile_rules
+from bingbong.service import build_resident_schedule, build_schedule, calendar_entries
 
 
 def test_build_schedule_entries() -> None:
     sched = build_schedule()
-    assert len(sched.time.calendar_entries) == 96
+    assert sched.to_plist_dict()["StartCalendarInterval"] == [
+        {"Minute": 0},
+        {"Minute": 15},
+        {"Minute": 30},
+        {"Minute": 45},
+    ]
+
+
+def test_build_schedule_skips_quiet_hours() -> None:
+    entries = calendar_entries((22 * 60, 7 * 60))
+    assert len(entries) == 15 * 4
+    assert {e["hour"] for e in entries} == set(range(7, 22))
+    assert len(build_schedule((22 * 60, 7 * 60)).time.calendar_entries) == 60
+
+
+def test_partial_quiet_hour_keeps_unaffected_quarters_compact() -> None:
+    entries = calendar_entries((22 * 60 + 30, 23 * 60))
+    assert {"minute": 0} in entries
+    assert {"minute": 15} in entries
+    assert {"hour": 22, "minute": 30} not in entries
+    assert {"hour": 23, "minute": 30} in entries
+    assert len(entries) == 2 + 2 * 23
+
+
+def test_custom_rules_narrow_to_weekdays() -> None:
+    pattern = compile_rules(["0 9-17 mon-fri chime pop*hour", "10-50/20 * * pop"])
+    entries = calendar_entries(None, pattern)
+    assert {"minute": 10} in entries
+    assert {"minute": 50} in entries
+    assert {"weekday": 1, "hour": 9, "minute": 0} in entries  # launchd: Monday = 1
+    assert {"weekday": 0, "hour": 9, "minute": 0} not in entries
+    assert len(entries) == 3 + 9 * 5
+
+
+def test_build_resident_schedule_keeps_alive() -> None:
+    plist = build_resident_schedule().to_plist_dict()
+    assert plist.get("KeepAlive") is True
+    assert plist.get("RunAtLoad") is True
+    assert "StartCalendarInterval" not in plist
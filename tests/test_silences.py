@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import dayplan, silences
+from bingbong.agenda import parse_ics
+from bingbong.cli import cli
+from bingbong.clock import SimulatedClock, use
+from bingbong.config import load_state
+from bingbong.core import silence_active
+from bingbong.pattern import NOTHING
+from bingbong.silences import DAILY, WEEKLY, Calendar, CalendarError, Entry
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(dayplan, "_cache", dayplan.SimpleNamespace(plan=None, key=None))
+    monkeypatch.setattr(silences, "_cache", silences.SimpleNamespace(digest=None, calendar=None, index=None))
+    return tmp_path
+
+
+@pytest.fixture
+def new_york(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _ts(spec: str) -> float:
+    return datetime.fromisoformat(spec).astimezone().timestamp()
+
+
+def _walls(spans: Iterator[tuple[float, float]]) -> list[str]:
+    return [datetime.fromtimestamp(lo).astimezone().strftime("%a %m-%d %H:%M") for lo, _ in spans]
+
+
+@pytest.mark.usefixtures("new_york")
+def test_daily_repeats_keep_wall_clock_time_across_dst() -> None:
+    entry = Entry(_ts("2024-03-08 09:00"), _ts("2024-03-08 10:00"), DAILY)
+    spans = list(entry.occurrences(_ts("2024-03-09"), _ts("2024-03-12")))
+    assert _walls(iter(spans)) == ["Sat 03-09 09:00", "Sun 03-10 09:00", "Mon 03-11 09:00"]
+    assert all(hi - lo == 3600 for lo, hi in spans)
+
+
+def test_weekly_weekdays_count_and_until() -> None:
+    weekdays = Entry(_ts("2024-01-03 12:00"), _ts("2024-01-03 13:00"), WEEKLY, weekdays=0b11111)
+    found = _walls(weekdays.occurrences(_ts("2024-06-01"), _ts("2024-06-08")))
+    assert found == [
+        "Mon 06-03 12:00",
+        "Tue 06-04 12:00",
+        "Wed 06-05 12:00",
+        "Thu 06-06 12:00",
+        "Fri 06-07 12:00",
+    ]
+    every_other = Entry(_ts("2024-01-01 09:00"), _ts("2024-01-01 09:30"), DAILY, interval=2, count=3)
+    assert _walls(every_other.occurrences(0, _ts("2025-01-01"))) == [
+        "Mon 01-01 09:00",
+        "Wed 01-03 09:00",
+        "Fri 01-05 09:00",
+    ]
+    bounded = Entry(_ts("2024-01-01 09:00"), _ts("2024-01-01 10:00"), WEEKLY, until=_ts("2024-01-15 09:00"))
+    assert len(list(bounded.occurrences(0, _ts("2025-01-01")))) == 3
+
+
+def test_index_merges_and_bisects() -> None:
+    day = _ts("2024-01-01")
+    calendar = Calendar((
+        Entry(day + 3600, day + 7200),
+        Entry(day + 5400, day + 9000, label="overlaps the first"),
+        Entry(day + 9000, day + 9600, label="touches the second"),
+        Entry(day + 20000, day + 20060),
+    ))
+    index = calendar.index(day, day + 86400)
+    assert list(index.overlapping(day, day + 86400)) == [(day + 3600, day + 9600), (day + 20000, day + 20060)]
+    assert index.silenced_until(day + 3600) == day + 9600
+    assert index.silenced_until(day + 9599) == day + 9600
+    assert index.silenced_until(day + 9600) is None
+    assert index.silenced_until(day) is None
+    assert list(index.overlapping(day + 9600, day + 20000)) == []
+
+
+def test_index_picks_one_offs_by_range() -> None:
+    start = _ts("2024-01-01")
+    calendar = Calendar(tuple(Entry(start + i * 3600, start + i * 3600 + 1800) for i in range(5000)))
+    index = calendar.index(start + 1000 * 3600, start + 1010 * 3600)
+    assert len(index) == 10
+    long = Calendar((*calendar.entries, Entry(start - 86400, start + 2000 * 3600)))
+    assert len(long.index(start + 1000 * 3600, start + 1010 * 3600)) == 1
+
+
+def test_encode_round_trip_and_corruption() -> None:
+    entries = (
+        Entry(1.0, 2.0, label="Stand-up ☕", source="/cal.ics"),
+        Entry(3.0, 4.0, WEEKLY, 2, 0b101, 5.0, 6),
+    )
+    assert silences.decode(silences.encode(entries)) == entries
+    data = bytearray(silences.encode(entries))
+    data[10] ^= 0xFF
+    with pytest.raises(CalendarError, match="checksum"):
+        silences.decode(bytes(data))
+    with pytest.raises(CalendarError, match="truncated"):
+        silences.decode(b"BBSC")
+
+
+def test_save_records_digest_and_silences() -> None:
+    now = _ts("2024-01-01 10:00")
+    silences.save([Entry(now + 600, now + 1800)])
+    state = load_state()
+    assert state.calendar
+    assert silences.load().entries == (Entry(now + 600, now + 1800),)
+    at = datetime.fromtimestamp(now).astimezone()
+    assert not silence_active(at, state=state)
+    assert silence_active(at + timedelta(minutes=10), state=state)
+    assert not silence_active(at + timedelta(minutes=30), state=state)
+    silences.save([])
+    assert load_state().calendar == 0
+
+
+def test_day_plan_leaves_out_scheduled_silences() -> None:
+    silences.save([Entry(_ts("2024-01-01 10:05"), _ts("2024-01-01 10:45"))])
+    state = load_state()
+    before = dayplan.compile_day(
+        datetime.fromisoformat("2024-01-01 12:00").astimezone(), state.replace(calendar=0)
+    )
+    plan = dayplan.compile_day(datetime.fromisoformat("2024-01-01 12:00").astimezone(), state)
+    assert plan.key != before.key
+    assert plan.entry_at(_ts("2024-01-01 10:00")) == before.entry_at(_ts("2024-01-01 10:00"))
+    for quarter in ("10:15", "10:30"):
+        assert plan.entry_at(_ts(f"2024-01-01 {quarter}")) == NOTHING
+    assert plan.entry_at(_ts("2024-01-01 10:45")) != NOTHING
+
+
+def test_calendar_lookup_is_flat() -> None:
+    start = _ts("2024-01-01")
+    entries = [Entry(start + i * 1800, start + i * 1800 + 600) for i in range(20_000)]
+    entries += [Entry(start + i * 60, start + i * 60 + 900, WEEKLY, weekdays=0b11111) for i in range(200)]
+    silences.save(entries)
+    digest = load_state().calendar
+    t = start + 100 * 86400
+    silences.silenced_until(t, digest)  # builds the index for the week
+    t0 = time.perf_counter()
+    for i in range(10_000):
+        silences.silenced_until(t + i * 30, digest)
+    assert time.perf_counter() - t0 < 1  # typically ~10 ms
+
+
+ICS = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//test//EN
+BEGIN:VEVENT
+UID:1
+SUMMARY:Planning\\, Q3
+DTSTART;TZID=Europe/Berlin:20240603T100000
+DTEND;TZID=Europe/Berlin:20240603T110000
+END:VEVENT
+BEGIN:VEVENT
+UID:2
+SUMMARY:Focus
+ block
+DTSTART:20240603T070000Z
+DURATION:PT1H30M
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;UNTIL=20240630
+BEGIN:VALARM
+TRIGGER:-PT10M
+DTSTART:19990101T000000Z
+END:VALARM
+END:VEVENT
+BEGIN:VEVENT
+UID:3
+SUMMARY:Cancelled
+STATUS:CANCELLED
+DTSTART:20240604T090000Z
+DTEND:20240604T100000Z
+END:VEVENT
+BEGIN:VEVENT
+UID:4
+SUMMARY:Out of office
+TRANSP:TRANSPARENT
+DTSTART;VALUE=DATE:20240605
+END:VEVENT
+BEGIN:VEVENT
+UID:5
+SUMMARY:Monthly review
+DTSTART:20240610T120000Z
+DTEND:20240610T130000Z
+RRULE:FREQ=MONTHLY;BYDAY=2MO
+END:VEVENT
+BEGIN:VEVENT
+UID:6
+SUMMARY:Holiday
+DTSTART;VALUE=DATE:20240704
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_parse_ics() -> None:
+    parsed = parse_ics(ICS, source="/cal.ics")
+    assert (parsed.skipped, parsed.first_only) == (2, 1)
+    planning, focus, review, holiday = parsed.entries
+    assert planning.label == "Planning, Q3"
+    assert planning.start == datetime.fromisoformat("2024-06-03T08:00:00+00:00").timestamp()
+    assert planning.end - planning.start == 3600
+    assert focus.label == "Focusblock"
+    assert (focus.freq, focus.weekdays, focus.end - focus.start) == (WEEKLY, 0b10101, 5400)
+    assert focus.until == _ts("2024-07-01") - 1
+    assert len(list(focus.occurrences(0, _ts("2025-01-01")))) == 12
+    assert (review.freq, review.source) == (silences.ONCE, "/cal.ics")
+    assert (holiday.start, holiday.end) == (_ts("2024-07-04"), _ts("2024-07-05"))
+
+
+def test_calendar_commands(app_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sys, "platform", "darwin")
+    ics = app_dir / "work.ics"
+    ics.write_text(ICS)
+    runner = CliRunner()
+    with use(SimulatedClock(_ts("2024-06-03 00:00"))):
+        res = runner.invoke(cli, ["calendar", "import", str(ics)])
+        assert res.exit_code == 0, res.output
+        assert "Imported 4 silence(s) from work.ics (1 recurring)" in res.output
+        assert "2 cancelled or free event(s) skipped" in res.output
+        assert "1 event(s) repeat in a way bingbong cannot follow" in res.output
+        res = runner.invoke(cli, ["status", "--next", "0"])
+        assert "Calendar: next silence " in res.output
+        again = runner.invoke(cli, ["calendar", "import", str(ics)])
+        assert again.exit_code == 0, again.output
+        assert len(silences.load().entries) == 4
+
+        res = runner.invoke(
+            cli, ["calendar", "add", "--from", "2024-06-03 13:00", "--minutes", "30", "--repeat", "weekdays"]
+        )
+        assert res.exit_code == 0, res.output
+        assert "every week on Mo,Tu,We,Th,Fr" in res.output
+
+        res = runner.invoke(cli, ["calendar", "list", "--next", "2"])
+        assert res.exit_code == 0, res.output
+        assert "5 scheduled silence(s):" in res.output
+        assert "Planning, Q3" in res.output
+        assert "Next silences:\n" in res.output
+
+        res = runner.invoke(cli, ["calendar", "clear", "--source", str(ics)])
+        assert "Removed 4 scheduled silence(s)" in res.output
+        assert len(silences.load().entries) == 1
+        runner.invoke(cli, ["calendar", "clear"])
+    assert silences.load().entries == ()
+    assert load_state().calendar == 0
+
+    bad = app_dir / "bad.ics"
+    bad.write_text("hello")
+    res = runner.invoke(cli, ["calendar", "import", str(bad)])
+    assert res.exit_code == 1
+    assert "not an iCalendar file" in res.output
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from bingbong import audio, clock, dayplan
+from bingbong.audio import NullPlayer, null_player, play_once, play_repeated
+from bingbong.cli import cli
+from bingbong.clock import SimulatedClock
+from bingbong.pattern import Strike
+from bingbong.simulate import replay
+from bingbong.state import State
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    monkeypatch.delenv("BINGBONG_QUIET_HOURS", raising=False)
+    monkeypatch.setattr(dayplan, "_cache", dayplan.SimpleNamespace(plan=None, key=None))
+    return tmp_path
+
+
+@pytest.fixture
+def new_york(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _local(spec: str) -> datetime:
+    return datetime.fromisoformat(spec).astimezone()
+
+
+def test_simulated_clock_and_null_player() -> None:
+    sim = SimulatedClock(_local("2024-01-01 10:00"))
+    with clock.use(sim), null_player() as player:
+        play_repeated("pop.wav", 2, delay=0.5)
+        assert sim.monotonic() == pytest.approx(1.0)
+        sim.set(_local("2024-01-01 11:00"))
+        play_once("chime.wav")
+    assert clock.current() is not sim
+    assert audio._backend.null is None
+    start = _local("2024-01-01 10:00").timestamp()
+    assert player.played == [(start, "pop.wav"), (start + 0.5, "pop.wav"), (start + 3600, "chime.wav")]
+
+
+def test_replay_a_year() -> None:
+    player = NullPlayer()
+    report = replay(_local("2024-01-01"), _local("2025-01-01"), State(), player=player)
+    assert report.scheduled == 366 * 24 * 4
+    assert len(report.played) == len(player.played) == report.scheduled
+    assert report.strikes[Strike(1, 12)] == 366 * 2
+    assert player.played[0][1] == "hour-12.wav"
+    assert report.elapsed < 5  # typically well under a second
+
+
+def test_replay_quiet_hours_and_silence() -> None:
+    silence_until = _local("2024-01-01 12:20").timestamp()
+    state = State(quiet_hours=(22 * 60, 7 * 60), silence_until=silence_until)
+    report = replay(_local("2024-01-01 08:00"), _local("2024-01-02 08:00"), state)
+    assert report.scheduled == 24 * 4
+    played = [when.strftime("%H:%M") for when, _ in report.played]
+    assert played[0] == "12:30"
+    assert "21:45" in played
+    assert "22:00" not in played
+    assert played[-1] == "07:45"  # next morning, until --to
+    assert report.suppressed == report.scheduled - len(played)
+
+
+@pytest.mark.usefixtures("new_york")
+def test_replay_dst_days() -> None:
+    spring = replay(_local("2024-03-10"), _local("2024-03-11"), State())
+    assert spring.scheduled == 23 * 4
+    autumn = replay(_local("2024-11-03"), _local("2024-11-04"), State())
+    assert autumn.scheduled == 25 * 4
+    assert autumn.strikes[Strike(1, 1)] == 3  # 01:00 happens twice, then 13:00
+
+
+def test_simulate_command() -> None:
+    res = CliRunner().invoke(
+        cli,
+        ["simulate", "--from", "2024-01-01", "--to", "2024-01-01 02:00", "--rule", "*/30 * * pop", "--list"],
+    )
+    assert res.exit_code == 0, res.output
+    assert "Mon 2024-01-01 01:30  1 pop(s)\n" in res.output
+    assert "scheduled : 4\n" in res.output
+    assert "suppressed: 0" in res.output
+    bad = CliRunner().invoke(cli, ["simulate", "--from", "2024-01-02", "--to", "2024-01-01"])
+    assert bad.exit_code == 2
+    assert "must be after --from" in bad.output
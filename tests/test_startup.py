@@ -0,0 +1,57 @@
+"""Import-time budget for the `tick` entry point (`python -X importtime`)."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Modules that only other subcommands need; the tick path must never load them.
+FORBIDDEN_ON_TICK_PATH = ("onginred", "pydantic", "asyncio", "importlib.metadata", "bingbong.service")
+# Generous enough for slow CI machines; override when profiling locally.
+DEFAULT_BUDGET_MS = 150
+# Best-of-N filters out noise from whatever else the machine is doing.
+BUDGET_RUNS = 3
+
+
+def _tick_import_profile(tmp_path: Path) -> dict[str, int]:
+    """Run `python -m bingbong tick` under -X importtime; map module -> cumulative microseconds."""
+    env = {**os.environ, "BINGBONG_APP_SUPPORT": str(tmp_path), "BINGBONG_QUIET_HOURS": "00:00-23:59"}
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "bingbong", "tick"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+        timeout=60,
+    )
+    profile: dict[str, int] = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        profile[name.rstrip()] = int(cumulative_us)
+    return profile
+
+
+def test_tick_path_skips_heavy_imports(tmp_path: Path) -> None:
+    profile = _tick_import_profile(tmp_path)
+    assert any(name.strip() == "bingbong.cli" for name in profile)
+    loaded = {name.strip() for name in profile}
+    offenders = [m for m in FORBIDDEN_ON_TICK_PATH if any(n == m or n.startswith(f"{m}.") for n in loaded)]
+    assert not offenders, f"tick path imported {offenders}"
+
+
+def test_tick_path_import_budget(tmp_path: Path) -> None:
+    budget_ms = int(os.environ.get("BINGBONG_TICK_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+    totals = []
+    for _ in range(BUDGET_RUNS):
+        profile = _tick_import_profile(tmp_path)
+        # Top-level entries (a single space after "|") include everything they pulled in.
+        totals.append(sum(us for name, us in profile.items() if name.startswith(" bingbong")))
+    total_us = min(totals)
+    assert total_us / 1000 <= budget_ms, f"tick imports took {total_us / 1000:.1f} ms > {budget_ms} ms"
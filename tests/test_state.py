@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bingbong import config, state
+from bingbong.config import Config, load_state, state_path, update_state, watch_state
+from bingbong.core import get_silence_until, silence_active
+from bingbong.state import State, StateError
+from bingbong.watch import Watcher
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+
+def test_round_trip() -> None:
+    st = State(Path("/a/chime.wav"), Path("/a/pop.wav"), 2, 1_700_000_000.5, (22 * 60, 7 * 60), seq=7)
+    assert state.decode(state.encode(st)) == st
+    assert state.decode(state.encode(State())) == State()
+    ruled = State(rules=("0 9-17 mon-fri chime pop*hour", "*/5 * sat pop"))
+    assert state.decode(state.encode(ruled)) == ruled
+    scheduled = State(calendar=0xDEADBEEF)
+    assert state.decode(state.encode(scheduled)) == scheduled
+    calibrated = State(player_latency=0.0625, helper_latency=0.015625)
+    assert state.decode(state.encode(calibrated)) == calibrated
+
+
+def test_corruption_detected() -> None:
+    data = bytearray(state.encode(State(Path("/c.wav"), Path("/p.wav"))))
+    data[-6] ^= 0xFF
+    with pytest.raises(StateError, match="checksum"):
+        state.decode(bytes(data))
+    with pytest.raises(StateError, match="truncated"):
+        state.decode(b"BBST")
+    data[4] = 2  # a format this version does not know
+    with pytest.raises(StateError, match="unknown state format"):
+        state.decode(bytes(data))
+
+
+def test_write_is_atomic_and_bumps_seq(tmp_path: Path) -> None:
+    path = tmp_path / "state.bin"
+    first = state.write(path, State(silence_until=1.0))
+    second = state.write(path, first.replace(silence_until=None))
+    assert (first.seq, second.seq) == (1, 2)
+    assert state.read(path) == second
+    assert [p.name for p in tmp_path.iterdir()] == ["state.bin"]
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    return tmp_path
+
+
+def test_migrates_legacy_json(app_dir: Path) -> None:
+    (app_dir / "config.json").write_text(
+        json.dumps({"chime_wav": "/c.wav", "pop_wav": "/p.wav", "version": 1}), encoding="utf-8"
+    )
+    (app_dir / "silence_until.json").write_text(json.dumps({"until_epoch": 4_000_000_000}), encoding="utf-8")
+    cfg = Config.load()
+    assert (cfg.chime_wav, cfg.pop_wav) == (Path("/c.wav"), Path("/p.wav"))
+    assert silence_active()
+    assert state_path().exists()
+    assert not (app_dir / "config.json").exists()
+    assert (app_dir / "config.json.migrated").exists()
+    assert (app_dir / "silence_until.json.migrated").exists()
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_missing_state_has_no_config() -> None:
+    assert not load_state().has_config
+    assert get_silence_until() is None
+    assert not state_path().exists()
+
+
+def test_load_without_state_touches_no_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path / "app"))
+    assert load_state() == State()
+    assert not (tmp_path / "app").exists()
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_update_preserves_other_fields() -> None:
+    Config(Path("/c.wav"), Path("/p.wav"), quiet_hours=(60, 120)).save()
+    update_state(silence_until=123.0)
+    st = load_state()
+    assert (st.chime_wav, st.quiet_hours, st.silence_until, st.seq) == (Path("/c.wav"), (60, 120), 123.0, 2)
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_corrupt_state_is_ignored() -> None:
+    state_path().write_bytes(os.urandom(64))
+    assert load_state() == State()
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_update_keeps_a_corrupt_state_file() -> None:
+    garbage = os.urandom(64)
+    state_path().write_bytes(garbage)
+    update_state(silence_until=123.0)
+    assert state_path().with_name("state.bin.corrupt").read_bytes() == garbage
+    assert load_state() == State(silence_until=123.0, seq=1)
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_unchanged_file_is_not_reread(mocker: MockerFixture) -> None:
+    Config(Path("/c.wav"), Path("/p.wav")).save()
+    read = mocker.spy(config, "read")
+    first = load_state()
+    assert load_state() is first
+    assert read.call_count == 0  # the write primed the cache
+    state.write(state_path(), first.replace(silence_until=5.0))  # as another process would
+    assert load_state().silence_until == pytest.approx(5.0)
+    assert read.call_count == 1
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_watch_state_trusts_cache_until_change(mocker: MockerFixture) -> None:
+    Config(Path("/c.wav"), Path("/p.wav")).save()
+    with watch_state() as watcher:
+        changed = threading.Event()
+        original = watcher.on_change
+        watcher.on_change = lambda: (original(), changed.set())
+        stat = mocker.spy(config, "signature")
+        cached = load_state()
+        assert load_state() is cached
+        assert stat.call_count == 0
+        state.write(state_path(), cached.replace(silence_until=9.0))
+        assert changed.wait(5)
+        assert load_state().silence_until == pytest.approx(9.0)
+
+
+@pytest.mark.usefixtures("app_dir")
+def test_watch_state_keeps_cache_after_own_write(mocker: MockerFixture) -> None:
+    Config(Path("/c.wav"), Path("/p.wav")).save()
+    with watch_state() as watcher:
+        changed = threading.Event()
+        original = watcher.on_change
+        watcher.on_change = lambda: (original(), changed.set())
+        read = mocker.spy(config, "read")
+        written = update_state(silence_until=7.0)
+        assert changed.wait(5)
+        assert load_state() is written
+        assert read.call_count == 0
+
+
+@pytest.mark.parametrize("mode", ["inotify", "kqueue", "poll"])
+def test_watcher_reports_replacement(tmp_path: Path, mocker: MockerFixture, mode: str) -> None:
+    if mode == "poll":
+        mocker.patch("bingbong.watch._inotify_fd", return_value=None)
+        mocker.patch("bingbong.watch._vnode_fd", return_value=None)
+    path = tmp_path / "state.bin"
+    changed = threading.Event()
+    with Watcher(path, changed.set, interval=0.01) as watcher:
+        if watcher.mode != mode:
+            pytest.skip(f"{mode} not available")
+        (tmp_path / "unrelated").write_text("x", encoding="utf-8")
+        state.write(path, State())
+        assert changed.wait(5)
@@ -1,12 +1,17 @@
 import os
+import sys
+from datetime import datetime
 from pathlib import Path
-from types import SimpleNamespace
 
 import pytest
 from freezegun import freeze_time
+from pytest_mock import MockerFixture
 
-from bingbong import cli
-from bingbong.config import Config
+from bingbong import audio, cli, mixer, prerender, tick
+from bingbong.clock import SimulatedClock, use
+from bingbong.config import Config, update_state
+from bingbong.constants import TICK_BUDGET
+from bingbong.player import PlayerError
 
 
 def _setup_cfg(fs, mocker):
@@ -21,33 +26,55 @@ def _setup_cfg(fs, mocker):
     mocker.patch.object(_sys, "platform", "darwin")
 
 
+def _record_playback(mocker: MockerFixture) -> list[str]:
+    """Record what the live (per-sound) path would play."""
+    calls: list[str] = []
+
+    def fake_sequence(sounds, **_kw):
+        calls.extend("chime" if path.name == "c.wav" else "pop" for path, _gap in sounds)
+        return 0
+
+    mocker.patch.object(audio, "play_sequence", side_effect=fake_sequence)
+    mocker.patch.object(audio, "play_once", side_effect=lambda *_, **__: calls.append("file"))
+    mocker.patch.object(audio, "play_pcm", side_effect=lambda *_, **__: calls.append("buffer"))
+    return calls
+
+
 def test_tick_quiet_hours(fs, mocker):
     _setup_cfg(fs, mocker)
     mocker.patch.dict(os.environ, {"BINGBONG_QUIET_HOURS": "00:00-23:59"}, clear=False)
-    called: list[str] = []
-    mocker.patch.object(cli, "play_once", side_effect=lambda *_, **__: called.append("chime"))
-    mocker.patch.object(cli, "play_repeated", side_effect=lambda *_, **__: called.append("pop"))
-    mocker.patch.object(cli, "compute_pop_count", side_effect=lambda _m, _h: (1, True))
+    called = _record_playback(mocker)
     with freeze_time("2024-01-01 00:00:00"):
         assert cli.tick.callback
         cli.tick.callback()
     assert not called
 
 
+def test_tick_stored_quiet_hours(fs, mocker):
+    _setup_cfg(fs, mocker)
+    mocker.patch.dict(os.environ, {"BINGBONG_QUIET_HOURS": ""}, clear=False)
+    Config(Path("/AppSupport/c.wav"), Path("/AppSupport/p.wav"), quiet_hours=(22 * 60, 7 * 60)).save()
+    called = _record_playback(mocker)
+    with freeze_time("2024-01-01 23:00:00"):
+        tick.tick_once()
+    assert not called
+
+
 def test_tick_drift(fs, mocker):
     _setup_cfg(fs, mocker)
-    mocker.patch.object(cli, "compute_pop_count", side_effect=lambda _m, _h: (1, True))
-    called: list[str] = []
-    mocker.patch.object(cli, "play_once", side_effect=lambda *_, **__: called.append("chime"))
-    mocker.patch.object(cli, "play_repeated", side_effect=lambda *_, **__: called.append("pop"))
-    # Simulate drift by freezing time for chime, then advancing before pops
-    with freeze_time("2024-01-01 00:00:00") as frozen:
-        mocker.patch.object(
-            cli, "time", SimpleNamespace(sleep=lambda _x: frozen.move_to("2024-01-01 00:01:00"))
-        )
+    spawned: list[str] = []
+    sim = SimulatedClock(datetime(2024, 1, 1).astimezone())
+
+    def fake_player(path, _timeout):
+        spawned.append(Path(path).name)
+        sim.advance(60)  # the chime runs into the next minute
+        return 0
+
+    mocker.patch.object(audio, "_run_player", side_effect=fake_player)
+    with use(sim):
         assert cli.tick.callback
         cli.tick.callback()
-    assert called == ["chime"]
+    assert spawned == ["c.wav"]
 
 
 @pytest.mark.parametrize(
@@ -75,12 +102,7 @@ def test_tick_all_cases_with_freezegun(frozen, expect_chime, expect_pops, fs, mo
       - non-chime minutes do nothing
     """
     _setup_cfg(fs, mocker)
-    # Make sleep a no-op for speed/determinism.
-    mocker.patch.object(cli, "time", SimpleNamespace(sleep=lambda _x: None))
-
-    calls: list[str] = []
-    mocker.patch.object(cli, "play_once", side_effect=lambda *_, **__: calls.append("chime"))
-    mocker.patch.object(cli, "play_repeated", side_effect=lambda *_a, **_kw: calls.append("pop"))
+    calls = _record_playback(mocker)
 
     with freeze_time(frozen):
         assert cli.tick.callback
@@ -96,5 +118,106 @@ def test_tick_all_cases_with_freezegun(frozen, expect_chime, expect_pops, fs, mo
         else:
             # only pops entry recorded
             assert "chime" not in calls
-        # play_repeated is invoked once regardless of count; we verify intent by presence.
-        assert "pop" in calls
+        assert calls.count("pop") == expect_pops
+
+
+def test_tick_once_reuses_loaded_config(fs, mocker):
+    """A resident process passes its config in; no config file is read."""
+    mocker.patch.dict(os.environ, {"BINGBONG_APP_SUPPORT": "/AppSupport"}, clear=False)
+    fs.create_dir("/AppSupport")
+    cfg = Config(Path("/c.wav"), Path("/p.wav"))
+    load = mocker.patch.object(tick.Config, "load")
+    played: list[Path] = []
+    mocker.patch.object(
+        audio,
+        "play_sequence",
+        side_effect=lambda sounds, **_kw: played.extend(path for path, _ in sounds) or 0,
+    )
+    with freeze_time("2024-01-01 10:00:00"):
+        tick.tick_once(cfg)
+    load.assert_not_called()
+    assert played == [Path("/c.wav")] + [Path("/p.wav")] * 10
+
+
+def test_tick_decides_for_when_it_will_be_heard(fs, mocker):
+    """A tick started ``helper_latency`` before a boundary plays the boundary's strike."""
+    mocker.patch.dict(
+        os.environ, {"BINGBONG_APP_SUPPORT": "/AppSupport", "BINGBONG_QUIET_HOURS": ""}, clear=False
+    )
+    fs.create_dir("/AppSupport")
+    cfg = Config(Path("/c.wav"), Path("/p.wav"))
+    update_state(helper_latency=0.3, player_latency=0.5)
+    played: list[Path] = []
+    mocker.patch.object(
+        audio,
+        "play_sequence",
+        side_effect=lambda sounds, **_kw: played.extend(path for path, _ in sounds) or 0,
+    )
+    with freeze_time("2024-01-01 10:14:59.8"):
+        tick.tick_once(cfg)  # no helper: nothing is due yet
+        assert not played
+        tick.tick_once(cfg, mocker.Mock())
+    assert played == [Path("/p.wav")]
+
+
+def test_tick_plays_one_mixed_buffer(tmp_path, mocker):
+    """Decodable sounds are rendered into one buffer and played once."""
+    mocker.patch.dict(os.environ, {"BINGBONG_APP_SUPPORT": str(tmp_path)}, clear=False)
+    mocker.patch.object(sys, "platform", "darwin")
+    chime, pop = cli._default_wavs()
+    Config(chime, pop).save()
+    played: list[int] = []
+    mocker.patch.object(audio, "play_pcm", side_effect=lambda pcm, **_kw: played.append(pcm.frames))
+    play_once = mocker.patch.object(audio, "play_once")
+    with freeze_time("2024-01-01 15:00:00"):
+        assert cli.tick.callback
+        cli.tick.callback()
+    play_once.assert_not_called()
+    assert len(played) == 1
+    assert played[0] > 6364 + 3 * 2136
+
+
+def test_tick_prefers_prerendered_sequence(tmp_path, mocker):
+    mocker.patch.dict(os.environ, {"BINGBONG_APP_SUPPORT": str(tmp_path)}, clear=False)
+    mocker.patch.object(sys, "platform", "darwin")
+    chime, pop = cli._default_wavs()
+    Config(chime, pop).save()
+    cache = prerender.build(chime, pop)
+    played: list[Path] = []
+    mocker.patch.object(audio, "play_once", side_effect=lambda path, **_kw: played.append(path))
+    play_pcm = mocker.patch.object(audio, "play_pcm")
+    with freeze_time("2024-01-01 10:30:00"):
+        assert cli.tick.callback
+        cli.tick.callback()
+    play_pcm.assert_not_called()
+    assert played == [cache / "quarter-2.wav"]
+
+
+def test_tick_plays_through_warm_helper(tmp_path, mocker):
+    mocker.patch.dict(os.environ, {"BINGBONG_APP_SUPPORT": str(tmp_path)}, clear=False)
+    chime, pop = cli._default_wavs()
+    cfg = Config(chime, pop)
+    cache = prerender.build(chime, pop)
+    helper = mocker.Mock()
+    play_once = mocker.patch.object(audio, "play_once")
+    with freeze_time("2024-01-01 10:15:00"):
+        tick.tick_once(cfg, helper)
+    helper.play.assert_called_once_with(cache / "quarter-1.wav", timeout=TICK_BUDGET)
+    play_once.assert_not_called()
+
+    helper.play.side_effect = PlayerError("helper died")
+    with freeze_time("2024-01-01 10:45:00"):
+        tick.tick_once(cfg, helper)
+    play_once.assert_called_once_with(cache / "quarter-3.wav", deadline=mocker.ANY)
+
+
+def test_tick_plays_once_per_boundary(fs, mocker):
+    _setup_cfg(fs, mocker)
+    mocker.patch.dict(os.environ, {"BINGBONG_QUIET_HOURS": ""}, clear=False)
+    called = _record_playback(mocker)
+    mocker.patch.object(mixer, "render_tick", side_effect=mixer.MixError("no mixer"))
+    with freeze_time("2024-01-01 10:15:00") as frozen:
+        tick.tick_once()
+        frozen.tick(20)  # a second launch queued during sleep
+        tick.tick_once()
+    assert called == ["pop"]
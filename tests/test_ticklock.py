@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import fcntl
+from typing import TYPE_CHECKING
+
+import pytest
+from freezegun import freeze_time
+
+from bingbong import ticklock
+from bingbong.ticklock import claim, last_tick
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+BOUNDARY = 1_704_103_200  # 2024-01-01 10:00:00 UTC
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("BINGBONG_APP_SUPPORT", str(tmp_path))
+    return tmp_path
+
+
+def _claims(boundary: int) -> bool:
+    with claim(boundary) as claimed:
+        return claimed
+
+
+@freeze_time("2024-01-01 10:00:02")
+def test_each_boundary_plays_once() -> None:
+    assert _claims(BOUNDARY)
+    assert last_tick() == (BOUNDARY, pytest.approx(BOUNDARY + 2))
+    assert not _claims(BOUNDARY)  # duplicate launch
+    assert not _claims(BOUNDARY - 15 * 60)  # older than the last one played
+
+
+@freeze_time("2024-01-01 10:00:01")
+def test_concurrent_tick_gives_up() -> None:
+    ticklock.lock_path().parent.mkdir(parents=True, exist_ok=True)
+    with ticklock.lock_path().open("a") as other:
+        fcntl.flock(other, fcntl.LOCK_EX)
+        assert not _claims(BOUNDARY)
+    assert _claims(BOUNDARY)
+
+
+def test_record_from_the_future_is_ignored() -> None:
+    with freeze_time("2024-01-01 11:00:01"):
+        assert _claims(BOUNDARY + 3600)
+    with freeze_time("2024-01-01 10:00:01"):  # the clock was set back an hour
+        assert _claims(BOUNDARY)